@@ -4,12 +4,12 @@ Fask application
 """
 
 from flask import Flask, request, current_app
-from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from werkzeug.exceptions import HTTPException
 from werkzeug.middleware.proxy_fix import ProxyFix
 
-from .config import DefaultConfig, STATIC_DIR
+from .config import DefaultConfig, MIGRATIONS_DIR, STATIC_DIR
+from .models import db
 from .routes.index import index
 
 def create_app(name):
@@ -31,8 +31,10 @@ def create_app(name):
 
     application.config.from_object(cfg)
 
-    application.db = SQLAlchemy(application)
-    application.migrate = Migrate(application, application.db)
+    db.init_app(application)
+
+    application.db = db
+    application.migrate = Migrate(application, db, directory=MIGRATIONS_DIR)
     application.wsgi_app = ProxyFix(application.wsgi_app)
 
     return application
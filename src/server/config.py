@@ -8,6 +8,8 @@ import os
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 TEMPLATE_DIR = os.path.join(BASE_DIR, 'templates')
+MIGRATIONS_DIR = os.path.join(BASE_DIR, 'migrations')
+INSTANCE_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', 'instance'))
 STATIC_DIR = os.path.abspath(
     os.path.join(BASE_DIR, '..', 'client', 'static')
 )
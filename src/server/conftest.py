@@ -3,6 +3,12 @@
 Defines fixtures for `server` module
 """
 # pylint: disable=missing-function-docstring
+# pylint: disable=wrong-import-position
+import os
+
+# tests never share jobs through the default database file
+os.environ.setdefault('DATABASE_URI', 'sqlite://')
+
 import time
 from typing import Generator
 from fake_useragent.fake import UserAgent
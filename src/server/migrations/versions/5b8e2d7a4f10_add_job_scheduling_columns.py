@@ -0,0 +1,36 @@
+"""add job scheduling columns
+
+Revision ID: 5b8e2d7a4f10
+Revises: c7e93f04a1d8
+Create Date: 2021-08-14 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2d7a4f10'
+down_revision = 'c7e93f04a1d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.add_column(
+            sa.Column('priority', sa.Integer(), nullable=False, server_default='1')
+        )
+        batch_op.add_column(sa.Column('client', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('domain', sa.String(length=255), nullable=True))
+        batch_op.create_index(batch_op.f('ix_jobs_client'), ['client'], unique=False)
+        batch_op.create_index(batch_op.f('ix_jobs_domain'), ['domain'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_jobs_domain'))
+        batch_op.drop_index(batch_op.f('ix_jobs_client'))
+        batch_op.drop_column('domain')
+        batch_op.drop_column('client')
+        batch_op.drop_column('priority')
@@ -0,0 +1,24 @@
+"""index results by job and cursor
+
+Revision ID: 8d41b0e5c2a3
+Revises: 3f2a6c1d9b7e
+Create Date: 2021-07-31 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41b0e5c2a3'
+down_revision = '3f2a6c1d9b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_results_job_id_id', 'results', ['job_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_results_job_id_id', table_name='results')
@@ -0,0 +1,28 @@
+"""add job slots
+
+Revision ID: 9a3e5b7c1d24
+Revises: e2b7d5c93f61
+Create Date: 2021-09-04 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a3e5b7c1d24'
+down_revision = 'e2b7d5c93f61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.add_column(
+            sa.Column('slots', sa.Integer(), nullable=False, server_default='1')
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('slots')
@@ -0,0 +1,26 @@
+"""add job info
+
+Revision ID: a4c9f6e21b38
+Revises: 5b8e2d7a4f10
+Create Date: 2021-08-21 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c9f6e21b38'
+down_revision = '5b8e2d7a4f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.add_column(sa.Column('info', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('info')
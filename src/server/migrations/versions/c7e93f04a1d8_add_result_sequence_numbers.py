@@ -0,0 +1,36 @@
+"""add result sequence numbers
+
+Revision ID: c7e93f04a1d8
+Revises: 8d41b0e5c2a3
+Create Date: 2021-08-07 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e93f04a1d8'
+down_revision = '8d41b0e5c2a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('results') as batch_op:
+        batch_op.add_column(sa.Column('seq', sa.Integer(), nullable=True))
+
+    # ids are unique and ordered so they are valid sequence numbers
+    op.execute('UPDATE results SET seq = id')
+
+    with op.batch_alter_table('results') as batch_op:
+        batch_op.alter_column('seq', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_index('ix_results_job_id_id')
+        batch_op.create_unique_constraint('uq_results_job_id_seq', ['job_id', 'seq'])
+
+
+def downgrade():
+    with op.batch_alter_table('results') as batch_op:
+        batch_op.drop_constraint('uq_results_job_id_seq', type_='unique')
+        batch_op.create_index('ix_results_job_id_id', ['job_id', 'id'], unique=False)
+        batch_op.drop_column('seq')
@@ -0,0 +1,32 @@
+"""create seen urls table
+
+Revision ID: e2b7d5c93f61
+Revises: a4c9f6e21b38
+Create Date: 2021-08-28 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b7d5c93f61'
+down_revision = 'a4c9f6e21b38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'seen_urls',
+        sa.Column('scope', sa.String(length=255), nullable=False),
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('created', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('scope', 'key')
+    )
+    op.create_index(op.f('ix_seen_urls_created'), 'seen_urls', ['created'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_seen_urls_created'), table_name='seen_urls')
+    op.drop_table('seen_urls')
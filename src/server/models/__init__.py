@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+"""
+Defines database models
+"""
+from .base import db
+from .job import Job
+from .result import Result
+from .url import SeenUrl
@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+"""
+Defines the `SQLAlchemy` instance shared by all models.
+"""
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Defines `Job` model used to share scraper jobs between workers.
+"""
+# pylint: disable=too-few-public-methods
+from datetime import datetime
+
+from .base import db
+
+class Job(db.Model):
+    """
+    A script run by `Scraper`. Visible to every worker using the same database.
+    """
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.String(32), primary_key=True)
+    path = db.Column(db.String(255), nullable=False, index=True)
+    status = db.Column(db.String(16), nullable=False, default='queued', index=True)
+    owner = db.Column(db.String(255))
+    # lower values are started first. See `scheduler.PRIORITIES`
+    priority = db.Column(db.Integer, nullable=False, default=1)
+    # API client that submitted the job
+    client = db.Column(db.String(255), index=True)
+    # website scraped by the job
+    domain = db.Column(db.String(255), index=True)
+    # scheduler slots held while running. ie browser sessions of a batch
+    slots = db.Column(db.Integer, nullable=False, default=1)
+    # progress reported by the job. ie per query status of batches
+    info = db.Column(db.JSON)
+    # furthest result cursor read by a client
+    read_cursor = db.Column(db.Integer, nullable=False, default=0)
+    created = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Defines `Result` model used to store scraped records.
+"""
+# pylint: disable=too-few-public-methods
+from .base import db
+
+class Result(db.Model):
+    """
+    A record yielded by `Script.execute()`.
+    """
+    __tablename__ = 'results'
+    __table_args__ = (
+        db.UniqueConstraint('job_id', 'seq', name='uq_results_job_id_seq'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(32), db.ForeignKey('jobs.id'), nullable=False, index=True)
+    # position of result in its job, used as cursor
+    seq = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.JSON, nullable=False)
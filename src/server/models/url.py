@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Defines `SeenUrl` model used to skip results already returned by earlier jobs.
+"""
+# pylint: disable=too-few-public-methods
+from datetime import datetime
+
+from .base import db
+
+class SeenUrl(db.Model):
+    """
+    A normalised url yielded by a job. See `scraper.dedup.DedupIndex`.
+    """
+    __tablename__ = 'seen_urls'
+
+    # urls are shared by jobs with the same scope. ie script path
+    scope = db.Column(db.String(255), primary_key=True)
+    # sha256 of normalised url
+    key = db.Column(db.String(64), primary_key=True)
+    created = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
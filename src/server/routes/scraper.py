@@ -2,24 +2,28 @@
 """
 Defines routes for `/scraper` subdirectory
 """
-from flask import Blueprint, jsonify, abort, request
+from flask import Blueprint, Response, abort, json, jsonify, request, stream_with_context
 
-from ..scraper.scraper import create_scraper
+from ..scraper.scraper import RESULTS_LIMIT, STREAM_TIMEOUT, create_scraper
 from ..scraper.script import SCRIPTS, validate_script
 
+# arguments of `Scraper.scrape()` and `Scraper.scrape_batch()` that cannot be sent as script options
+RESERVED_ARGS = ('self', 'path', 'client', 'queries', 'workers')
+
 scraper = Blueprint('scraper', __name__, url_prefix='/scraper')
 instance = create_scraper(save_session=True)
 
 @scraper.route('/status', methods=['GET'])
 def get_status():
     """
-    Displays the status of api
+    Displays the status of api and the number of queued and running jobs
     """
     return jsonify({
         'status': 0,
         'error': None,
         'result': {
             'scrips': SCRIPTS,
+            'queue': instance.get_queue(),
         },
     })
 
@@ -27,7 +31,7 @@ def get_status():
 @scraper.route('/<script>', methods=['GET'])
 def get_script(script):
     """
-    Starts scripts.
+    Starts a new job running script.
 
     Args:
         script (str): script to execute. ie 'login`
@@ -39,33 +43,129 @@ def get_script(script):
     if not validate_script(script):
         return abort(404)
 
+    # options would clash with arguments of `scrape()`
+    if any(key in request.args for key in RESERVED_ARGS):
+        return abort(400)
+
+    # jobs are shared fairly between clients
+    client = request.headers.get('X-Client-Id', request.remote_addr)
+
     # start scrape
-    result = instance.scrape(script, **request.args)
+    try:
+        job = instance.scrape(script, client, **request.args)
+
+    except (ImportError, KeyError, TypeError):
+        return abort(404)
 
-    # empty result
     return jsonify({
         'status': 0,
         'error': None,
-        'result': result,
+        'result': {
+            'job': job,
+            'status': instance.get_status(job),
+        },
     })
 
-@scraper.route('/<script>/status', methods=['GET'])
-def get_script_status(script):
+@scraper.route('/<script>/batch', methods=['POST'])
+def post_script_batch(script):
     """
-    Retrieves script results.
+    Starts a new job running script once per query. Queries are sent as a JSON body
+    (`{"queries": ["foo", "bar"], "max_page": 2}`) or as an uploaded `file` with one
+    query per line. Other values are forwarded to the script.
 
     Args:
-        site (str): module for script. ie `google`
-        script (str): script to execute. ie 'login.py`
+        script (str): script to execute. ie 'findpeople`
 
     Returns:
         str: JSON data
     """
     # validate script
-    if not instance.is_script(script):
+    if not validate_script(script):
+        return abort(404)
+
+    options = request.args.to_dict()
+
+    if 'file' in request.files:
+        lines = request.files['file'].read().decode('utf-8', 'replace').splitlines()
+        queries = [line.strip() for line in lines if line.strip()]
+        options.update(request.form.to_dict())
+
+    else:
+        body = request.get_json(silent=True)
+
+        if not isinstance(body, dict):
+            return abort(400)
+
+        options.update(body)
+        queries = options.pop('queries', None)
+
+    workers = options.pop('workers', None)
+
+    # options would clash with arguments of `scrape_batch()`
+    if any(key in options for key in RESERVED_ARGS):
+        return abort(400)
+
+    # jobs are shared fairly between clients
+    client = request.headers.get('X-Client-Id', request.remote_addr)
+
+    try:
+        workers = int(workers) if workers else None
+
+    except ValueError:
+        return abort(400)
+
+    try:
+        job = instance.scrape_batch(script, queries, client, workers, **options)
+
+    except TypeError:
+        return abort(400)
+
+    except (ImportError, KeyError):
         return abort(404)
 
-    result = instance.get_status(script)
+    return jsonify({
+        'status': 0,
+        'error': None,
+        'result': {
+            'job': job,
+            'status': instance.get_status(job),
+        },
+    })
+
+@scraper.route('/<script>/jobs', methods=['GET'])
+def get_script_jobs(script):
+    """
+    Lists jobs running script.
+
+    Args:
+        script (str): script to execute. ie 'login`
+
+    Returns:
+        str: JSON data
+    """
+    return jsonify({
+        'status': 0,
+        'error': None,
+        'result': instance.get_jobs(script),
+    })
+
+@scraper.route('/<script>/<job>/status', methods=['GET'])
+def get_script_status(script, job):
+    """
+    Retrieves job status.
+
+    Args:
+        script (str): script to execute. ie 'login`
+        job (str): job id returned by `get_script()`
+
+    Returns:
+        str: JSON data
+    """
+    # validate job
+    if job not in instance.get_jobs(script):
+        return abort(404)
+
+    result = instance.get_status(job)
 
     return jsonify({
         'status': 0,
@@ -73,48 +173,121 @@ def get_script_status(script):
         'result': result,
    })
 
-@scraper.route('/<script>/results', methods=['GET'])
-def get_script_results(script):
+@scraper.route('/<script>/<job>/progress', methods=['GET'])
+def get_script_progress(script, job):
     """
-    Retrieves script results.
+    Retrieves the status and number of results of each query of a batch job, and the
+    number of duplicate (`hits`) and new (`misses`) urls of any job under `dedup`.
 
     Args:
-        site (str): module for script. ie `google`
-        script (str): script to execute. ie 'login.py`
+        script (str): script to execute. ie 'findpeople`
+        job (str): job id returned by `post_script_batch()`
 
     Returns:
         str: JSON data
     """
-    # validate script
-    if not instance.is_script(script):
+    # validate job
+    if job not in instance.get_jobs(script):
         return abort(404)
 
-    results = instance.get_results(script)
+    return jsonify({
+        'status': 0,
+        'error': None,
+        'result': instance.get_progress(job),
+    })
+
+@scraper.route('/<script>/<job>/results', methods=['GET'])
+def get_script_results(script, job):
+    """
+    Retrieves a page of job results. Pass the returned `cursor` as `since` to get the next page.
+
+    Args:
+        script (str): script to execute. ie 'login`
+        job (str): job id returned by `get_script()`
+
+    Returns:
+        str: JSON data
+    """
+    # validate job
+    if job not in instance.get_jobs(script):
+        return abort(404)
+
+    since = request.args.get('since', 0, type=int)
+    limit = request.args.get('limit', RESULTS_LIMIT, type=int)
+
+    results, cursor = instance.get_results(job, max(0, since), max(1, min(limit, RESULTS_LIMIT)))
 
     return jsonify({
         'status': 0,
         'error': None,
         'result': results,
+        'cursor': cursor,
     })
 
-@scraper.route('/<script>/cancel', methods=['GET'])
-def cancel_script(script):
+@scraper.route('/<script>/<job>/stream', methods=['GET'])
+def stream_script_results(script, job):
     """
-    Retrieves script results.
+    Streams job results as they are collected. Sends newline delimited JSON
+    (`{"cursor": 1, "result": {}}` per line) or server-sent events when requested with
+    `Accept: text/event-stream` or `?format=sse`. Resume with `?since=<cursor>` or
+    the `Last-Event-ID` header.
 
     Args:
-        site (str): module for script. ie `google`
-        script (str): script to execute. ie 'login.py`
+        script (str): script to execute. ie 'login`
+        job (str): job id returned by `get_script()`
+
+    Returns:
+        Response: streamed results
+    """
+    # validate job
+    if job not in instance.get_jobs(script):
+        return abort(404)
+
+    sse = request.args.get('format') == 'sse' \
+        or request.accept_mimetypes.best == 'text/event-stream'
+    # `type` is not applied to the `Last-Event-ID` default
+    try:
+        since = max(0, int(request.args.get('since', request.headers.get('Last-Event-ID', 0))))
+
+    except ValueError:
+        return abort(400)
+
+    timeout = request.args.get('timeout', STREAM_TIMEOUT, type=float)
+
+    def generate():
+        for cursor, result in instance.stream_results(job, since, min(timeout, STREAM_TIMEOUT)):
+            if sse:
+                yield f'id: {cursor}\ndata: {json.dumps(result)}\n\n'
+            else:
+                yield json.dumps({'cursor': cursor, 'result': result}) + '\n'
+
+        if sse:
+            yield f'event: {instance.get_status(job)}\ndata: null\n\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if sse else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+@scraper.route('/<script>/<job>/cancel', methods=['GET'])
+def cancel_script(script, job):
+    """
+    Stops job.
+
+    Args:
+        script (str): script to execute. ie 'login`
+        job (str): job id returned by `get_script()`
 
     Returns:
         str: JSON data
     """
-    # validate script
-    if not instance.is_script(script):
+    # validate job
+    if job not in instance.get_jobs(script):
         return abort(404)
 
-    # stop script
-    instance.delete_script(script)
+    # stop job
+    instance.delete_script(job)
 
     return jsonify({
         'status': 0,
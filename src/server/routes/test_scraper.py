@@ -6,12 +6,14 @@ Tests for `blueprint` module.
 # pylint: disable=missing-class-docstring
 # pylint: disable=missing-function-docstring
 
+import io
+import json
 import time
 import pytest
 from flask import url_for
 from flask.testing import FlaskClient
 
-from .scraper import scraper
+from .scraper import scraper, instance
 from ..scraper.scripts.mock import MOCK_RESULT
 
 @pytest.fixture
@@ -33,18 +35,105 @@ def test_get_status(client: FlaskClient):
     assert isinstance(response.json['result'], dict) \
         , 'Should return a dict result'
 
+    assert set(response.json['result']['queue']['queued']) == {'interactive', 'bulk'} \
+        , 'Should return queue depth per priority class'
+
+def start_job(client: FlaskClient, script: str = 'mock') -> str:
+    response = client.get(url_for('scraper.get_script', script=script))
+    job = response.json['result']['job']
+
+    instance.wait(job)
+
+    return job
+
 def test_get_script(client: FlaskClient):
     response = client.get(url_for('scraper.get_script', script='mock'))
 
     assert response.status_code == 200 \
         , 'Should return status code 200'
 
-    assert response.json == {'status':0, 'error':None, 'result':'done'} \
-        , 'Should return a success response'
+    assert isinstance(response.json['result']['job'], str) \
+        , 'Should return a job id'
+
+    assert response.json['result']['status'] in ('queued', 'running', 'done') \
+        , 'Should return without waiting for job'
+
+    response = client.get(url_for('scraper.get_script', script='mock', client='foo'))
+
+    assert response.status_code == 400 \
+        , 'Should return status code 400 for reserved arguments'
+
+def test_post_script_batch(client: FlaskClient):
+    response = client.post(
+        url_for('scraper.post_script_batch', script='mock'),
+        json={'queries': ['foo', 'bar']},
+    )
+
+    assert response.status_code == 200 \
+        , 'Should return status code 200'
+
+    assert isinstance(response.json['result']['job'], str) \
+        , 'Should return a job id'
+
+    response = client.post(
+        url_for('scraper.post_script_batch', script='mock'),
+        data={'file': (io.BytesIO(b'foo\nbar\n'), 'queries.txt')},
+    )
+
+    assert response.status_code == 200 \
+        , 'Should accept uploaded query files'
+
+    response = client.post(
+        url_for('scraper.post_script_batch', script='mock'),
+        json={'queries': 'foo'},
+    )
+
+    assert response.status_code == 400 \
+        , 'Should return status code 400 for invalid queries'
+
+    response = client.post(
+        url_for('scraper.post_script_batch', script='mock'),
+        json={'queries': ['foo'], 'client': 'foo'},
+    )
+
+    assert response.status_code == 400 \
+        , 'Should return status code 400 for reserved arguments'
+
+def test_get_script_progress(client: FlaskClient):
+    response = client.post(
+        url_for('scraper.post_script_batch', script='mock'),
+        json={'queries': ['foo', 'bar']},
+    )
+    job = response.json['result']['job']
+
+    instance.wait(job)
+
+    response = client.get(url_for('scraper.get_script_progress', script='mock', job=job))
+
+    assert response.status_code == 200 \
+        , 'Should return status code 200'
+
+    assert response.json['result']['done'] == 2 \
+        , 'Should return progress of batch'
+
+    response = client.get(url_for('scraper.get_script_progress', script='mock', job='foo'))
+
+    assert response.status_code == 404 \
+        , 'Should return status code 404 for unknown jobs'
+
+def test_get_script_jobs(client: FlaskClient):
+    jobs = [start_job(client), start_job(client)]
+    response = client.get(url_for('scraper.get_script_jobs', script='mock'))
+
+    assert response.status_code == 200 \
+        , 'Should return status code 200'
+
+    assert set(jobs) <= set(response.json['result']) \
+        , 'Should keep several jobs of the same script'
 
 def test_get_script_status(client: FlaskClient):
-    client.get(url_for('scraper.get_script', script='mock'))
-    response = client.get(url_for('scraper.get_script_status', script='mock'))
+    job = start_job(client)
+    response = client.get(url_for('scraper.get_script_status', script='mock', job=job))
 
     assert response.status_code == 200 \
         , 'Should return status code 200'
@@ -52,9 +141,14 @@ def test_get_script_status(client: FlaskClient):
     assert response.json == {'status':0, 'error':None, 'result':'done'} \
         , 'Should return a done state'
 
+    response = client.get(url_for('scraper.get_script_status', script='mock', job='foo'))
+
+    assert response.status_code == 404 \
+        , 'Should return status code 404 for unknown jobs'
+
 def test_cancel_script(client: FlaskClient):
-    client.get(url_for('scraper.get_script', script='mock'))
-    response = client.get(url_for('scraper.cancel_script', script='mock'))
+    job = start_job(client)
+    response = client.get(url_for('scraper.cancel_script', script='mock', job=job))
 
     assert response.status_code == 200 \
         , 'Should return status code 200'
@@ -69,16 +163,86 @@ def test_cancel_script(client: FlaskClient):
         , 'Should return a boolean result'
 
 def test_get_script_results(client: FlaskClient):
-    client.get(url_for('scraper.get_script', script='mock'))
-    response = client.get(url_for('scraper.get_script_results', script='mock'))
+    job = start_job(client)
+    other_job = start_job(client)
+    response = client.get(url_for('scraper.get_script_results', script='mock', job=job))
 
     assert response.status_code == 200 \
         , 'Should return status code 200'
 
-    assert response.json == {'status': 0, 'error': None, 'result': [MOCK_RESULT]} \
+    assert response.json['result'] == [MOCK_RESULT] \
         , 'Should return test result'
 
-    response = client.get(url_for('scraper.get_script_results', script='mock'))
+    cursor = response.json['cursor']
+    response = client.get(url_for(
+        'scraper.get_script_results', script='mock', job=job, since=cursor,
+    ))
 
     assert response.json['result'] == [] \
-        , 'Should consume results stored by scrapper'
+        , 'Should return results after cursor'
+
+    response = client.get(url_for('scraper.get_script_results', script='mock', job=job))
+
+    assert response.json['result'] == [MOCK_RESULT] \
+        , 'Should keep results stored by scrapper'
+
+    response = client.get(url_for('scraper.get_script_results', script='mock', job=other_job))
+
+    assert response.json['result'] == [MOCK_RESULT] \
+        , 'Should keep results of other jobs'
+
+def test_stream_script_results(client: FlaskClient):
+    job = start_job(client)
+    response = client.get(url_for('scraper.stream_script_results', script='mock', job=job))
+
+    assert response.status_code == 200 \
+        , 'Should return status code 200'
+
+    assert response.content_type == 'application/x-ndjson' \
+        , 'Should stream newline delimited JSON'
+
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+
+    assert [line['result'] for line in lines] == [MOCK_RESULT] \
+        , 'Should stream test result'
+
+    response = client.get(url_for(
+        'scraper.stream_script_results', script='mock', job=job, since=lines[-1]['cursor'],
+    ))
+
+    assert response.data == b'' \
+        , 'Should resume after cursor'
+
+    response = client.get(url_for(
+        'scraper.stream_script_results', script='mock', job=job, format='sse',
+    ))
+
+    assert response.content_type.startswith('text/event-stream') \
+        , 'Should stream server-sent events'
+
+    assert f'id: {lines[-1]["cursor"]}' in response.data.decode() \
+        , 'Should send cursor as event id'
+
+    response = client.get(
+        url_for('scraper.stream_script_results', script='mock', job=job),
+        headers={'Last-Event-ID': str(lines[-1]['cursor'])},
+    )
+
+    assert response.data == b'' \
+        , 'Should resume after `Last-Event-ID`'
+
+    response = client.get(
+        url_for('scraper.stream_script_results', script='mock', job=job),
+        headers={'Last-Event-ID': 'foo'},
+    )
+
+    assert response.status_code == 400 \
+        , 'Should return status code 400 for invalid cursors'
+
+    response = client.get(url_for(
+        'scraper.stream_script_results', script='mock', job=job, since=-5,
+    ))
+
+    assert [json.loads(line)['result'] for line in response.data.decode().splitlines()] \
+        == [MOCK_RESULT] \
+        , 'Should stream from the start for negative cursors'
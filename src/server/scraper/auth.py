@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Defines functions and classes for sharing the cookies and headers of logged in sessions.
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict
+
+AUTH_FILE = os.environ.get('SCRAPER_AUTH_FILE')
+
+class AuthCache:
+    """
+    Keeps the cookies and headers of logged in accounts so API clients can be created
+    without a browser. Entries are also written to `path` when set, so they are shared
+    with other workers. The file holds credentials and is only readable by its owner.
+
+    Args:
+        path (str, optional): path of JSON file. Defaults to `AUTH_FILE`.
+    """
+
+    def get(self, account: str) -> Dict[str, any]:
+        """
+        Returns the auth material of an account. Changes written by other workers are
+        read first.
+
+        Args:
+            account (str): name of account. ie `linkedin`
+
+        Returns:
+            Dict[str, any]: `cookies`, `headers` and `stored` time or `None` if missing
+        """
+        with self.lock:
+            self._load()
+
+            return self.entries.get(account)
+
+    def set(self, account: str, cookies: list, headers: Dict[str, str]) -> Dict[str, any]:
+        """
+        Adds or replaces the auth material of an account.
+
+        Args:
+            account (str): name of account
+            cookies (list): `name`, `value`, `domain`, `path` and `secure` of each cookie
+            headers (Dict[str, str]): headers sent with API calls
+
+        Returns:
+            Dict[str, any]: stored entry. See `get()`
+        """
+        entry = {'cookies': cookies, 'headers': headers, 'stored': time.time()}
+
+        with self.lock:
+            self._load()
+            self.entries[account] = entry
+            self._save()
+
+        return entry
+
+    def remove(self, account: str):
+        """
+        Removes the auth material of an account. ie after logging out.
+
+        Args:
+            account (str): name of account
+        """
+        with self.lock:
+            self._load()
+
+            if self.entries.pop(account, None) is not None:
+                self._save()
+
+    def _load(self):
+        if not self.path:
+            return
+
+        try:
+            modified = os.stat(self.path).st_mtime_ns
+
+        except OSError:
+            return
+
+        if modified == self.modified:
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                self.entries = json.load(file)
+                self.modified = modified
+
+        except (OSError, ValueError):
+            pass
+
+    def _save(self):
+        if not self.path:
+            return
+
+        temp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+
+        # readers on other workers never see a partial file
+        with open(descriptor, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file, separators=(',', ':'))
+
+        os.replace(temp_path, self.path)
+
+        self.modified = os.stat(self.path).st_mtime_ns
+
+    def __init__(self, path: str = AUTH_FILE) -> None:
+        self.path = path
+        self.entries: Dict[str, Dict[str, any]] = {}
+        self.modified = None
+        self.lock = threading.Lock()
+
+
+def create_auth_cache(path: str = AUTH_FILE) -> AuthCache:
+    """
+    Factory function for `AuthCache`.
+
+    Args:
+        path (str, optional): path of JSON file. Defaults to `AUTH_FILE`.
+
+    Returns:
+        AuthCache: an instance of `AuthCache`
+    """
+    return AuthCache(path)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Defines functions and classes for buffering results of a `Scraper` job.
+"""
+import threading
+from typing import List, Tuple
+
+BUFFER_SIZE = 1000
+
+class ResultBuffer:
+    """
+    Fixed size ring buffer holding the latest results of a job.
+
+    Every result gets a sequence number, starting at 1, that is also used as its
+    cursor once stored. Results stay in the buffer after they are flushed until
+    newer results overwrite them.
+
+    Args:
+        capacity (int, optional): maximum number of results kept in memory.
+                                  Defaults to `BUFFER_SIZE`
+    """
+
+    @property
+    def first_seq(self) -> int:
+        """
+        Returns the sequence number of the oldest result in the buffer.
+
+        Returns:
+            int: sequence number
+        """
+        return max(1, self.last_seq - self.capacity + 1)
+
+    def full(self) -> bool:
+        """
+        Checks if every slot holds a result that has not been flushed.
+
+        Returns:
+            bool: `True` if results must be flushed before more are appended
+        """
+        return self.last_seq - self.flushed_seq >= self.capacity
+
+    def append(self, result: dict) -> int:
+        """
+        Adds a result to the buffer.
+
+        Args:
+            result (dict): result yielded by `Script.execute()`
+
+        Raises:
+            OverflowError: if the buffer is `full()`
+
+        Returns:
+            int: sequence number of result
+        """
+        with self.lock:
+            if self.full():
+                raise OverflowError('flush results before appending more')
+
+            self.last_seq += 1
+            self.slots[self.last_seq % self.capacity] = result
+
+            return self.last_seq
+
+    def pending(self) -> List[Tuple[int, dict]]:
+        """
+        Returns results that have not been flushed yet.
+
+        Returns:
+            List[Tuple[int, dict]]: `(seq, result)` pairs, oldest first
+        """
+        return self.read(self.flushed_seq)
+
+    def mark_flushed(self, seq: int):
+        """
+        Marks results up to `seq` as stored so that their slots can be reused.
+
+        Args:
+            seq (int): sequence number of last stored result
+        """
+        with self.lock:
+            self.flushed_seq = max(self.flushed_seq, min(seq, self.last_seq))
+
+    def covers(self, since: int) -> bool:
+        """
+        Checks if the results after `since` can be read from the buffer.
+
+        Args:
+            since (int): cursor returned by a previous read
+
+        Returns:
+            bool: `True` if no result after `since` has been overwritten
+        """
+        return since + 1 >= self.first_seq
+
+    def read(self, since: int = 0, limit: int = None) -> List[Tuple[int, dict]]:
+        """
+        Returns results after `since`. Only touches the returned slots.
+
+        Args:
+            since (int, optional): cursor returned by a previous read. Defaults to 0.
+            limit (int, optional): maximum number of results. Defaults to None.
+
+        Raises:
+            KeyError: if results after `since` have been overwritten. See `covers()`
+
+        Returns:
+            List[Tuple[int, dict]]: `(seq, result)` pairs, oldest first
+        """
+        with self.lock:
+            if not self.covers(since):
+                raise KeyError(f'results after {since} are no longer buffered')
+
+            last_seq = self.last_seq
+
+            if limit is not None:
+                last_seq = min(last_seq, since + limit)
+
+            return [
+                (seq, self.slots[seq % self.capacity])
+                for seq in range(since + 1, last_seq + 1)
+            ]
+
+    def __len__(self) -> int:
+        return self.last_seq - self.first_seq + 1 if self.last_seq else 0
+
+    def __init__(self, capacity: int = BUFFER_SIZE) -> None:
+        if capacity < 1:
+            raise TypeError('capacity should be an number larger than 0')
+
+        self.capacity = capacity
+        self.slots = [None] * capacity
+        self.last_seq = 0
+        self.flushed_seq = 0
+        self.lock = threading.Lock()
+
+
+def create_buffer(capacity: int = BUFFER_SIZE) -> ResultBuffer:
+    """
+    Factory function for `ResultBuffer`.
+
+    Args:
+        capacity (int, optional): maximum number of results kept in memory.
+                                  Defaults to `BUFFER_SIZE`
+
+    Returns:
+        ResultBuffer: an instance of `ResultBuffer`
+    """
+    return ResultBuffer(capacity)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Defines functions and classes for caching API responses in memory and on disk.
+"""
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List
+
+CACHE_SIZE = int(os.environ.get('SCRAPER_CACHE_SIZE', 1000))
+CACHE_TTL = int(os.environ.get('SCRAPER_CACHE_TTL', 24 * 3600))
+CACHE_DIR = os.environ.get('SCRAPER_CACHE_DIR')
+
+class ResponseCache:
+    """
+    Keeps the `size` most recently used responses in memory for `ttl` seconds.
+    Entries are also written to `directory` when set, so they outlive the worker and
+    are shared with other workers. Evicted entries are removed from `directory` too,
+    so it holds at most `size` entries per worker.
+
+    Entries keep the `etag` and `modified` validators of their response, so expired
+    entries can be revalidated with a conditional request instead of fetched again.
+
+    Args:
+        size (int, optional): maximum number of entries in memory. Defaults to `CACHE_SIZE`.
+        ttl (int, optional): seconds entries are fresh. Defaults to `CACHE_TTL`.
+        directory (str, optional): directory of entries on disk. Defaults to `CACHE_DIR`.
+    """
+
+    def get(self, key: str) -> any:
+        """
+        Returns the value of a fresh entry. Counted as a hit or miss.
+
+        Args:
+            key (str): key of entry. ie profile id
+
+        Returns:
+            any: cached value or `None` if missing or expired
+        """
+        entry = self.get_entry(key)
+
+        with self.lock:
+            if entry is None or self.is_expired(entry):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+            return entry['value']
+
+    def get_entry(self, key: str) -> Dict[str, any]:
+        """
+        Returns an entry even if expired. Used to revalidate entries.
+
+        Args:
+            key (str): key of entry
+
+        Returns:
+            Dict[str, any]: `value`, `etag`, `modified` and `stored` time of entry or
+                            `None` if missing
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None:
+                self.entries.move_to_end(key)
+                return entry
+
+        entry = self._read(key)
+
+        if entry is not None:
+            with self.lock:
+                evicted = self._add(key, entry)
+
+            self._remove(evicted)
+
+        return entry
+
+    def set(self, key: str, value: any, etag: str = None, modified: str = None):
+        """
+        Adds or replaces an entry.
+
+        Args:
+            key (str): key of entry
+            value (any): JSON serializable value
+            etag (str, optional): `ETag` header of response. Defaults to None.
+            modified (str, optional): `Last-Modified` header of response. Defaults to None.
+        """
+        entry = {'value': value, 'etag': etag, 'modified': modified, 'stored': time.time()}
+
+        with self.lock:
+            evicted = self._add(key, entry)
+
+        self._remove(evicted)
+        self._write(key, entry)
+
+    def touch(self, key: str) -> any:
+        """
+        Marks an entry as fresh again after the server confirmed it has not changed.
+
+        Args:
+            key (str): key of entry
+
+        Returns:
+            any: cached value or `None` if missing
+        """
+        entry = self.get_entry(key)
+
+        if entry is None:
+            return None
+
+        entry = {**entry, 'stored': time.time()}
+
+        with self.lock:
+            self.revalidated += 1
+            evicted = self._add(key, entry)
+
+        self._remove(evicted)
+        self._write(key, entry)
+
+        return entry['value']
+
+    def is_expired(self, entry: Dict[str, any]) -> bool:
+        """
+        Validates if an entry is older than `ttl`.
+
+        Args:
+            entry (Dict[str, any]): see `get_entry()`
+
+        Returns:
+            bool: `True` if entry should be revalidated
+        """
+        return time.time() - entry['stored'] > self.ttl
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the number of hits and misses. Used for monitoring.
+
+        Returns:
+            Dict[str, float]: `hits`, `misses`, `revalidated`, `ratio` of hits to lookups
+                              and `size` of cache in memory
+        """
+        with self.lock:
+            total = self.hits + self.misses
+
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidated': self.revalidated,
+                'ratio': self.hits / total if total else 0,
+                'size': len(self.entries),
+            }
+
+    def _add(self, key: str, entry: Dict[str, any]) -> List[str]:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        evicted = []
+
+        # evict least recently used entries
+        while len(self.entries) > self.size:
+            evicted.append(self.entries.popitem(last=False)[0])
+
+        return evicted
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    def _read(self, key: str) -> Dict[str, any]:
+        if not self.directory:
+            return None
+
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as file:
+                return json.load(file)
+
+        except (OSError, ValueError):
+            return None
+
+    def _remove(self, keys: List[str]):
+        if not self.directory:
+            return
+
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+
+            except OSError:
+                pass
+
+    def _write(self, key: str, entry: Dict[str, any]):
+        if not self.directory:
+            return
+
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+
+        # readers on other workers never see a partial file
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(entry, file, separators=(',', ':'))
+
+        os.replace(temp_path, path)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __init__(
+        self,
+        size: int = CACHE_SIZE,
+        ttl: int = CACHE_TTL,
+        directory: str = CACHE_DIR,
+    ) -> None:
+        self.size = max(1, size)
+        self.ttl = ttl
+        self.directory = directory
+        self.entries: Dict[str, Dict[str, any]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+
+def create_cache(
+    size: int = CACHE_SIZE,
+    ttl: int = CACHE_TTL,
+    directory: str = CACHE_DIR,
+) -> ResponseCache:
+    """
+    Factory function for `ResponseCache`.
+
+    Args:
+        size (int, optional): maximum number of entries in memory. Defaults to `CACHE_SIZE`.
+        ttl (int, optional): seconds entries are fresh. Defaults to `CACHE_TTL`.
+        directory (str, optional): directory of entries on disk. Defaults to `CACHE_DIR`.
+
+    Returns:
+        ResponseCache: an instance of `ResponseCache`
+    """
+    return ResponseCache(size, ttl, directory)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Defines functions and classes for finding the website and account a url points to.
+"""
+import re
+from typing import Dict, Pattern, Tuple
+from urllib.parse import unquote, urlsplit
+
+from .dedup import normalize_url
+
+# platform: (host suffixes, pattern matching the path of profile urls).
+# The first non empty group of a pattern is the handle or profile id.
+PLATFORMS = {
+    'linkedin': (
+        ('linkedin.com',),
+        r'/(?:in|pub)/([^/?]+)',
+    ),
+    'twitter': (
+        ('twitter.com', 'x.com'),
+        r'/(?!(?:home|search|hashtag|i|intent|share|explore|settings|login|signup)(?:[/?]|$))'
+        r'(\w{1,15})(?:[/?]|$)',
+    ),
+    'facebook': (
+        ('facebook.com', 'fb.com'),
+        r'/(?:profile\.php\?(?:.*&)?id=(\d+)|people/[^/?]+/(\d+)|'
+        r'(?!(?:pages|groups|events|watch|public|login|search|sharer|hashtag|[\w.]+\.php)(?:[/?]|$))'
+        r'([\w.]{5,})(?:[/?]|$))',
+    ),
+    'instagram': (
+        ('instagram.com',),
+        r'/(?!(?:p|reel|reels|explore|stories|accounts|tv)(?:[/?]|$))([\w.]{1,30})(?:[/?]|$)',
+    ),
+    'github': (
+        ('github.com',),
+        r'/(?!(?:about|features|pricing|topics|orgs|search|login|marketplace|sponsors|explore|'
+        r'settings|collections|trending)(?:[/?]|$))([A-Za-z0-9-]{1,39})(?:[/?]|$)',
+    ),
+    # search engine links are never profiles
+    'google': (
+        ('google.com', 'googleusercontent.com'),
+        None,
+    ),
+}
+
+class UrlClassifier:
+    """
+    Finds the platform and account of urls. Hosts are looked up by suffix in a dict
+    and only the pattern of the matching platform is run, so the cost of a url does not
+    grow with the number of platforms.
+
+    Args:
+        platforms (Dict[str, tuple], optional): host suffixes and profile pattern of each
+                                                platform. Defaults to `PLATFORMS`.
+    """
+
+    def classify(self, url: str) -> Tuple[str, str]:
+        """
+        Returns the platform and handle of a url. Google redirects are resolved first.
+        ie `https://www.linkedin.com/in/foo?trk=bar` returns `('linkedin', 'foo')`
+
+        Args:
+            url (str): absolute url
+
+        Returns:
+            Tuple[str, str]: platform or `None` for other websites, and handle or profile id
+                             or `None` if url is not a profile
+        """
+        parts = urlsplit(normalize_url(url))
+        platform = self.platform(parts.hostname or '')
+
+        if platform is None or self.patterns[platform] is None:
+            return platform, None
+
+        path = f'{parts.path}?{parts.query}' if parts.query else parts.path
+        match = self.patterns[platform].match(path)
+
+        if match is None:
+            return platform, None
+
+        return platform, unquote(next(group for group in match.groups() if group))
+
+    def canonical(self, url: str) -> str:
+        """
+        Returns a key shared by all urls of the same profile.
+        ie `https://uk.linkedin.com/in/foo` and `https://www.linkedin.com/in/foo/` both
+        return `linkedin:foo`
+
+        Args:
+            url (str): absolute url
+
+        Returns:
+            str: `platform:handle` of profile urls or the normalised url of other urls.
+                 See `normalize_url()`
+        """
+        platform, handle = self.classify(url)
+
+        if handle is None:
+            return normalize_url(url)
+
+        return f'{platform}:{handle}'
+
+    def platform(self, host: str) -> str:
+        """
+        Returns the platform of a host or any of its parent domains.
+
+        Args:
+            host (str): lower case host name. ie `uk.linkedin.com`
+
+        Returns:
+            str: platform or `None` for other websites
+        """
+        labels = host.split('.')
+
+        for index in range(len(labels) - 1):
+            platform = self.hosts.get('.'.join(labels[index:]))
+
+            if platform is not None:
+                return platform
+
+        return None
+
+    def __init__(self, platforms: Dict[str, tuple] = None) -> None:
+        self.hosts: Dict[str, str] = {}
+        self.patterns: Dict[str, Pattern] = {}
+
+        for platform, (hosts, pattern) in (platforms or PLATFORMS).items():
+            self.hosts.update(dict.fromkeys(hosts, platform))
+            self.patterns[platform] = None if pattern is None else re.compile(pattern)
+
+
+def create_classifier(platforms: Dict[str, tuple] = None) -> UrlClassifier:
+    """
+    Factory function for `UrlClassifier`.
+
+    Args:
+        platforms (Dict[str, tuple], optional): host suffixes and profile pattern of each
+                                                platform. Defaults to `PLATFORMS`.
+
+    Returns:
+        UrlClassifier: an instance of `UrlClassifier`
+    """
+    return UrlClassifier(platforms)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Defines functions and classes for skipping results of a `Scraper` job that were already found.
+"""
+import hashlib
+import os
+import threading
+from typing import Callable, Set
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+from .jobstore import JobStore
+
+PERSIST_DEDUP = os.environ.get('SCRAPER_PERSIST_DEDUP', '0') == '1'
+DEDUP_TTL = int(os.environ.get('SCRAPER_DEDUP_TTL', 30 * 24 * 3600))
+TRACKING_PARAMS = {
+    '_ga', 'fbclid', 'gclid', 'igshid', 'mc_cid', 'mc_eid', 'msclkid', 'ref', 'ref_src',
+    'refid', 'si', 'trk', 'trkinfo', 'originalsubdomain',
+}
+TRACKING_PREFIXES = ('utm_',)
+MOBILE_SUBDOMAINS = ('www.', 'm.', 'mobile.')
+REDIRECT_PARAMS = ('q', 'url')
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def normalize_url(url: str) -> str:
+    """
+    Returns the canonical form of a url so that links to the same page compare equal.
+    ie `https://www.google.com/url?q=http://M.LinkedIn.com/in/foo/?trk=bar` becomes
+    `https://linkedin.com/in/foo`
+
+    Google redirects are resolved, tracking parameters and fragments are removed, the
+    scheme becomes `https`, the host is lower cased without `www.` or mobile subdomains,
+    remaining parameters are sorted and trailing slashes are removed.
+
+    Args:
+        url (str): absolute url
+
+    Returns:
+        str: normalised url
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').rstrip('.')
+
+    # resolve google redirects. ie `/url?q=`
+    if parts.path == '/url' and (host == 'google.com' or '.google.' in f'.{host}'):
+        params = dict(parse_qsl(parts.query))
+
+        for name in REDIRECT_PARAMS:
+            if params.get(name, '').startswith(('http://', 'https://')):
+                return normalize_url(params[name])
+
+    for prefix in MOBILE_SUBDOMAINS:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+
+    scheme = parts.scheme.lower()
+
+    if parts.port and parts.port not in DEFAULT_PORTS.values():
+        host = f'{host}:{parts.port}'
+
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = quote(unquote(parts.path), safe='/:@!$&\'()*+,;=').rstrip('/')
+
+    return urlunsplit((
+        'https' if scheme in DEFAULT_PORTS else scheme,
+        host,
+        path,
+        urlencode(query),
+        '',
+    ))
+
+class DedupIndex:
+    """
+    Set of normalised urls found by a job. If a `store` is given then urls found by
+    earlier jobs with the same `scope` are also skipped.
+
+    Args:
+        store (JobStore, optional): store shared by all workers. Defaults to None.
+        scope (str, optional): jobs sharing urls. ie script path. Defaults to None.
+        canonical (Callable[[str], str], optional): returns the same value for urls of the
+                                                    same page. ie `UrlClassifier.canonical`.
+                                                    Defaults to `normalize_url`.
+    """
+
+    def add(self, url: str) -> bool:
+        """
+        Adds a url to the index.
+
+        Args:
+            url (str): absolute url
+
+        Returns:
+            bool: `True` if url was not found before and `False` if it is a duplicate
+        """
+        url = self.canonical(url)
+
+        with self.lock:
+            if url in self.urls:
+                self.hits += 1
+                return False
+
+            self.urls.add(url)
+
+        # url may have been found by an earlier job
+        if self.store is not None:
+            key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+            if not self.store.add_urls(self.scope, [key]):
+                with self.lock:
+                    self.hits += 1
+
+                return False
+
+        with self.lock:
+            self.misses += 1
+
+        return True
+
+    def stats(self) -> dict:
+        """
+        Returns the number of duplicate and new urls.
+
+        Returns:
+            dict: `hits` (duplicates) and `misses` (new urls)
+        """
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def __init__(
+        self,
+        store: JobStore = None,
+        scope: str = None,
+        canonical: Callable[[str], str] = None,
+    ) -> None:
+        self.store = store
+        self.scope = scope or ''
+        self.canonical = canonical or normalize_url
+        self.urls: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+
+def create_dedup_index(
+    store: JobStore = None,
+    scope: str = None,
+    canonical: Callable[[str], str] = None,
+) -> DedupIndex:
+    """
+    Factory function for `DedupIndex`.
+
+    Args:
+        store (JobStore, optional): store shared by all workers. Defaults to None.
+        scope (str, optional): jobs sharing urls. ie script path. Defaults to None.
+        canonical (Callable[[str], str], optional): returns the same value for urls of the
+                                                    same page. Defaults to `normalize_url`.
+
+    Returns:
+        DedupIndex: an instance of `DedupIndex`
+    """
+    return DedupIndex(store, scope, canonical)
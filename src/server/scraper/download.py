@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Defines functions and classes for downloading files for `Script` objects.
+"""
+from collections import OrderedDict
+import hashlib
+import os
+import tempfile
+import threading
+from typing import BinaryIO, Dict, Union
+from urllib.parse import urlparse
+
+import requests
+
+CHUNK_SIZE = 64 * 1024
+MAX_SESSIONS = 16
+
+class Downloader:
+    """
+    Streams files over HTTP in large chunks using one pooled `requests.Session` per key.
+    ie the `session_id` of the webdriver whose cookies are sent.
+
+    Args:
+        **chunk_size (int): bytes read per chunk. Defaults to `CHUNK_SIZE`
+        **max_sessions (int): number of sessions kept open. Defaults to `MAX_SESSIONS`
+    """
+
+    def session(self, key: str = None) -> requests.Session:
+        """
+        Returns the session for `key`. The least recently used session is closed once
+        more than `max_sessions` are open.
+
+        Args:
+            key (str, optional): session key. Defaults to None.
+
+        Returns:
+            requests.Session: pooled session
+        """
+        with self.lock:
+            if key in self.sessions:
+                self.sessions.move_to_end(key)
+                return self.sessions[key]
+
+            self.sessions[key] = requests.Session()
+
+            while len(self.sessions) > self.max_sessions:
+                _, session = self.sessions.popitem(last=False)
+                session.close()
+
+            return self.sessions[key]
+
+    def close(self, key: str = None):
+        """
+        Closes the session for `key`. ie once its webdriver has quit.
+
+        Args:
+            key (str, optional): session key. Defaults to None.
+        """
+        with self.lock:
+            session = self.sessions.pop(key, None)
+
+        if session is not None:
+            session.close()
+
+    def download(
+        self,
+        url: str,
+        target: Union[str, BinaryIO] = None,
+        **kwargs,
+    ) -> Union[str, BinaryIO]:
+        """
+        Downloads a file.
+
+        Args:
+            url (str): url of file to download
+            target (Union[str, BinaryIO], optional): path or file object to write to.
+                                                     Defaults to a file named after `url`
+                                                     in `directory`.
+            **directory (str): directory of downloaded files. Defaults to a temp directory
+            **key (str): session key. See `session()`
+            **headers (dict): request headers
+            **cookies (dict): request cookies
+            **dedup (bool): if `True` then files with the same url or content as a
+                            previous download in `directory` are not stored again.
+                            Defaults to `False`
+
+        Raises:
+            requests.HTTPError: if server does not return the file
+
+        Returns:
+            Union[str, BinaryIO]: path of downloaded file or `target` if it is a file object
+        """
+        directory = kwargs.get('directory') or tempfile.gettempdir()
+        dedup = kwargs.get('dedup', False) and not hasattr(target, 'write')
+
+        if dedup:
+            # same url is downloaded once even by concurrent jobs
+            with self.lock:
+                url_lock = self.url_locks.setdefault((directory, url), threading.Lock())
+
+            with url_lock:
+                return self._download(url, target, directory, dedup, kwargs)
+
+        return self._download(url, target, directory, dedup, kwargs)
+
+    def _download(
+        self,
+        url: str,
+        target: Union[str, BinaryIO],
+        directory: str,
+        dedup: bool,
+        kwargs: dict,
+    ) -> Union[str, BinaryIO]:
+        # same url was already downloaded
+        with self.lock:
+            path = self.urls.get((directory, url), '')
+
+        if dedup and os.path.isfile(path):
+            return path
+
+        response = self.session(kwargs.get('key')).get(
+            url,
+            headers=kwargs.get('headers'),
+            cookies=kwargs.get('cookies'),
+            stream=True,
+        )
+
+        with response:
+            response.raise_for_status()
+
+            if hasattr(target, 'write'):
+                for chunk in response.iter_content(self.chunk_size):
+                    target.write(chunk)
+
+                return target
+
+            path = target or self.filename(url, directory)
+            digest = hashlib.sha256()
+
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+            # write to a temp file so partial downloads are never seen
+            handle, temp = tempfile.mkstemp(dir=os.path.dirname(path) or '.')
+
+            try:
+                with os.fdopen(handle, 'wb') as file:
+                    for chunk in response.iter_content(self.chunk_size):
+                        digest.update(chunk)
+                        file.write(chunk)
+
+            except BaseException:
+                os.remove(temp)
+                raise
+
+        if not dedup:
+            os.replace(temp, path)
+            return path
+
+        with self.lock:
+            # same content was already downloaded
+            if os.path.isfile(self.hashes.get((directory, digest.hexdigest()), '')):
+                os.remove(temp)
+                path = self.hashes[(directory, digest.hexdigest())]
+            else:
+                os.replace(temp, path)
+                self.hashes[(directory, digest.hexdigest())] = path
+
+            self.urls[(directory, url)] = path
+
+        return path
+
+    def forget(self, directory: str):
+        """
+        Forgets files downloaded to `directory` with `dedup`. ie once it is deleted.
+
+        Args:
+            directory (str): directory of downloaded files
+        """
+        with self.lock:
+            for cache in (self.urls, self.hashes, self.url_locks):
+                for key in [key for key in cache if key[0] == directory]:
+                    cache.pop(key)
+
+    @staticmethod
+    def filename(url: str, directory: str) -> str:
+        """
+        Returns a path in `directory` named after `url` that is not used yet.
+
+        Args:
+            url (str): url of file to download
+            directory (str): directory of downloaded files
+
+        Returns:
+            str: path of file
+        """
+        name = os.path.basename(urlparse(url).path) or 'download'
+        base, ext = os.path.splitext(name)
+        path = os.path.join(directory, name)
+        count = 1
+
+        while os.path.exists(path):
+            path = os.path.join(directory, f'{base}-{count}{ext}')
+            count += 1
+
+        return path
+
+    def __init__(self, **kwargs) -> None:
+        self.chunk_size = kwargs.get('chunk_size', CHUNK_SIZE)
+        self.max_sessions = kwargs.get('max_sessions', MAX_SESSIONS)
+        self.sessions: Dict[str, requests.Session] = OrderedDict()
+        self.urls: Dict[tuple, str] = {}
+        self.hashes: Dict[tuple, str] = {}
+        self.url_locks: Dict[tuple, threading.Lock] = {}
+        self.lock = threading.Lock()
+
+
+def create_downloader(**kwargs) -> Downloader:
+    """
+    Factory function for `Downloader`.
+
+    Args:
+        **chunk_size (int): bytes read per chunk. Defaults to `CHUNK_SIZE`
+        **max_sessions (int): number of sessions kept open. Defaults to `MAX_SESSIONS`
+
+    Returns:
+        Downloader: an instance of `Downloader`
+    """
+    return Downloader(**kwargs)
+
+
+# shared by all scripts so that HTTP connections are reused
+downloader = create_downloader()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Defines functions and classes for capturing request headers sent by a browser.
+"""
+from contextlib import nullcontext
+import json
+import threading
+from typing import Dict, Iterable, List
+import weakref
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import Remote as WebDriver
+
+REQUEST_EVENT = 'Network.requestWillBeSent'
+
+class HeaderCapture:
+    """
+    Collects the headers of requests sent by a browser from its performance log.
+
+    The performance log only returns events added since it was last read, so headers
+    are kept between reads. Events are pre-filtered on their raw text and only events
+    that can match are parsed as JSON.
+
+    Args:
+        driver (WebDriver): `WebDriver` instance started with `performance_log`
+        url_filter (str): part of the url of captured requests. ie `/voyager/api`
+        exclude_headers (Iterable[str], optional): requests with any of these headers are
+                                                   ignored. Defaults to None.
+    """
+
+    def update(self) -> Dict[str, str]:
+        """
+        Reads new events of the performance log. Events are shared with the other
+        captures of the driver. See `PerformanceLog`.
+
+        Returns:
+            Dict[str, str]: headers of all matching requests sent so far. Later requests
+                            replace headers of earlier ones
+        """
+        driver = self.driver()
+
+        # driver may have been closed
+        if driver is not None:
+            create_performance_log(driver).read(self)
+
+        with self.lock:
+            return dict(self.headers)
+
+    def feed(self, raw_events: List[dict]):
+        """
+        Captures headers of matching requests.
+
+        Args:
+            raw_events (List[dict]): entries returned by `get_log('performance')`
+        """
+        with self.lock:
+            for raw_event in raw_events:
+                message: str = raw_event['message']
+
+                # cheap checks before parsing
+                if REQUEST_EVENT not in message or self.url_filter not in message:
+                    self.skipped += 1
+                    continue
+
+                self.parsed += 1
+
+                event = json.loads(message)['message']
+
+                if event.get('method') != REQUEST_EVENT:
+                    continue
+
+                request = event['params'].get('request')
+
+                if request is None or not self.matches(request):
+                    continue
+
+                self.headers.update(request['headers'])
+
+    def matches(self, request: dict) -> bool:
+        """
+        Validates if headers of a request should be captured.
+
+        Args:
+            request (dict): `request` of a `Network.requestWillBeSent` event
+
+        Returns:
+            bool: `True` if request is sent to `url_filter` without `exclude_headers`
+        """
+        return \
+            self.url_filter in request['url'] \
+            and not any(name in request['headers'] for name in self.exclude_headers)
+
+    def __init__(
+        self,
+        driver: WebDriver,
+        url_filter: str,
+        exclude_headers: Iterable[str] = None,
+    ) -> None:
+        # a strong reference would keep the driver in `captures` forever
+        self.driver = weakref.ref(driver)
+        self.url_filter = url_filter
+        self.exclude_headers = tuple(exclude_headers or ())
+        self.headers: Dict[str, str] = {}
+        self.lock = threading.Lock()
+        self.parsed = 0
+        self.skipped = 0
+
+
+class PerformanceLog:
+    """
+    Reads the performance log of a driver for all of its captures. Reading the log
+    removes its events, so every event is passed to each capture.
+
+    Args:
+        driver (WebDriver): `WebDriver` instance started with `performance_log`
+    """
+
+    def read(self, capture: HeaderCapture = None):
+        """
+        Reads new events and passes them to the captures of the driver.
+
+        Args:
+            capture (HeaderCapture, optional): capture that is not created by
+                                               `create_header_capture()`. Defaults to None.
+        """
+        with self.lock:
+            driver = self.driver()
+
+            # driver was closed
+            if driver is None:
+                return
+
+            try:
+                raw_events = driver.get_log('performance')
+
+            except WebDriverException:
+                # performance logging is disabled
+                return
+
+            targets = list(self.captures.values())
+
+            if capture is not None and capture not in targets:
+                targets.append(capture)
+
+            for target in targets:
+                target.feed(raw_events)
+
+    def __init__(self, driver: WebDriver) -> None:
+        # a strong reference would keep the driver in `captures` forever
+        self.driver = weakref.ref(driver)
+        # (url filter, excluded headers): capture
+        self.captures: Dict[tuple, HeaderCapture] = {}
+        self.lock = threading.Lock()
+
+
+# driver: performance log. Dropped with their driver
+captures = weakref.WeakKeyDictionary()
+captures_lock = threading.Lock()
+
+def create_performance_log(driver: WebDriver) -> PerformanceLog:
+    """
+    Returns the `PerformanceLog` of a driver, creating it on first use.
+
+    Args:
+        driver (WebDriver): `WebDriver` instance started with `performance_log`
+
+    Returns:
+        PerformanceLog: an instance of `PerformanceLog`
+    """
+    with captures_lock:
+        if driver not in captures:
+            captures[driver] = PerformanceLog(driver)
+
+        return captures[driver]
+
+def clear_captures(driver: WebDriver):
+    """
+    Drops the captures of a driver and the events it has not read. ie before the driver
+    is used by another job, so that its headers are not captured by the next job.
+
+    Args:
+        driver (WebDriver): `WebDriver` instance
+    """
+    with captures_lock:
+        log = captures.pop(driver, None)
+
+    with log.lock if log is not None else nullcontext():
+        try:
+            driver.get_log('performance')
+
+        except WebDriverException:
+            pass
+
+def create_header_capture(
+    driver: WebDriver,
+    url_filter: str,
+    exclude_headers: Iterable[str] = None,
+) -> HeaderCapture:
+    """
+    Returns the `HeaderCapture` of a driver, creating it on first use. Each driver has a
+    single capture per filter, fed by its `PerformanceLog`.
+
+    Args:
+        driver (WebDriver): `WebDriver` instance started with `performance_log`
+        url_filter (str): part of the url of captured requests. ie `/voyager/api`
+        exclude_headers (Iterable[str], optional): requests with any of these headers are
+                                                   ignored. Defaults to None.
+
+    Returns:
+        HeaderCapture: an instance of `HeaderCapture`
+    """
+    key = (url_filter, tuple(exclude_headers or ()))
+    log = create_performance_log(driver)
+
+    with log.lock:
+        if key not in log.captures:
+            log.captures[key] = HeaderCapture(driver, url_filter, exclude_headers)
+
+        return log.captures[key]
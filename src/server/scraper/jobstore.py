@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+"""
+Defines functions and classes for sharing `Scraper` jobs and results between workers.
+"""
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
+import os
+import socket
+import threading
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import create_engine, delete, func, insert, null, select, text, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from ..config import INSTANCE_DIR
+from ..models import Job, Result, SeenUrl, db
+
+# workers on the same host share the default database file
+DATABASE_URI = os.environ.get(
+    'DATABASE_URI',
+    'sqlite:///' + os.path.join(INSTANCE_DIR, 'scraper.db'),
+)
+STALE_AFTER = 600
+LOCK_KEY = 0x5C12A9E
+
+class JobStore:
+    """
+    Stores `Scraper` jobs and results in a SQL database so that every worker sees the same state.
+
+    Args:
+        database_uri (str, optional): SQLAlchemy database URI. Defaults to `DATABASE_URI`
+    """
+
+    @property
+    def owner(self) -> str:
+        """
+        Returns an id for the current worker process.
+
+        Returns:
+            str: `hostname:pid`
+        """
+        return f'{socket.gethostname()}:{os.getpid()}'
+
+    @contextmanager
+    def transaction(self) -> Iterator[Session]:
+        """
+        Returns a session whose transaction is committed on exit.
+
+        Yields:
+            Iterator[Session]: SQLAlchemy session
+        """
+        with self.lock, self.session.begin() as session:
+            yield session
+
+    def create_job(self, job: str, path: str, priority: int = 1, **kwargs):
+        """
+        Registers a new `queued` job.
+
+        Args:
+            job (str): job id
+            path (str): path to script in `/scrapper` directory
+            priority (int, optional): lower values are started first. Defaults to 1.
+            **client (str): API client that submitted the job
+            **domain (str): website scraped by the job
+            **slots (int): slots of `start_job()` limit held while running. Defaults to 1
+            **info (dict): initial progress information. See `set_info()`
+        """
+        with self.transaction() as session:
+            session.add(Job(
+                id=job,
+                path=path,
+                status='queued',
+                owner=self.owner,
+                priority=priority,
+                client=kwargs.get('client'),
+                domain=kwargs.get('domain'),
+                slots=kwargs.get('slots', 1),
+                info=kwargs.get('info'),
+            ))
+
+    def start_job(
+        self,
+        job: str,
+        limit: int,
+        script_limit: int = None,
+        domain_limit: int = None,
+    ) -> bool:
+        """
+        Moves a `queued` job to `running` if its slots are free on all workers. Slots
+        needed by queued jobs with a lower `priority` value are kept free.
+
+        Args:
+            job (str): job id
+            limit (int): maximum number of slots held by running jobs
+            script_limit (int, optional): maximum number of running jobs of the same script.
+                                          Defaults to None.
+            domain_limit (int, optional): maximum number of running jobs scraping the same
+                                          website. Defaults to None.
+
+        Returns:
+            bool: `True` if job was started and `False` otherwise
+        """
+        fresh = Job.updated > datetime.utcnow() - timedelta(seconds=STALE_AFTER)
+        running = select(func.count(Job.id)).where(Job.status == 'running', fresh)
+        held = select(func.coalesce(func.sum(Job.slots), 0)).where(Job.status == 'running', fresh)
+
+        with self.transaction() as session:
+            # serialize slot checks across workers
+            if self.engine.dialect.name == 'postgresql':
+                session.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': LOCK_KEY})
+
+            target = session.execute(
+                select(Job.path, Job.priority, Job.domain, Job.slots)
+                .where(Job.id == job, Job.status == 'queued')
+            ).first()
+
+            if target is None:
+                return False
+
+            waiting = select(func.coalesce(func.sum(Job.slots), 0)).where(
+                Job.status == 'queued',
+                Job.priority < target.priority,
+                fresh,
+            )
+            conditions = [
+                held.scalar_subquery() + waiting.scalar_subquery() + target.slots <= limit
+            ]
+
+            if script_limit:
+                conditions.append(
+                    running.where(Job.path == target.path).scalar_subquery() < script_limit
+                )
+
+            if domain_limit and target.domain:
+                conditions.append(
+                    running.where(Job.domain == target.domain).scalar_subquery() < domain_limit
+                )
+
+            result = session.execute(
+                update(Job)
+                .where(Job.id == job, Job.status == 'queued', *conditions)
+                .values(status='running', updated=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+
+            return result.rowcount == 1
+
+    def finish_job(self, job: str, status: str = 'done'):
+        """
+        Marks a job as finished.
+
+        Args:
+            job (str): job id
+            status (str, optional): final status. Defaults to 'done'.
+        """
+        with self.transaction() as session:
+            session.execute(
+                update(Job)
+                .where(Job.id == job)
+                .values(status=status, updated=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+
+    def heartbeat(self, job: str) -> bool:
+        """
+        Tells other workers that a job is still alive.
+
+        Args:
+            job (str): job id
+
+        Returns:
+            bool: `False` if job has been deleted and should stop
+        """
+        with self.transaction() as session:
+            result = session.execute(
+                update(Job)
+                .where(Job.id == job)
+                .values(updated=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+
+            return result.rowcount == 1
+
+    def heartbeat_jobs(self, jobs: List[str]) -> List[str]:
+        """
+        Tells other workers that several jobs are still alive.
+
+        Args:
+            jobs (List[str]): job ids
+
+        Returns:
+            List[str]: ids of jobs that have not been deleted
+        """
+        if not jobs:
+            return []
+
+        with self.transaction() as session:
+            session.execute(
+                update(Job)
+                .where(Job.id.in_(jobs))
+                .values(updated=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+
+            return session.execute(select(Job.id).where(Job.id.in_(jobs))).scalars().all()
+
+    def delete_job(self, job: str):
+        """
+        Deletes a job and its results.
+
+        Args:
+            job (str): job id
+        """
+        with self.transaction() as session:
+            session.execute(delete(Result).where(Result.job_id == job))
+            session.execute(delete(Job).where(Job.id == job))
+
+    def prune_jobs(self, max_age: int) -> List[str]:
+        """
+        Deletes finished jobs older than `max_age` seconds. Jobs of workers that stopped
+        are marked as `error` first, so they are deleted `max_age` seconds later.
+
+        Args:
+            max_age (int): age in seconds
+
+        Returns:
+            List[str]: deleted job ids
+        """
+        with self.transaction() as session:
+            # jobs of workers that stopped never finish
+            session.execute(
+                update(Job)
+                .where(
+                    Job.status.in_(['queued', 'running']),
+                    Job.updated < datetime.utcnow() - timedelta(seconds=STALE_AFTER),
+                )
+                .values(status='error', updated=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+
+            jobs = session.execute(
+                select(Job.id).where(
+                    Job.status.in_(['done', 'error', 'stopped']),
+                    Job.updated < datetime.utcnow() - timedelta(seconds=max_age),
+                )
+            ).scalars().all()
+
+            if jobs:
+                session.execute(delete(Result).where(Result.job_id.in_(jobs)))
+                session.execute(delete(Job).where(Job.id.in_(jobs)))
+
+        return jobs
+
+    def get_path(self, job: str) -> str:
+        """
+        Returns the script path of a job.
+
+        Args:
+            job (str): job id
+
+        Returns:
+            str: path to script in `/scrapper` directory or `None` if job does not exist
+        """
+        with self.transaction() as session:
+            return session.execute(select(Job.path).where(Job.id == job)).scalar()
+
+    def get_status(self, job: str) -> str:
+        """
+        Returns the status of a job.
+
+        Args:
+            job (str): job id
+
+        Returns:
+            str: status or `None` if job does not exist
+        """
+        with self.transaction() as session:
+            return session.execute(select(Job.status).where(Job.id == job)).scalar()
+
+    def set_info(self, job: str, info: dict):
+        """
+        Updates the progress information of a job. Keys missing from `info` are kept.
+
+        Args:
+            job (str): job id
+            info (dict): JSON serializable progress information
+        """
+        with self.transaction() as session:
+            current = session.execute(select(Job.info).where(Job.id == job)).scalar()
+            info = {**(current or {}), **info}
+
+            session.execute(
+                update(Job)
+                .where(Job.id == job)
+                .values(info=info, updated=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+
+    def get_info(self, job: str) -> dict:
+        """
+        Returns the progress information of a job.
+
+        Args:
+            job (str): job id
+
+        Returns:
+            dict: progress information or `None` if job does not exist
+        """
+        with self.transaction() as session:
+            row = session.execute(select(Job.info).where(Job.id == job)).first()
+
+        return None if row is None else row.info or {}
+
+    def add_urls(self, scope: str, keys: List[str]) -> List[str]:
+        """
+        Records urls found by a job so that later jobs can skip them.
+
+        Args:
+            scope (str): jobs sharing urls. ie script path
+            keys (List[str]): hashes of normalised urls. See `DedupIndex`
+
+        Returns:
+            List[str]: keys that were not recorded before
+        """
+        keys = list(dict.fromkeys(keys))
+
+        if not keys:
+            return []
+
+        try:
+            with self.transaction() as session:
+                seen = set(session.execute(
+                    select(SeenUrl.key).where(SeenUrl.scope == scope, SeenUrl.key.in_(keys))
+                ).scalars())
+                keys = [key for key in keys if key not in seen]
+
+                if keys:
+                    session.execute(insert(SeenUrl), [{'scope': scope, 'key': key} for key in keys])
+
+        # another worker recorded some of the urls first
+        except IntegrityError:
+            return self.add_urls(scope, keys)
+
+        return keys
+
+    def prune_urls(self, max_age: int):
+        """
+        Forgets urls recorded more than `max_age` seconds ago.
+
+        Args:
+            max_age (int): age in seconds
+        """
+        with self.transaction() as session:
+            session.execute(
+                delete(SeenUrl)
+                .where(SeenUrl.created < datetime.utcnow() - timedelta(seconds=max_age))
+            )
+
+    def get_jobs(self, path: str = None) -> List[str]:
+        """
+        Returns the ids of all jobs, or only the jobs running the script at `path`.
+
+        Args:
+            path (str, optional): path to script in `/scrapper` directory. Defaults to None.
+
+        Returns:
+            List[str]: job ids, oldest first
+        """
+        query = select(Job.id).order_by(Job.created, Job.id)
+
+        if path is not None:
+            query = query.where(Job.path == path)
+
+        with self.transaction() as session:
+            return session.execute(query).scalars().all()
+
+    def count_jobs(self, status: str, group_by: str = None) -> Dict[any, int]:
+        """
+        Counts the slots of jobs with `status` on all workers, ignoring jobs of workers that
+        stopped. Jobs hold one slot except batches. See `create_job()`.
+
+        Args:
+            status (str): job status. ie 'queued'
+            group_by (str, optional): `Job` column to count by. ie 'client'. Defaults to None.
+
+        Returns:
+            Dict[any, int]: number of slots per column value or `{None: count}` without
+                            `group_by`
+        """
+        column = getattr(Job, group_by) if group_by else null()
+        query = select(column, func.coalesce(func.sum(Job.slots), 0)).where(
+            Job.status == status,
+            Job.updated > datetime.utcnow() - timedelta(seconds=STALE_AFTER),
+        )
+
+        if group_by:
+            query = query.group_by(column)
+
+        with self.transaction() as session:
+            return dict(session.execute(query).all())
+
+    def add_results(self, job: str, rows: List[Tuple[int, dict]]) -> bool:
+        """
+        Stores results of a job with a single bulk insert.
+
+        Args:
+            job (str): job id
+            rows (List[Tuple[int, dict]]): `(seq, result)` pairs. See `ResultBuffer.pending()`
+
+        Returns:
+            bool: `False` if job has been deleted and should stop
+        """
+        if not rows:
+            return True
+
+        try:
+            with self.transaction() as session:
+                session.execute(
+                    insert(Result),
+                    [{'job_id': job, 'seq': seq, 'data': result} for seq, result in rows],
+                )
+
+        except IntegrityError:
+            return False
+
+        return True
+
+    def get_rows(self, job: str, since: int = 0, limit: int = None) -> List[Tuple[int, dict]]:
+        """
+        Returns a page of results of a job with the cursor of each result.
+        Results are kept and can be read again.
+
+        Args:
+            job (str): job id
+            since (int, optional): cursor returned by a previous call. Defaults to 0.
+            limit (int, optional): maximum number of results. Defaults to None.
+
+        Returns:
+            List[Tuple[int, dict]]: `(cursor, result)` pairs in the order they were stored
+        """
+        query = select(Result.seq, Result.data) \
+            .where(Result.job_id == job, Result.seq > since) \
+            .order_by(Result.seq) \
+            .limit(limit)
+
+        with self.transaction() as session:
+            rows = session.execute(query).all()
+
+        rows = [(row.seq, row.data) for row in rows]
+
+        # record read progress
+        if rows:
+            self.mark_read(job, rows[-1][0])
+
+        return rows
+
+    def mark_read(self, job: str, cursor: int):
+        """
+        Records that a client has read the results of a job up to `cursor`.
+
+        Args:
+            job (str): job id
+            cursor (int): cursor of last result read
+        """
+        with self.transaction() as session:
+            session.execute(
+                update(Job)
+                .where(Job.id == job, Job.read_cursor < cursor)
+                .values(read_cursor=cursor)
+                .execution_options(synchronize_session=False)
+            )
+
+    def get_read_cursor(self, job: str) -> int:
+        """
+        Returns the cursor of the furthest result of a job read by any client.
+
+        Args:
+            job (str): job id
+
+        Returns:
+            int: cursor or `None` if job does not exist
+        """
+        with self.transaction() as session:
+            return session.execute(select(Job.read_cursor).where(Job.id == job)).scalar()
+
+    def get_results(self, job: str, since: int = 0, limit: int = None) -> Tuple[List[dict], int]:
+        """
+        Returns a page of results of a job. Results are kept and can be read again.
+
+        Args:
+            job (str): job id
+            since (int, optional): cursor returned by a previous call. Defaults to 0.
+            limit (int, optional): maximum number of results. Defaults to None.
+
+        Returns:
+            Tuple[List[dict], int]: results in the order they were stored and
+                                    the cursor of the next page
+        """
+        rows = self.get_rows(job, since, limit)
+
+        return [result for _, result in rows], rows[-1][0] if rows else since
+
+    def _create_tables(self):
+        # a failure means another worker created a table first, so retries are bounded
+        for retries in range(len(db.Model.metadata.tables), -1, -1):
+            try:
+                db.Model.metadata.create_all(self.engine)
+                return
+
+            except OperationalError:
+                if not retries:
+                    raise
+
+    def __init__(self, database_uri: str = DATABASE_URI) -> None:
+        in_memory = database_uri in ('sqlite://', 'sqlite:///:memory:')
+        local = database_uri.startswith('sqlite:')
+        options = {}
+        self.lock = nullcontext()
+
+        # share a single in-memory database (and connection) between threads
+        if in_memory:
+            options['poolclass'] = StaticPool
+            options['connect_args'] = {'check_same_thread': False}
+            self.lock = threading.RLock()
+
+        elif local:
+            os.makedirs(os.path.dirname(database_uri[len('sqlite:///'):]) or '.', exist_ok=True)
+
+        self.engine = create_engine(database_uri, **options)
+        self.session = sessionmaker(bind=self.engine, future=True)
+
+        # SQLite databases are created here, others with `flask db upgrade`
+        if local:
+            self._create_tables()
+
+
+def create_job_store(database_uri: str = DATABASE_URI) -> JobStore:
+    """
+    Factory function for `JobStore`.
+
+    Args:
+        database_uri (str, optional): SQLAlchemy database URI. Defaults to `DATABASE_URI`
+
+    Returns:
+        JobStore: an instance of `JobStore`
+    """
+    return JobStore(database_uri)
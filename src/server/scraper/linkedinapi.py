@@ -2,34 +2,149 @@
 """
 Provides wrapper for Linkedin API using Selenium `WebDriver`
 """
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
 import logging
-import random
-import time
-from typing import Dict
+import os
+import threading
+from typing import Dict, Generator, Iterable, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.models import Response
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver import Remote as WebDriver
 from selenium.webdriver.common.by import By
 
+from .auth import AuthCache, create_auth_cache
+from .cache import ResponseCache, create_cache
+from .headers import create_header_capture
+from .ratelimit import AdaptiveLimiter, create_adaptive_limiter, parse_retry_after
+
 URL = 'https://www.linkedin.com/home'
 API_BASE = 'https://www.linkedin.com/voyager/api/'
+API_PATH = '/voyager/api'
+# headers of api calls that are not forwarded. ie prefetch requests
+API_EXCLUDE_HEADERS = ('content-type', 'x-li-deco-include-micro-schema', 'x-li-prefetch')
+RATE = float(os.environ.get('SCRAPER_LINKEDIN_RATE', 0.5))
+BURST = int(os.environ.get('SCRAPER_LINKEDIN_BURST', 1))
+MIN_RATE = float(os.environ.get('SCRAPER_LINKEDIN_MIN_RATE', 0.05))
+WORKERS = int(os.environ.get('SCRAPER_LINKEDIN_WORKERS', 4))
+RETRIES = int(os.environ.get('SCRAPER_LINKEDIN_RETRIES', 3))
+# statuses returned when LinkedIn is throttling requests or overloaded
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504, 999])
+# statuses returned when cookies or headers are no longer valid
+AUTH_STATUSES = frozenset([401, 403])
+# name of account in `stored_auth` used by default
+ACCOUNT = 'linkedin'
+
+# account: rate limit shared by all `LinkedInAPI` instances of this worker
+limiters: Dict[str, AdaptiveLimiter] = {}
+limiters_lock = threading.Lock()
+# profile id: profile, shared by all `LinkedInAPI` instances of this worker
+profile_cache = create_cache()
+# account: cookies and headers of logged in sessions, shared with other workers
+stored_auth = create_auth_cache()
+
+def get_account(cookies: requests.cookies.RequestsCookieJar) -> str:
+    """
+    Returns a key identifying the LinkedIn account or session of cookies.
+
+    Args:
+        cookies (RequestsCookieJar): cookies of a logged in session
+
+    Returns:
+        str: hash of session cookie. Cookies are never exposed
+    """
+    token = cookies.get('li_at') or cookies.get('JSESSIONID') or ''
+
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+def get_limiter(account: str) -> AdaptiveLimiter:
+    """
+    Returns the rate limit shared by all API calls of an account.
+
+    Args:
+        account (str): key returned by `get_account()`
+
+    Returns:
+        AdaptiveLimiter: rate limit of account
+    """
+    with limiters_lock:
+        if account not in limiters:
+            limiters[account] = create_adaptive_limiter(RATE, BURST, min_rate=MIN_RATE)
+
+        return limiters[account]
+
+def get_limiter_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Returns the current rate and backoff of each account. Used for monitoring.
+
+    Returns:
+        Dict[str, Dict[str, float]]: account: see `AdaptiveLimiter.stats()`
+    """
+    with limiters_lock:
+        accounts = dict(limiters)
+
+    return {account: limiter.stats() for account, limiter in accounts.items()}
+
+def save_auth(driver: WebDriver, account: str = ACCOUNT, cache: AuthCache = None) -> dict:
+    """
+    Stores the cookies and headers of a logged in session, so `LinkedInAPI` instances can
+    be created without a driver. Called after logging in.
+
+    Args:
+        driver (WebDriver): `WebDriver` instance logged in to LinkedIn
+        account (str, optional): name of account. Defaults to `ACCOUNT`.
+        cache (AuthCache, optional): where to store auth. Defaults to `stored_auth`.
+
+    Returns:
+        dict: stored auth. See `AuthCache.get()`
+    """
+    auth = LinkedInAPI.get_auth(driver)
+
+    return (stored_auth if cache is None else cache).set(account, **auth)
 
 
 class LinkedInAPI():
     """
     Wraps LinkedIn API requests to a Selenium `WebDriver` instance
 
+    Cookies and headers are read from `stored_auth`, so clients can be created without
+    loading a page. `driver` is only used if nothing is stored for `account` yet, or if
+    calls are answered with `401` / `403` and nothing newer was stored.
+
     Args:
-        driver (WebDriver): `WebDriver` isntance
+        driver (WebDriver): `WebDriver` isntance or `None` to use stored auth
+        limiter (AdaptiveLimiter, optional): rate limit of API calls. Defaults to the
+                                             limiter of the logged in account.
+        workers (int, optional): maximum number of parallel API calls. Defaults to `WORKERS`.
+        retries (int, optional): number of times throttled calls are retried.
+                                 Defaults to `RETRIES`.
+        cache (ResponseCache, optional): cache of profiles. Defaults to `profile_cache`.
+        account (str, optional): name of account in `stored_auth`. Defaults to `ACCOUNT`.
+        auth_cache (AuthCache, optional): stored auth. Defaults to `stored_auth`.
 
     Raises:
         TypeError: if `driver` is not an instance of `WebDriver`
-        TypeError: if `driver` session is not logged in
+        TypeError: if no auth is stored for `account` and `driver` is `None` or not
+                   logged in
     """
 
+    @property
+    def auth(self) -> Dict[str, any]:
+        """
+        Returns the auth used by new calls.
+
+        Returns:
+            Dict[str, any]: see `AuthCache.get()`
+        """
+        return self.credentials[0]
+
     @staticmethod
     def is_logged_in(driver: WebDriver) -> bool:
         """
@@ -70,30 +185,10 @@ class LinkedInAPI():
         if not 'linkedin.com' in driver.current_url:
             driver.get(URL)
 
-        # loop through logs
-        headers = {}
-
-        for raw_event in driver.get_log('performance'):
-            event = json.loads(raw_event['message'])['message']
-
-            # filter out requests
-            if 'Network.requestWillBeSent' not in event['method']:
-                continue
-
-            # filter out api calls
-            if \
-                'request' not in event['params'] \
-                or '/voyager/api' not in event['params']['request']['url'] \
-                or 'content-type' in event['params']['request']['headers'] \
-                or 'x-li-deco-include-micro-schema' in event['params']['request']['headers'] \
-                or 'x-li-prefetch' in event['params']['request']['headers'] \
-            :
-                continue
-
-            # parse headers
-            headers.update(event['params']['request']['headers'])
+        # only events logged since last call are parsed
+        capture = create_header_capture(driver, API_PATH, API_EXCLUDE_HEADERS)
 
-        return headers
+        return capture.update()
 
     @staticmethod
     def get_cookies(driver: WebDriver) -> Dict[str, str]:
@@ -124,6 +219,34 @@ class LinkedInAPI():
 
         return cookies
 
+    @staticmethod
+    def get_auth(driver: WebDriver) -> Dict[str, any]:
+        """
+        Retrieves cookies and headers from `WebDriver` instance in a form that can be
+        serialized. See `AuthCache.set()`.
+
+        Args:
+            driver (WebDriver): `WebDriver` isntance
+
+        Returns:
+            Dict[str, any]: `cookies` and `headers`
+        """
+        cookies = LinkedInAPI.get_cookies(driver)
+
+        return {
+            'cookies': [
+                {
+                    'name': cookie.name,
+                    'value': cookie.value,
+                    'domain': cookie.domain,
+                    'path': cookie.path,
+                    'secure': cookie.secure,
+                }
+                for cookie in cookies
+            ],
+            'headers': LinkedInAPI.get_headers(driver),
+        }
+
     @staticmethod
     def sanitize_path(path: str) -> str:
         """
@@ -139,37 +262,159 @@ class LinkedInAPI():
 
     def call(self, path: str, **kwargs) -> Response:
         """
-        Makes call to LinkedIn API.
+        Makes call to LinkedIn API. Throttled calls slow down the limiter of the account
+        and are retried after `Retry-After` or an exponential backoff with jitter.
+        Unauthorized calls are retried once with refreshed auth.
 
         Args:
             path (str): path to voyager api
             **kwargs (any): arguments forwarded to `Session.get()` / `Session.post()`
 
+        Raises:
+            requests.RequestException: if connection failed on every attempt
+
         Returns:
-            bool: [description]
+            Response: response of LinkedIn API
         """
         url = API_BASE + self.sanitize_path(path)
 
-        self.logger.debug('Making API call to: %s', url)
-        time.sleep(random.randint(10, 30) / 10)
+        for refreshed in (False, True):
+            # other threads may replace auth while the call is sent
+            credentials = self.credentials
+            response = self._request(url, credentials, **kwargs)
+
+            if \
+                response.status_code not in AUTH_STATUSES \
+                or refreshed \
+                or not self.refresh_auth(credentials[0]) \
+            :
+                break
+
+        # `304` answers a conditional request of `get_profile()`
+        if response.status_code not in (200, 304):
+            # error pages are not always JSON
+            self.logger.debug(
+                'Invalid response: %s %s',
+                response.status_code,
+                response.text[:200],
+            )
+
+        return response
+
+    def refresh_auth(self, auth: Dict[str, any]) -> bool:
+        """
+        Replaces cookies and headers rejected by LinkedIn. Auth stored by another
+        instance or worker is used first, `driver` is only used if nothing newer exists.
+
+        Args:
+            auth (Dict[str, any]): auth that was rejected
+
+        Returns:
+            bool: `True` if auth was replaced and `False` otherwise
+        """
+        with self.auth_lock:
+            # refreshed by another thread
+            if self.auth is not auth:
+                return True
+
+            stored = self.auth_cache.get(self.account)
+
+            if stored is not None and stored['stored'] != auth['stored']:
+                self.logger.debug('Using stored auth: %s', self.account)
+                self.set_auth(stored)
+                return True
+
+            if self.driver is None:
+                return False
+
+            self.logger.debug('Reading auth from driver: %s', self.account)
+
+            try:
+                self.set_auth(save_auth(self.driver, self.account, self.auth_cache))
+
+            except WebDriverException:
+                return False
+
+            return True
+
+    def set_auth(self, auth: Dict[str, any]):
+        """
+        Uses cookies and headers for future calls. Calls that were already sent by other
+        threads keep the auth they started with.
+
+        Args:
+            auth (Dict[str, any]): see `AuthCache.get()`
+        """
+        cookies = requests.cookies.RequestsCookieJar()
+
+        for cookie in auth['cookies']:
+            cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie['domain'],
+                path=cookie['path'],
+                secure=cookie['secure'],
+            )
+
+        # replaced at once, so threads never send a mix of old and new auth
+        self.credentials = (auth, dict(auth['headers']), cookies)
+
+    def _request(self, url: str, credentials: tuple, **kwargs) -> Response:
+        # the shared session only pools connections
+        _, headers, cookies = credentials
+        headers = {**headers, **(kwargs.pop('headers', None) or {})}
+
+        for attempt in range(self.retries + 1):
+            # wait for a slot shared with other threads
+            self.limiter.acquire()
+            self.logger.debug('Making API call to: %s', url)
 
-        # if 'data' in kwargs:
-        #     response = self.session.post(url, **kwargs)
-        # else:
-        response = self.session.get(url, **kwargs)
+            try:
+                # if 'data' in kwargs:
+                #     response = self.session.post(url, **kwargs)
+                # else:
+                response = self.session.get(url, headers=headers, cookies=cookies, **kwargs)
+
+            except (requests.ConnectionError, requests.Timeout):
+                self.limiter.throttle()
+
+                if attempt >= self.retries:
+                    raise
+
+                continue
+
+            if response.status_code not in RETRY_STATUSES:
+                self.limiter.recover()
+                break
+
+            delay = self.limiter.throttle(parse_retry_after(response.headers.get('Retry-After')))
 
-        if response.status_code != 200:
             self.logger.debug(
-                'Invalid response: %s',
+                'Throttled: %s, waiting %.1f seconds',
                 response.status_code,
-                extra=response.json(),
+                delay,
             )
 
+            if attempt >= self.retries:
+                break
+
         return response
 
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the current rate and backoff of API calls and hit ratio of profile cache.
+        Used for monitoring.
+
+        Returns:
+            Dict[str, float]: see `AdaptiveLimiter.stats()`. `cache` holds
+                              `ResponseCache.stats()`
+        """
+        return {**self.limiter.stats(), 'cache': self.cache.stats()}
+
     def get_profile(self, profile_id: str) -> Dict[str, any]:
         """
-        Queries LinkedIn API for a profile
+        Queries LinkedIn API for a profile. Profiles are cached and expired profiles are
+        revalidated with `If-None-Match` / `If-Modified-Since` when possible.
 
         Args:
             profile_id (str): LinkedIn id of profile to retrieve
@@ -177,36 +422,144 @@ class LinkedInAPI():
         Returns:
             Profile: returns a JSON object
         """
-        response = self.call(f'/identity/profiles/{profile_id}/profileView')
+        profile = self.cache.get(profile_id)
+
+        if profile is not None:
+            return profile
+
+        # conditional request for expired profile
+        entry = self.cache.get_entry(profile_id)
+        headers = {}
+
+        if entry is not None and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+
+        if entry is not None and entry['modified']:
+            headers['If-Modified-Since'] = entry['modified']
+
+        response = self.call(f'/identity/profiles/{profile_id}/profileView', headers=headers)
+
+        if response.status_code == 304 and entry is not None:
+            return self.cache.touch(profile_id)
+
+        profile = response.json()
+
+        if response.status_code == 200:
+            self.cache.set(
+                profile_id,
+                profile,
+                etag=response.headers.get('ETag'),
+                modified=response.headers.get('Last-Modified'),
+            )
+
+        return profile
+
+    def get_profiles(
+        self,
+        profile_ids: Iterable[str],
+        workers: int = None,
+    ) -> Generator[Tuple[str, Dict[str, any]], None, None]:
+        """
+        Generator function that queries LinkedIn API for several profiles in parallel.
+        Profiles are returned in the order they are received.
 
-        return response.json()
+        Args:
+            profile_ids (Iterable[str]): LinkedIn ids of profiles to retrieve
+            workers (int, optional): maximum number of parallel API calls.
+                                     Defaults to `workers` of instance.
 
-    def __init__(self, driver: WebDriver) -> None:
-        if not isinstance(driver, WebDriver):
+        Yields:
+            Generator[Tuple[str, Dict[str, any]], None, None]: profile id and JSON object,
+                                                              or `None` if call failed
+        """
+        workers = min(workers or self.workers, self.workers)
+
+        with ThreadPoolExecutor(workers) as executor:
+            futures = {
+                executor.submit(self.get_profile, profile_id): profile_id
+                for profile_id in dict.fromkeys(profile_ids)
+            }
+
+            try:
+                for future in as_completed(futures):
+                    profile_id = futures[future]
+
+                    try:
+                        yield profile_id, future.result()
+
+                    except (requests.RequestException, ValueError) as err:
+                        self.logger.debug('Failed to get profile: %s (%s)', profile_id, err)
+                        yield profile_id, None
+
+            finally:
+                # consumer stopped early
+                for future in futures:
+                    future.cancel()
+
+    def __init__(
+        self,
+        driver: WebDriver = None,
+        limiter: AdaptiveLimiter = None,
+        workers: int = WORKERS,
+        retries: int = RETRIES,
+        cache: ResponseCache = None,
+        account: str = ACCOUNT,
+        auth_cache: AuthCache = None,
+    ) -> None:
+        self.driver = driver
+        self.account = account
+        self.auth_cache = stored_auth if auth_cache is None else auth_cache
+        self.auth_lock = threading.Lock()
+
+        if driver is not None and not isinstance(driver, WebDriver):
             raise TypeError('`driver` must be an instance of `WebDriver`')
 
-        if not self.is_logged_in(driver):
-            raise TypeError('`driver` must be logged in already')
+        # `driver` is only used when nothing is stored or stored auth is rejected
+        auth = self.auth_cache.get(account)
+
+        if auth is None:
+            if driver is None:
+                raise TypeError(f'`driver` is required until auth is stored for {account}')
+
+            if not self.is_logged_in(driver):
+                raise TypeError('`driver` must be logged in already')
+
+            auth = save_auth(driver, account, self.auth_cache)
 
         self.logger = logging.Logger(__file__)
+        self.workers = max(1, int(workers))
+        self.retries = max(0, int(retries))
+        self.cache = profile_cache if cache is None else cache
         self.session = requests.session()
 
-        self.session.cookies.update(self.get_cookies(driver))
-        self.session.headers.update(self.get_headers(driver))
+        # keep a connection open for each parallel call
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=self.workers))
+
+        self.set_auth(auth)
+
+        self.limiter = limiter or get_limiter(get_account(self.credentials[2]))
 
 
-def create_linkedinapi(driver: WebDriver) -> LinkedInAPI:
+def create_linkedinapi(driver: WebDriver = None, **kwargs) -> LinkedInAPI:
     """
     Creates a `LinkedInAPI` instance.
 
     Args:
-        driver (WebDriver): `WebDriver` isntance
+        driver (WebDriver): `WebDriver` isntance or `None` to use stored auth
+        **limiter (AdaptiveLimiter): rate limit of API calls. Defaults to the limiter of
+                                     the logged in account.
+        **workers (int): maximum number of parallel API calls. Defaults to `WORKERS`.
+        **retries (int): number of times throttled calls are retried. Defaults to `RETRIES`.
+        **cache (ResponseCache): cache of profiles. Defaults to `profile_cache`.
+        **account (str): name of account in `stored_auth`. Defaults to `ACCOUNT`.
+        **auth_cache (AuthCache): stored auth. Defaults to `stored_auth`.
 
     Raises:
         TypeError: if `driver` is not an instance of `WebDriver`
-        TypeError: if `driver` session is not logged in
+        TypeError: if no auth is stored for `account` and `driver` is `None` or not
+                   logged in
 
     Returns:
         LinkedInAPI: instance of `LinkedInAPI`
     """
-    return LinkedInAPI(driver)
+    return LinkedInAPI(driver, **kwargs)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Defines functions and classes for reading links from pages fetched without a browser.
+"""
+from html.parser import HTMLParser
+from typing import Iterable, List
+from urllib.parse import urljoin
+
+# elements that are never closed
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param',
+    'source', 'track', 'wbr',
+])
+
+class LinkParser(HTMLParser):
+    """
+    Collects the href and text of `<a>` elements. Same as `Script.extract_links()`.
+
+    Args:
+        base_url (str): url of page. Used to resolve relative links
+        ids (Iterable[str], optional): only collect links inside elements with one of
+                                       these ids. Defaults to None (every link).
+    """
+
+    def handle_starttag(self, tag: str, attrs: list):
+        attrs = dict(attrs)
+
+        if tag in VOID_ELEMENTS:
+            return
+
+        self.stack.append(tag)
+
+        if self.ids is not None and attrs.get('id') in self.ids:
+            self.containers.append(len(self.stack))
+
+        if tag == 'a' and attrs.get('href') is not None and (self.ids is None or self.containers):
+            self.link = {'href': urljoin(self.base_url, attrs['href']), 'text': []}
+            self.anchor = len(self.stack)
+
+    def handle_startendtag(self, tag: str, attrs: list):
+        # `<a />` has no text or children
+        if tag not in VOID_ELEMENTS:
+            self.handle_starttag(tag, attrs)
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str):
+        if tag not in self.stack:
+            return
+
+        # close elements left open. ie `<p>`
+        while self.stack:
+            if self.link is not None and len(self.stack) == self.anchor:
+                self.links.append({
+                    'href': self.link['href'],
+                    'text': ' '.join(' '.join(self.link['text']).split()),
+                })
+                self.link = None
+
+            if self.containers and len(self.stack) == self.containers[-1]:
+                self.containers.pop()
+                self.found += 1
+
+            if self.stack.pop() == tag:
+                break
+
+    def handle_data(self, data: str):
+        if self.link is not None:
+            self.link['text'].append(data)
+
+    def __init__(self, base_url: str, ids: Iterable[str] = None) -> None:
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.ids = None if ids is None else frozenset(ids)
+        self.stack: List[str] = []
+        self.containers: List[int] = []
+        self.links: List[dict] = []
+        self.link: dict = None
+        self.anchor = 0
+        self.found = 0
+
+
+def parse_links(html: str, base_url: str, ids: Iterable[str] = None) -> List[dict]:
+    """
+    Returns the links of a page in document order.
+
+    Args:
+        html (str): page source
+        base_url (str): url of page. Used to resolve relative links
+        ids (Iterable[str], optional): only return links inside elements with one of
+                                       these ids. Defaults to None (every link).
+
+    Returns:
+        List[dict]: `href` and `text` of each link or `None` if `ids` are given and
+                    no element has one of them. ie an unexpected page
+    """
+    parser = LinkParser(base_url, ids)
+
+    parser.feed(html)
+    parser.close()
+
+    # close elements still open at the end of the page
+    while parser.stack:
+        parser.handle_endtag(parser.stack[-1])
+
+    if ids is not None and not parser.found:
+        return None
+
+    return parser.links
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Defines functions and classes for managing a pool of warm `WebDriver` sessions.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import Remote as WebDriver
+
+from .download import downloader
+from .headers import clear_captures
+
+MAX_SESSIONS = int(os.environ.get('SE_NODE_MAX_SESSIONS', 16))
+MAX_IDLE = int(os.environ.get('SE_NODE_SESSION_TIMEOUT', 60)) - 10
+MAX_USES = 20
+ACQUIRE_TIMEOUT = int(os.environ.get('SCRAPER_ACQUIRE_TIMEOUT', 300))
+
+def pool_key(**kwargs) -> tuple:
+    """
+    Returns a hashable key for options passed to `create_driver()`.
+
+    Args:
+        **kwargs (any): options forwarded to `create_driver()`
+
+    Returns:
+        tuple: sorted `(name, value)` pairs
+    """
+    return tuple(sorted((name, repr(value)) for name, value in kwargs.items()))
+
+class DriverPool:
+    """
+    Bounded pool of pre-warmed selenium `WebDriver` sessions.
+
+    Sessions are keyed by the options they were created with. They are reset
+    and health checked between jobs and recycled after `max_uses` jobs. Saved sessions
+    are stopped once released so that their profile is not locked by an idle browser.
+
+    Args:
+        factory (Callable[..., WebDriver]): function used to create sessions. ie `create_driver`
+        **max_size (int): maximum number of sessions (idle and in use).
+                          Defaults to `MAX_SESSIONS`
+        **max_uses (int): number of jobs before a session is recycled. Defaults to `MAX_USES`
+        **max_idle (int): seconds an idle session is kept. Defaults to `MAX_IDLE`
+        **timeout (float): seconds `acquire()` waits for a free session.
+                           Defaults to `ACQUIRE_TIMEOUT`
+    """
+
+    @staticmethod
+    def is_healthy(driver: WebDriver) -> bool:
+        """
+        Checks that a session is still alive on the selenium grid.
+
+        Args:
+            driver (WebDriver): session to check
+
+        Returns:
+            bool: `True` if session responds and `False` otherwise
+        """
+        try:
+            return bool(driver.session_id) and driver.current_url is not None
+
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def reset(driver: WebDriver, cookies = True):
+        """
+        Returns a session to a blank state before it is reused.
+
+        Args:
+            driver (WebDriver): session to reset
+            cookies (bool, optional): If `True` will delete all cookies. Defaults to True.
+        """
+        # close extra tabs
+        handles = driver.window_handles
+
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+
+        driver.switch_to.window(handles[0])
+
+        if cookies:
+            driver.delete_all_cookies()
+
+        driver.get('about:blank')
+
+        # requests of the previous job are not captured by the next one
+        clear_captures(driver)
+
+    def limit(self, **kwargs) -> int:
+        """
+        Returns the maximum number of sessions that can share `kwargs`.
+
+        Chrome locks its `--user-data-dir` so only one saved session can run at a time.
+
+        Args:
+            **kwargs (any): options forwarded to `create_driver()`
+
+        Returns:
+            int: maximum number of sessions
+        """
+        if kwargs.get('save_session'):
+            return 1
+
+        return self.max_size
+
+    def acquire(self, **kwargs) -> WebDriver:
+        """
+        Returns a healthy session created with `kwargs`. Creates one if none are idle.
+
+        Args:
+            **kwargs (any): options forwarded to `factory`
+
+        Raises:
+            TimeoutError: if no session becomes available within `timeout`
+
+        Returns:
+            WebDriver: session to use for scraping
+        """
+        key = pool_key(**kwargs)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+
+        with self.condition:
+            while True:
+                driver = self._pop_idle(key)
+
+                if driver is not None:
+                    break
+
+                if self.size < self.max_size and self.count(key) < self.limit(**kwargs):
+                    self.size += 1
+                    self.pending[key] = self.pending.get(key, 0) + 1
+                    break
+
+                # make room by dropping an idle session created with other options
+                if self.size >= self.max_size and self._evict_idle():
+                    continue
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError('No selenium session available')
+
+                self.condition.wait(remaining)
+
+        if driver is not None:
+            if self.is_healthy(driver):
+                return driver
+
+            self.discard(driver)
+
+            return self.acquire(**kwargs)
+
+        return self._create(key, **kwargs)
+
+    def release(self, driver: WebDriver):
+        """
+        Returns a session to the pool. Unknown sessions are stopped.
+
+        Args:
+            driver (WebDriver): session returned by `acquire()`
+        """
+        if not isinstance(driver, WebDriver):
+            return
+
+        with self.condition:
+            info = self.sessions.get(driver)
+
+        if info is None:
+            self._quit(driver)
+            return
+
+        info['uses'] += 1
+
+        # other workers may be waiting for the profile
+        if info['options'].get('save_session'):
+            self.discard(driver)
+            return
+
+        if info['uses'] >= self.max_uses or self.closed:
+            self.discard(driver)
+            return
+
+        try:
+            self.reset(driver)
+
+        except WebDriverException:
+            self.discard(driver)
+            return
+
+        # cookie jar of the HTTP session still holds cookies of the previous job
+        downloader.close(driver.session_id)
+
+        with self.condition:
+            info['idle_since'] = time.monotonic()
+            self.idle.setdefault(info['key'], []).append(driver)
+            self.condition.notify()
+
+    def discard(self, driver: WebDriver):
+        """
+        Stops a session and frees its slot in the pool.
+
+        Args:
+            driver (WebDriver): session returned by `acquire()`
+        """
+        with self.condition:
+            info = self.sessions.pop(driver, None)
+
+            if info is None:
+                return
+
+            if driver in self.idle.get(info['key'], []):
+                self.idle[info['key']].remove(driver)
+
+            self.size -= 1
+            self.condition.notify()
+
+        self._quit(driver)
+
+    def warm(self, count: int, **kwargs) -> int:
+        """
+        Pre-creates idle sessions so that jobs don't pay the browser start up cost.
+        Saved sessions are never warmed. See `release()`.
+
+        Args:
+            count (int): number of sessions to create
+            **kwargs (any): options forwarded to `factory`
+
+        Returns:
+            int: number of sessions created
+        """
+        key = pool_key(**kwargs)
+        drivers = []
+
+        if kwargs.get('save_session'):
+            return 0
+
+        try:
+            for _ in range(count):
+                with self.condition:
+                    if self.size >= self.max_size or self.count(key) >= self.limit(**kwargs):
+                        break
+
+                drivers.append(self.acquire(**kwargs))
+
+        # pylint: disable=broad-except
+        except Exception as err:
+            self.logger.debug('Could not warm session: %s', err)
+
+        for driver in drivers:
+            with self.condition:
+                self.sessions[driver]['uses'] -= 1
+
+            self.release(driver)
+
+        return len(drivers)
+
+    def count(self, key: tuple) -> int:
+        """
+        Returns the number of sessions (idle, in use and starting) for `key`.
+
+        Args:
+            key (tuple): result of `pool_key()`
+
+        Returns:
+            int: number of sessions
+        """
+        return self.pending.get(key, 0) + sum(
+            1 for info in self.sessions.values() if info['key'] == key
+        )
+
+    def close(self):
+        """
+        Stops all idle sessions. Sessions in use are stopped when released.
+        """
+        with self.condition:
+            self.closed = True
+            drivers = [driver for drivers in self.idle.values() for driver in drivers]
+
+        for driver in drivers:
+            self.discard(driver)
+
+    def _create(self, key: tuple, **kwargs) -> WebDriver:
+        try:
+            driver = self.factory(**kwargs)
+
+        except Exception:
+            with self.condition:
+                self.pending[key] -= 1
+                self.size -= 1
+                self.condition.notify()
+            raise
+
+        with self.condition:
+            self.pending[key] -= 1
+            self.sessions[driver] = {
+                'key': key,
+                'options': kwargs,
+                'uses': 0,
+                'idle_since': time.monotonic(),
+            }
+
+        return driver
+
+    def _pop_idle(self, key: tuple) -> WebDriver:
+        drivers: List[WebDriver] = self.idle.get(key, [])
+        now = time.monotonic()
+
+        while drivers:
+            driver = drivers.pop()
+
+            # grid has already dropped sessions idle for longer than its timeout
+            if now - self.sessions[driver]['idle_since'] < self.max_idle:
+                return driver
+
+            self.sessions.pop(driver)
+            self.size -= 1
+            threading.Thread(target=self._quit, args=(driver,), daemon=True).start()
+
+        return None
+
+    def _evict_idle(self) -> bool:
+        for drivers in self.idle.values():
+            if drivers:
+                driver = drivers.pop(0)
+                self.sessions.pop(driver)
+                self.size -= 1
+                threading.Thread(target=self._quit, args=(driver,), daemon=True).start()
+                return True
+
+        return False
+
+    def _quit(self, driver: WebDriver):
+        # HTTP session that sent cookies of driver
+        downloader.close(driver.session_id)
+
+        try:
+            if driver.session_id:
+                driver.quit()
+
+        except WebDriverException:
+            pass
+
+    def __init__(self, factory: Callable[..., WebDriver], **kwargs) -> None:
+        self.factory = factory
+        self.max_size = kwargs.get('max_size', MAX_SESSIONS)
+        self.max_uses = kwargs.get('max_uses', MAX_USES)
+        self.max_idle = kwargs.get('max_idle', MAX_IDLE)
+        self.timeout = kwargs.get('timeout', ACQUIRE_TIMEOUT)
+        self.size = 0
+        self.closed = False
+        self.idle: Dict[tuple, List[WebDriver]] = {}
+        self.pending: Dict[tuple, int] = {}
+        self.sessions: Dict[WebDriver, dict] = {}
+        self.condition = threading.Condition()
+        self.logger = logging.Logger(__file__)
+
+
+def create_pool(factory: Callable[..., WebDriver], **kwargs) -> DriverPool:
+    """
+    Factory function for `DriverPool`.
+
+    Args:
+        factory (Callable[..., WebDriver]): function used to create sessions. ie `create_driver`
+        **max_size (int): maximum number of sessions. Defaults to `MAX_SESSIONS`
+        **max_uses (int): number of jobs before a session is recycled. Defaults to `MAX_USES`
+        **max_idle (int): seconds an idle session is kept. Defaults to `MAX_IDLE`
+        **timeout (float): seconds `acquire()` waits for a free session.
+                           Defaults to `ACQUIRE_TIMEOUT`
+
+    Returns:
+        DriverPool: an instance of `DriverPool`
+    """
+    return DriverPool(factory, **kwargs)
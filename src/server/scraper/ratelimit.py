@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Defines functions and classes for limiting the rate of requests shared by several threads.
+"""
+from email.utils import parsedate_to_datetime
+import random
+import threading
+import time
+from typing import Dict
+
+# seconds of first pause after a throttled request
+BACKOFF = 2
+MAX_BACKOFF = 300
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average and bursts of up to `burst` requests.
+    Tokens are reserved in the order `acquire()` is called, so waiting threads are
+    served first come first served.
+
+    Args:
+        rate (float): tokens added per second
+        burst (int, optional): maximum number of stored tokens. Defaults to 1.
+
+    Raises:
+        TypeError: if `rate` is not larger than 0
+    """
+
+    @property
+    def rate(self) -> float:
+        """
+        Returns the number of tokens added per second.
+
+        Returns:
+            float: tokens per second
+        """
+        return self._rate
+
+    @rate.setter
+    def rate(self, value: float):
+        if not value > 0:
+            raise TypeError('rate should be a number larger than 0')
+
+        with self.lock:
+            self._refill()
+            self._rate = value
+
+    def acquire(self, tokens: float = 1, timeout: float = None) -> bool:
+        """
+        Takes tokens from the bucket, waiting until enough have been added.
+
+        Args:
+            tokens (float, optional): number of tokens. Defaults to 1.
+            timeout (float, optional): maximum seconds to wait. Defaults to None.
+
+        Returns:
+            bool: `False` if tokens would not be available within `timeout`
+        """
+        with self.lock:
+            self._refill()
+
+            # tokens are not added while paused
+            delay = max(0, self.updated - time.monotonic())
+            delay += max(0, (tokens - self.tokens) / self._rate)
+
+            if timeout is not None and delay > timeout:
+                return False
+
+            # reserve tokens so later callers wait behind this one
+            self.tokens -= tokens
+
+        if delay > 0:
+            time.sleep(delay)
+
+        return True
+
+    def available(self) -> float:
+        """
+        Returns the number of tokens that can be taken without waiting.
+
+        Returns:
+            float: tokens. Negative while tokens are reserved by waiting threads
+        """
+        with self.lock:
+            self._refill()
+
+            return self.tokens
+
+    def pause(self, seconds: float):
+        """
+        Drops stored tokens and stops adding new ones for a number of seconds.
+
+        Args:
+            seconds (float): seconds until tokens are added again
+        """
+        with self.lock:
+            self._pause(seconds)
+
+    def _pause(self, seconds: float):
+        self._refill()
+        self.tokens = min(self.tokens, 0)
+        self.updated = max(self.updated, time.monotonic() + seconds)
+
+    def _refill(self):
+        now = time.monotonic()
+
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self._rate)
+            self.updated = now
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if not rate > 0:
+            raise TypeError('rate should be a number larger than 0')
+
+        self._rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+
+class AdaptiveLimiter(TokenBucket):
+    """
+    Token bucket that slows down when the server is throttling requests. `throttle()`
+    halves the rate and pauses all callers, `recover()` raises the rate back to
+    `max_rate` in steps. Failures during a pause count as one, so parallel requests
+    throttled at the same time halve the rate once.
+
+    Args:
+        rate (float): maximum tokens added per second
+        burst (int, optional): maximum number of stored tokens. Defaults to 1.
+        min_rate (float, optional): lowest rate after throttling. Defaults to `rate / 16`.
+        backoff (float, optional): seconds of first pause. Doubled by every failure in a
+                                   row. Defaults to `BACKOFF`.
+        max_backoff (float, optional): maximum seconds of a pause. Defaults to `MAX_BACKOFF`.
+
+    Raises:
+        TypeError: if `rate` is not larger than 0
+    """
+
+    def throttle(self, retry_after: float = None) -> float:
+        """
+        Halves the rate and pauses callers after a throttled or failed request. Does not
+        halve the rate again while callers are paused.
+
+        Args:
+            retry_after (float, optional): seconds requested by the server. Limited to
+                                           `max_backoff`. Defaults to None (exponential
+                                           backoff with jitter).
+
+        Returns:
+            float: seconds until next request is allowed
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.throttled += 1
+
+            if retry_after is not None:
+                retry_after = min(self.max_backoff, retry_after)
+
+            # failed while callers are paused. ie parallel requests
+            if self.updated > now:
+                self._pause(retry_after or 0)
+
+                return self.updated - now
+
+            self.failures += 1
+            self._rate = max(self.min_rate, self._rate / 2)
+
+            if retry_after is None:
+                retry_after = min(self.max_backoff, self.backoff * 2 ** (self.failures - 1))
+                retry_after *= random.uniform(0.5, 1.5)
+
+            self._pause(retry_after)
+
+            return retry_after
+
+    def recover(self):
+        """
+        Raises the rate by a tenth of `max_rate` after a successful request.
+        """
+        with self.lock:
+            self.failures = 0
+
+            if self._rate < self.max_rate:
+                self._refill()
+                self._rate = min(self.max_rate, self._rate + self.max_rate / 10)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the current state of the limiter. Used for monitoring.
+
+        Returns:
+            Dict[str, float]: `rate`, `max_rate`, `tokens`, `backoff` (seconds until
+                              requests are allowed again), `failures` in a row and number
+                              of times `throttled`
+        """
+        with self.lock:
+            self._refill()
+
+            return {
+                'rate': self._rate,
+                'max_rate': self.max_rate,
+                'tokens': self.tokens,
+                'backoff': max(0, self.updated - time.monotonic()),
+                'failures': self.failures,
+                'throttled': self.throttled,
+            }
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        min_rate: float = None,
+        backoff: float = BACKOFF,
+        max_backoff: float = MAX_BACKOFF,
+    ) -> None:
+        super().__init__(rate, burst)
+
+        self.max_rate = rate
+        self.min_rate = min(rate, min_rate or rate / 16)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.throttled = 0
+
+
+def parse_retry_after(value: str) -> float:
+    """
+    Reads the value of a `Retry-After` header.
+
+    Args:
+        value (str): seconds or HTTP date
+
+    Returns:
+        float: seconds to wait or `None` if value is missing or invalid
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0, float(value))
+
+    except ValueError:
+        pass
+
+    try:
+        return max(0, parsedate_to_datetime(value).timestamp() - time.time())
+
+    except (TypeError, ValueError):
+        return None
+
+
+def create_token_bucket(rate: float, burst: int = 1) -> TokenBucket:
+    """
+    Factory function for `TokenBucket`.
+
+    Args:
+        rate (float): tokens added per second
+        burst (int, optional): maximum number of stored tokens. Defaults to 1.
+
+    Raises:
+        TypeError: if `rate` is not larger than 0
+
+    Returns:
+        TokenBucket: an instance of `TokenBucket`
+    """
+    return TokenBucket(rate, burst)
+
+
+def create_adaptive_limiter(rate: float, burst: int = 1, **kwargs) -> AdaptiveLimiter:
+    """
+    Factory function for `AdaptiveLimiter`.
+
+    Args:
+        rate (float): maximum tokens added per second
+        burst (int, optional): maximum number of stored tokens. Defaults to 1.
+        **min_rate (float): lowest rate after throttling. Defaults to `rate / 16`.
+        **backoff (float): seconds of first pause. Defaults to `BACKOFF`.
+        **max_backoff (float): maximum seconds of a pause. Defaults to `MAX_BACKOFF`.
+
+    Raises:
+        TypeError: if `rate` is not larger than 0
+
+    Returns:
+        AdaptiveLimiter: an instance of `AdaptiveLimiter`
+    """
+    return AdaptiveLimiter(rate, burst, **kwargs)
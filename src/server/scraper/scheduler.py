@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Defines functions and classes for deciding which `Scraper` job starts next.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List
+
+from .jobstore import JobStore
+from .pool import MAX_SESSIONS
+
+PRIORITIES = {
+    'interactive': 0,
+    'bulk': 1,
+}
+DISPATCH_INTERVAL = 1
+HEARTBEAT_INTERVAL = 5
+
+def parse_limits(value: str) -> Dict[str, int]:
+    """
+    Parses per domain limits. ie `google.com=4,linkedin.com=2`
+
+    Args:
+        value (str): comma separated `domain=limit` pairs
+
+    Raises:
+        TypeError: if a limit is not a number
+
+    Returns:
+        Dict[str, int]: limit per domain
+    """
+    limits = {}
+
+    for pair in filter(None, (value or '').split(',')):
+        domain, _, limit = pair.partition('=')
+
+        if not limit.strip().isdigit():
+            raise TypeError(f'invalid limit for domain `{domain}`')
+
+        limits[domain.strip()] = int(limit)
+
+    return limits
+
+DOMAIN_LIMITS = parse_limits(os.environ.get('SCRAPER_DOMAIN_LIMITS'))
+
+class Scheduler:
+    """
+    Queue of jobs waiting for a free selenium slot.
+
+    Queued jobs are started by priority class first, then by the API client with the
+    fewest running jobs and then in submission order. Slots and caps are checked by
+    `JobStore.start_job()` so they hold across workers.
+
+    Args:
+        store (JobStore): store shared by all workers
+        start (Callable[[str], None]): called with the job id once a job may run
+        cancel (Callable[[str], None], optional): called with the job id of queued jobs
+                                                  deleted by another worker
+        **max_jobs (int): maximum number of running jobs on all workers.
+                          Defaults to `MAX_SESSIONS`
+        **domain_limits (Dict[str, int]): maximum number of running jobs per website.
+                                          Defaults to `DOMAIN_LIMITS`
+    """
+
+    def add(self, job: str, priority: str = 'bulk', **kwargs):
+        """
+        Queues a job created with `JobStore.create_job()`.
+
+        Args:
+            job (str): job id
+            priority (str, optional): key of `PRIORITIES`. Defaults to 'bulk'.
+            **path (str): path to script in `/scrapper` directory
+            **client (str): API client that submitted the job
+            **domain (str): website scraped by the job
+            **max_jobs (int): maximum number of running jobs of the same script
+            **slots (int): slots of `max_jobs` held while running. Defaults to 1
+
+        Raises:
+            TypeError: if `priority` is not a key of `PRIORITIES`
+        """
+        if priority not in PRIORITIES:
+            raise TypeError(f'priority should be one of {list(PRIORITIES)}')
+
+        with self.condition:
+            self.queue.append({
+                'job': job,
+                'priority': PRIORITIES[priority],
+                'path': kwargs.get('path'),
+                'client': kwargs.get('client'),
+                'domain': kwargs.get('domain'),
+                'max_jobs': kwargs.get('max_jobs'),
+                'slots': kwargs.get('slots', 1),
+                'added': time.monotonic(),
+            })
+
+            # dispatcher only runs while jobs are queued
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+
+            self.dirty = True
+            self.condition.notify_all()
+
+    def remove(self, job: str) -> bool:
+        """
+        Removes a job from the queue.
+
+        Args:
+            job (str): job id
+
+        Returns:
+            bool: `True` if job was still queued
+        """
+        with self.condition:
+            for entry in self.queue:
+                if entry['job'] == job:
+                    self.queue.remove(entry)
+                    return True
+
+        return False
+
+    def notify(self):
+        """
+        Wakes up the dispatcher. ie when a slot is freed.
+        """
+        with self.condition:
+            self.dirty = True
+            self.condition.notify_all()
+
+    def queued(self) -> List[str]:
+        """
+        Returns the ids of queued jobs in the order they would start.
+
+        Returns:
+            List[str]: job ids
+        """
+        running = self.store.count_jobs('running', 'client')
+
+        return [entry['job'] for entry in self._order(running)]
+
+    def depth(self) -> dict:
+        """
+        Returns the slots of queued and running jobs on all workers. See `JobStore.count_jobs()`.
+
+        Returns:
+            dict: queued slots per priority class, running slots and jobs queued on this worker
+        """
+        queued = self.store.count_jobs('queued', 'priority')
+
+        return {
+            'queued': {name: queued.get(value, 0) for name, value in PRIORITIES.items()},
+            'running': self.store.count_jobs('running').get(None, 0),
+            'local': len(self.queue),
+            'max_jobs': self.max_jobs,
+        }
+
+    def dispatch(self) -> List[str]:
+        """
+        Starts as many queued jobs as slots and caps allow.
+
+        Returns:
+            List[str]: ids of started jobs
+        """
+        running = self.store.count_jobs('running', 'client')
+        started = []
+        blocked = set()
+
+        if sum(running.values()) >= self.max_jobs:
+            return started
+
+        for entry in self._order(running):
+            # jobs with the same caps as a job that could not start will not start either
+            key = (entry['priority'], entry['path'], entry['domain'], entry['slots'])
+
+            if key in blocked:
+                continue
+
+            limits = (
+                entry['max_jobs'],
+                self.domain_limits.get(entry['domain']),
+            )
+
+            if not self.store.start_job(entry['job'], self.max_jobs, *limits):
+                blocked.add(key)
+                continue
+
+            self.remove(entry['job'])
+            started.append(entry['job'])
+            running[entry['client']] = running.get(entry['client'], 0) + entry['slots']
+            self.start(entry['job'])
+
+        return started
+
+    def heartbeat(self):
+        """
+        Keeps queued jobs alive for other workers and drops jobs deleted by them.
+        """
+        with self.condition:
+            jobs = [entry['job'] for entry in self.queue]
+
+        alive = set(self.store.heartbeat_jobs(jobs))
+
+        for job in jobs:
+            if job not in alive and self.remove(job) and self.cancel is not None:
+                self.cancel(job)
+
+    def run(self):
+        """
+        Function passed to `threading.Thread()`. Dispatches jobs until the queue is empty.
+        """
+        heartbeat = time.monotonic()
+
+        while True:
+            with self.condition:
+                self.dirty = False
+
+            try:
+                self.dispatch()
+
+                if time.monotonic() - heartbeat > HEARTBEAT_INTERVAL:
+                    heartbeat = time.monotonic()
+                    self.heartbeat()
+
+            # pylint: disable=broad-except
+            except Exception as err:
+                self.logger.debug('Could not dispatch jobs: %s', err)
+
+            with self.condition:
+                if not self.queue or self.closed:
+                    self.thread = None
+                    return
+
+                # jobs on other workers finish without notifying
+                if not self.dirty:
+                    self.condition.wait(DISPATCH_INTERVAL)
+
+    def close(self):
+        """
+        Stops the dispatcher. Queued jobs are not started.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def _order(self, running: Dict[str, int]) -> List[dict]:
+        with self.condition:
+            queue = list(self.queue)
+
+        # share slots fairly between clients
+        def key(entry: dict) -> tuple:
+            return entry['priority'], running.get(entry['client'], 0), entry['added']
+
+        ordered = []
+
+        while queue:
+            entry = min(queue, key=key)
+            queue.remove(entry)
+            ordered.append(entry)
+            running = {**running, entry['client']: running.get(entry['client'], 0) + 1}
+
+        return ordered
+
+    def __init__(
+        self,
+        store: JobStore,
+        start: Callable[[str], None],
+        cancel: Callable[[str], None] = None,
+        **kwargs,
+    ) -> None:
+        self.store = store
+        self.start = start
+        self.cancel = cancel
+        self.max_jobs = kwargs.get('max_jobs', MAX_SESSIONS)
+        self.domain_limits = kwargs.get('domain_limits', DOMAIN_LIMITS)
+        self.queue: List[dict] = []
+        self.thread: threading.Thread = None
+        self.closed = False
+        self.dirty = False
+        self.condition = threading.Condition()
+        self.logger = logging.Logger(__file__)
+
+
+def create_scheduler(
+    store: JobStore,
+    start: Callable[[str], None],
+    cancel: Callable[[str], None] = None,
+    **kwargs,
+) -> Scheduler:
+    """
+    Factory function for `Scheduler`.
+
+    Args:
+        store (JobStore): store shared by all workers
+        start (Callable[[str], None]): called with the job id once a job may run
+        cancel (Callable[[str], None], optional): called with the job id of queued jobs
+                                                  deleted by another worker
+        **max_jobs (int): maximum number of running jobs on all workers.
+                          Defaults to `MAX_SESSIONS`
+        **domain_limits (Dict[str, int]): maximum number of running jobs per website.
+                                          Defaults to `DOMAIN_LIMITS`
+
+    Returns:
+        Scheduler: an instance of `Scheduler`
+    """
+    return Scheduler(store, start, cancel, **kwargs)
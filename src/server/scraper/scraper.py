@@ -2,22 +2,46 @@
 """
 Defines functions and classes for managing `Scraper` object.
 """
-from concurrent.futures import ThreadPoolExecutor, Future
+from concurrent.futures import ThreadPoolExecutor, Future, wait as wait_futures
 import logging
 import os
+import queue
+import threading
 import time
-from typing import Generator
+import uuid
+from typing import Generator, List, Tuple
 from selenium.common.exceptions import WebDriverException
 from selenium.webdriver import Remote as WebDriver, ChromeOptions
 
-from .script import Script, create_script
+from .buffer import BUFFER_SIZE, ResultBuffer, create_buffer
+from .classifier import create_classifier
+from .dedup import DEDUP_TTL, PERSIST_DEDUP, DedupIndex, create_dedup_index
+from .jobstore import DATABASE_URI, create_job_store
+from .pool import MAX_SESSIONS, MAX_USES, create_pool
+from .scheduler import DOMAIN_LIMITS, PRIORITIES, create_scheduler
+from .script import Script, create_script, load_script_class
+from .spill import SPILL_DIR, SpillFile, create_spill
 
 CHROME_URI = os.environ.get('SELENIUM_URI', 'http://localhost:4444')
+WARM_SESSIONS = int(os.environ.get('SCRAPER_WARM_SESSIONS', 0))
+JOB_TTL = int(os.environ.get('SCRAPER_JOB_TTL', 3600))
+MAX_UNREAD = int(os.environ.get('SCRAPER_MAX_UNREAD', 0))
+BATCH_WORKERS = int(os.environ.get('SCRAPER_BATCH_WORKERS', 4))
+SLOT_INTERVAL = 1
+HEARTBEAT_INTERVAL = 5
+FLUSH_INTERVAL = 1
+BATCH_SIZE = 100
+RESULTS_LIMIT = 1000
+STREAM_INTERVAL = 1
+STREAM_TIMEOUT = 300
 CHROME_USER_AGENT   = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) ' \
                     + 'AppleWebKit/537.36 (KHTML, like Gecko) ' \
                     + 'Chrome/91.0.4472.124 ' \
                     + 'Safari/537.36 OPR/77.0.4054.254'
 
+# compiled once and shared by all jobs. See `Scraper.create_dedup_index()`
+classifier = create_classifier()
+
 def create_driver(**kwargs) -> WebDriver:
     """
     Creates a selenium `Webdriver` instance.
@@ -27,6 +51,8 @@ def create_driver(**kwargs) -> WebDriver:
         **user_agent (str): User Agent header. Default to `CHROME_USER_AGENT`
         **save_session (bool): if `True` then current session will be stored and loaded.g
                                Default to `False`
+        **performance_log (bool): if `True` then network events are logged for
+                                  `driver.get_log('performance')`. Default to `True`
         **kwargs (any): All extra arguments are forwarded to seleniums `Webdriver()`
                         constructor
 
@@ -37,6 +63,7 @@ def create_driver(**kwargs) -> WebDriver:
     timeout = options.pop('timeout', 10)
     user_agent = options.pop('user_agent', CHROME_USER_AGENT)
     save_session = options.pop('save_session', False)
+    performance_log = options.pop('performance_log', True)
 
     # create driver options
     chrome_options = ChromeOptions()
@@ -65,7 +92,8 @@ def create_driver(**kwargs) -> WebDriver:
     })
 
     # enable performance logging
-    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    if performance_log:
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
 
     driver = WebDriver(options=chrome_options, **options)
 
@@ -74,6 +102,30 @@ def create_driver(**kwargs) -> WebDriver:
 
     return driver
 
+def create_progress(queries: List[str], workers: int = 1) -> dict:
+    """
+    Creates the progress information of a batch job. See `Scraper.execute_batch()`.
+
+    Args:
+        queries (List[str]): queries of the batch. Duplicates are dropped.
+        workers (int, optional): maximum number of webdriver sessions. Defaults to 1.
+
+    Returns:
+        dict: `queued` status of every query, number of queries per status and number of
+              `workers` running queries
+    """
+    progress = {query: {'status': 'queued', 'results': 0} for query in queries}
+
+    return {
+        'queries': progress,
+        'workers': max(1, min(workers, len(progress))),
+        'queued': len(progress),
+        'running': 0,
+        'done': 0,
+        'error': 0,
+        'total': 0,
+    }
+
 class Scraper:
     """
     Class for managing scraping of scripts in `/scrapper` directory.
@@ -83,226 +135,1038 @@ class Scraper:
         'command_executor': CHROME_URI,
     }
 
-    def is_script(self, path: str) -> bool:
+    # options of sessions started before the first job. ie `findpeople.Script.DRIVER_OPTIONS`
+    WARM_OPTIONS = {
+        'save_session': False,
+        'performance_log': False,
+    }
+
+    def is_script(self, job: str) -> bool:
+        """
+        Validates if a job identified by `job` has been added on any worker.
+
+        Args:
+            job (str): job id returned by `scrape()` or `add_script()`
+
+        Returns:
+            bool: `True` if job exists and `False` otherwise.
+        """
+        return isinstance(job, str) and self.store.get_path(job) is not None
+
+    def is_local_script(self, job: str) -> bool:
         """
-        Validates if a script identified by `path` has been added with `add_script()`.
+        Validates if a job identified by `job` is running on this worker.
 
         Args:
-            path (str): script to validate
+            job (str): job id returned by `scrape()` or `add_script()`
 
         Returns:
-            bool: `True` if script exists and `False` otherwise.
+            bool: `True` if job exists and `False` otherwise.
         """
         return \
-            isinstance(path, str) \
-            and path in self.scripts \
-            and 'driver' in self.scripts[path] \
-            and 'generator' in self.scripts[path] \
-            and 'results' in self.scripts[path] \
-            and 'future' in self.scripts[path]
+            isinstance(job, str) \
+            and job in self.scripts \
+            and 'path' in self.scripts[job] \
+            and 'driver' in self.scripts[job] \
+            and 'generator' in self.scripts[job] \
+            and 'future' in self.scripts[job]
+
+    def execute_script(
+        self,
+        job: str,
+        path: str,
+        dedup: DedupIndex = None,
+        **kwargs,
+    ) -> Generator[dict, None, None]:
+        """
+        Generator that creates a `Script` with a pooled webdriver session and executes it.
+
+        Args:
+            job (str): job id
+            path (str): path to script in `/scrapper` directory
+            dedup (DedupIndex, optional): skips results whose `Script.DEDUP_KEY` url is
+                                          already in the index. Defaults to None.
+            **kwargs (any): arguments forwarded to `Script.execute()`
+
+        Yields:
+            Generator[dict, None, None]: results of `Script.execute()` or `None` for
+                                         skipped duplicates
+        """
+        driver = self.pool.acquire(**self.get_driver_options(load_script_class(path)))
+        script = None
+
+        try:
+            script = create_script(path, driver, **self.options)
+
+            if job in self.scripts:
+                self.scripts[job]['driver'] = driver
+                self.scripts[job]['script'] = script
+
+            for result in script.execute(**kwargs):
+                url = result.get(script.DEDUP_KEY) if script.DEDUP_KEY else None
+
+                # `None` lets the consumer check if the job was stopped
+                if dedup is not None and isinstance(url, str) and not dedup.add(url):
+                    yield None
+                    continue
+
+                yield result
+
+        finally:
+            # delete downloaded files
+            if script is not None:
+                script.cleanup()
 
-    @staticmethod
-    def run_script(generator: Generator[dict, None, None], results: list, driver: WebDriver):
+            # return webdriver session to pool
+            self.pool.release(driver)
+
+    def execute_batch(
+        self,
+        job: str,
+        path: str,
+        queries: List[str],
+        workers: int = BATCH_WORKERS,
+        dedup: DedupIndex = None,
+        **kwargs,
+    ) -> Generator[dict, None, None]:
+        """
+        Generator that runs a script once per query on up to `workers` pooled webdriver
+        sessions and merges the results. Results get a `query` field. Progress of each
+        query is stored with `JobStore.set_info()`.
+
+        Args:
+            job (str): job id
+            path (str): path to script in `/scrapper` directory
+            queries (List[str]): values passed as `query` to `Script.execute()`
+            workers (int, optional): number of webdriver sessions. Defaults to `BATCH_WORKERS`.
+            dedup (DedupIndex, optional): index shared by all queries so that urls found for
+                                          one query are skipped for the others.
+                                          See `execute_script()`. Defaults to None.
+            **kwargs (any): arguments forwarded to `Script.execute()`
+
+        Yields:
+            Generator[dict, None, None]: results of `Script.execute()` or `None` at least
+                                         once per `FLUSH_INTERVAL` while there are none
+        """
+        pending = queue.Queue()
+        # workers pause while the job is slow to store results
+        events = queue.Queue(self.batch_size)
+        halt = threading.Event()
+        progress = create_progress(queries, workers)
+
+        for query in progress['queries']:
+            pending.put(query)
+
+        def put(*event) -> bool:
+            while not halt.is_set():
+                try:
+                    events.put(event, timeout=SLOT_INTERVAL)
+                    return True
+
+                except queue.Full:
+                    pass
+
+            return False
+
+        def work():
+            try:
+                while not halt.is_set():
+                    try:
+                        query = pending.get_nowait()
+
+                    except queue.Empty:
+                        return
+
+                    put(query, 'running', None)
+                    generator = self.execute_script(job, path, dedup, query=query, **kwargs)
+                    status = 'done'
+
+                    try:
+                        for result in generator:
+                            # skipped duplicate
+                            if result is None:
+                                if halt.is_set():
+                                    return
+
+                                continue
+
+                            if not put(query, 'result', result):
+                                return
+
+                    # one failing query does not stop the batch
+                    except Exception as err: # pylint: disable=broad-except
+                        self.logger.debug('Query failed (%s): %s', job, err)
+                        status = 'error'
+
+                    finally:
+                        generator.close()
+
+                    put(query, status, None)
+
+            finally:
+                put(None, 'exit', None)
+
+        threads = [
+            threading.Thread(target=work, daemon=True)
+            for _ in range(progress['workers'])
+        ]
+        active = len(threads)
+        dirty = True
+        stored = time.monotonic()
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            while active:
+                try:
+                    query, event, result = events.get(timeout=FLUSH_INTERVAL)
+
+                except queue.Empty:
+                    event = None
+
+                if event == 'exit':
+                    active -= 1
+
+                elif event == 'result':
+                    progress['queries'][query]['results'] += 1
+                    progress['total'] += 1
+                    dirty = True
+
+                    yield {**result, 'query': query}
+
+                elif event is not None:
+                    progress[progress['queries'][query]['status']] -= 1
+                    progress['queries'][query]['status'] = event
+                    progress[event] += 1
+                    dirty = True
+
+                # lets the consumer check if the job was stopped
+                if event != 'result':
+                    yield None
+
+                # write progress at most once per interval
+                if dirty and time.monotonic() - stored > FLUSH_INTERVAL:
+                    self.store.set_info(job, progress)
+                    dirty = False
+                    stored = time.monotonic()
+
+        finally:
+            # stop workers and return their webdriver sessions to pool
+            halt.set()
+
+            if dirty:
+                self.store.set_info(job, progress)
+
+    def run_script(
+        self,
+        job: str,
+        generator: Generator[dict, None, None],
+        driver: WebDriver,
+        started: threading.Event = None,
+        stopped: threading.Event = None,
+        buffer: ResultBuffer = None,
+    ):
         """
         Function passed to `ThreadExecutor.submit()`
 
         Args:
-            generator (Generator[dict, None, None]): result of `Script.execute()`
-            results (list): list to store results
+            job (str): job id
+            generator (Generator[dict, None, None]): result of `Script.execute()`. `None`
+                                                     values are skipped
             driver (WebDriver): selenium webdriver instance
+            started (threading.Event, optional): set once the script starts running
+            stopped (threading.Event, optional): stops the script when set
+            buffer (ResultBuffer, optional): buffer to store results in until they are written
         """
+        stopped = stopped or threading.Event()
+        buffer = create_buffer(self.buffer_size) if buffer is None else buffer
+        status = 'done'
+
         try:
+            if started is not None:
+                started.set()
+
+            heartbeat = flushed = time.monotonic()
+
             for result in generator:
-                results.append(result)
+                # stop if job was deleted by another worker
+                if time.monotonic() - heartbeat > HEARTBEAT_INTERVAL:
+                    heartbeat = time.monotonic()
+
+                    if not self.store.heartbeat(job):
+                        stopped.set()
+
+                if stopped.is_set():
+                    break
+
+                # no result. ie skipped duplicate
+                if result is None:
+                    continue
+
+                # producer waits for slow clients to catch up
+                if not self.wait_for_readers(job, buffer, stopped):
+                    stopped.set()
+                    break
+
+                # producer waits for results to be written once buffer is full
+                if buffer.full() and not self.flush_results(job, buffer):
+                    stopped.set()
+                    break
+
+                buffer.append(result)
+                self.notify_script(job)
+
+                # write results in batches
+                if \
+                    buffer.last_seq - buffer.flushed_seq >= self.batch_size \
+                    or time.monotonic() - flushed > FLUSH_INTERVAL \
+                :
+                    if not self.flush_results(job, buffer):
+                        stopped.set()
+                        break
 
-            # stop webdriver session
-            if isinstance(driver, WebDriver) and driver.session_id:
-                driver.quit()
+                    flushed = time.monotonic()
 
         except WebDriverException:
             pass
 
+        except Exception as err:
+            status = 'error'
+            raise err
+
+        finally:
+            # send stopsignal to script
+            if isinstance(generator, Generator):
+                generator.close()
+
+            # return webdriver session to pool
+            self.pool.release(driver)
+
+            # write remaining results
+            if not stopped.is_set():
+                self.flush_results(job, buffer)
+
+            self.store.finish_job(job, 'stopped' if stopped.is_set() else status)
+            self.notify_script(job)
+
+            # start next queued job
+            self.scheduler.notify()
+
+            # results written after job was deleted
+            if stopped.is_set() and not self.is_script(job):
+                self.remove_spill(job)
+
+    def wait_for_readers(self, job: str, buffer: ResultBuffer, stopped: threading.Event) -> bool:
+        """
+        Pauses the producer of a job while `max_unread` results have not been read by any
+        client. Does nothing if `max_unread` is 0.
+
+        Args:
+            job (str): job id
+            buffer (ResultBuffer): buffer passed to `run_script()`
+            stopped (threading.Event): stops the script when set
+
+        Returns:
+            bool: `False` if job has been stopped or deleted
+        """
+        info = self.scripts.get(job)
+
+        if not self.max_unread or info is None:
+            return not stopped.is_set()
+
+        while buffer.last_seq - info['read_cursor'] >= self.max_unread:
+            cursor = self.store.get_read_cursor(job)
+
+            if cursor is None:
+                return False
+
+            info['read_cursor'] = max(info['read_cursor'], cursor)
+
+            if buffer.last_seq - info['read_cursor'] < self.max_unread:
+                break
+
+            # clients on other workers can only read stored results
+            if stopped.is_set() or not self.flush_results(job, buffer):
+                return False
+
+            with info['updated']:
+                info['updated'].wait(SLOT_INTERVAL)
+
+        return not stopped.is_set()
+
+    def flush_results(self, job: str, buffer: ResultBuffer) -> bool:
+        """
+        Writes results of a job that are only held in `buffer` to the database, or to
+        a spill file if `spill_dir` is set. Duplicate counts of local jobs are stored
+        with their progress.
+
+        Args:
+            job (str): job id
+            buffer (ResultBuffer): buffer passed to `run_script()`
+
+        Returns:
+            bool: `False` if job has been deleted and should stop
+        """
+        rows = buffer.pending()
+        spill = self.get_spill(job)
+
+        if spill is not None:
+            if not self.store.heartbeat(job):
+                return False
+
+            spill.append(rows)
+
+        elif not self.store.add_results(job, rows):
+            return False
+
+        if rows:
+            buffer.mark_flushed(rows[-1][0])
+
+        info = self.scripts.get(job)
+
+        if info is not None and info['dedup'] is not None:
+            stats = info['dedup'].stats()
+
+            if stats != info['dedup_stats']:
+                self.store.set_info(job, {'dedup': stats})
+                info['dedup_stats'] = stats
+
+        return True
+
+    def notify_script(self, job: str):
+        """
+        Wakes up `stream_results()` readers of a local job.
+
+        Args:
+            job (str): job id
+        """
+        info = self.scripts.get(job)
+
+        if info is not None:
+            with info['updated']:
+                info['updated'].notify_all()
+
     def add_script(
         self,
         path: str,
         driver: WebDriver,
         script: Script,
         generator: Generator[dict, None, None],
-    ):
+        job: str = None,
+        **kwargs,
+    ) -> str:
         """
-        Adds a new script to scrapper.
+        Adds a new job to scrapper. The job is queued until `scheduler` starts it.
 
         Args:
             path (str): path to script in `/scrapper` directory
+            driver (WebDriver): selenium webdriver instance used by `script`
+            script (Script): script instance
+            generator (Generator[dict, None, None]): result of `Script.execute()`
+            job (str, optional): job id. Defaults to a random id.
+            **priority (str): scheduling class. See `scheduler.PRIORITIES`. Defaults to 'bulk'
+            **client (str): API client that submitted the job
+            **domain (str): website scraped by the job
+            **max_jobs (int): maximum number of running jobs of the same script
+            **slots (int): slots of `max_jobs` held while running. Defaults to 1
+            **info (dict): initial progress of the job. See `get_progress()`
+            **dedup (DedupIndex): index used by `generator` to skip duplicate results
+
+        Raises:
+            TypeError: if `priority` is not a valid scheduling class
+
+        Returns:
+            str: job id used by `get_status()`, `get_results()` and `delete_script()`
         """
         if not isinstance(path, str):
             raise TypeError('`path` must be a string')
 
-        self.logger.debug('Running script %s', path)
+        job = job or uuid.uuid4().hex
+
+        self.logger.debug('Running script %s (%s)', path, job)
 
-        results = []
-        future = self.executor.submit(self.run_script, generator, results, driver)
+        priority = kwargs.get('priority', 'bulk')
 
-        # prevent race conditions
-        time.sleep(2)
+        if priority not in PRIORITIES:
+            raise TypeError(f'priority should be one of {list(PRIORITIES)}')
 
-        self.scripts[path] = {
+        self.store.create_job(
+            job,
+            path,
+            PRIORITIES[priority],
+            client=kwargs.get('client'),
+            domain=kwargs.get('domain'),
+            slots=kwargs.get('slots', 1),
+            info=kwargs.get('info'),
+        )
+        self.scripts[job] = {
+            'path': path,
             'driver': driver,
             'script': script,
             'generator': generator,
-            'results': results,
-            'future': future,
+            'started': threading.Event(),
+            'stopped': threading.Event(),
+            'updated': threading.Condition(),
+            'buffer': create_buffer(self.buffer_size),
+            'read_cursor': 0,
+            'dedup': kwargs.get('dedup'),
+            'dedup_stats': None,
+            'future': Future(),
         }
+        self.scheduler.add(
+            job,
+            priority,
+            path=path,
+            client=kwargs.get('client'),
+            domain=kwargs.get('domain'),
+            max_jobs=kwargs.get('max_jobs'),
+            slots=kwargs.get('slots', 1),
+        )
+
+        return job
+
+    def start_script(self, job: str):
+        """
+        Runs a queued job on `executor`. Called by `scheduler` once the job has a slot.
 
-    def get_script(self, path: str) -> Script:
+        Args:
+            job (str): job id
         """
-        Returns the `Script` instance created for the path.
+        info = self.scripts.get(job)
+
+        # job was deleted while queued
+        if info is None or not info['future'].set_running_or_notify_cancel():
+            return
+
+        def resolve(future: Future):
+            if future.exception() is not None:
+                info['future'].set_exception(future.exception())
+            else:
+                info['future'].set_result(future.result())
+
+        self.executor.submit(
+            self.run_script,
+            job,
+            info['generator'],
+            info['driver'],
+            info['started'],
+            info['stopped'],
+            info['buffer'],
+        ).add_done_callback(resolve)
+
+    def cancel_script(self, job: str) -> bool:
+        """
+        Cleans up a local job that was deleted before it started.
 
         Args:
-            path (str): path to script in `/scrapper` directory
+            job (str): job id
 
         Returns:
-            Script: `Script` instance created for path
+            bool: `True` if job had not started
+        """
+        info = self.scripts.get(job)
+
+        if info is None or not info['future'].cancel():
+            return False
+
+        self.scheduler.remove(job)
+
+        if isinstance(info['generator'], Generator):
+            info['generator'].close()
+
+        self.pool.release(info['driver'])
+
+        return True
+
+    def get_spill(self, job: str) -> SpillFile:
         """
-        if self.is_script(path) and isinstance(self.scripts[path]['script'], Script):
-            return self.scripts[path]['script']
+        Returns the spill file holding the stored results of a job.
+
+        Args:
+            job (str): job id
+
+        Returns:
+            SpillFile: spill file in `spill_dir` or `None` if results are stored in the database
+        """
+        if not self.spill_dir:
+            return None
+
+        if job not in self.spills:
+            self.spills[job] = create_spill(
+                os.path.join(self.spill_dir, f'{os.path.basename(job)}.ndjson'),
+            )
+
+        return self.spills[job]
+
+    def remove_spill(self, job: str):
+        """
+        Deletes the spill file of a job.
+
+        Args:
+            job (str): job id
+        """
+        spill = self.get_spill(job)
+
+        if spill is not None:
+            spill.remove()
+            self.spills.pop(job, None)
+
+    def get_script(self, job: str) -> Script:
+        """
+        Returns the `Script` instance created for the job.
+
+        Args:
+            job (str): job id returned by `scrape()`
+
+        Returns:
+            Script: `Script` instance created for job or `None` if job runs on another worker
+        """
+        if self.is_local_script(job) and isinstance(self.scripts[job]['script'], Script):
+            return self.scripts[job]['script']
 
         return None
 
-    def delete_script(self, path: str):
+    def get_jobs(self, path: str = None) -> List[str]:
         """
-        Deletes a script added with `add_script()`
+        Returns the ids of all jobs, or only the jobs running the script at `path`.
 
         Args:
-            path (str): path to script in `/scrapper` directory
+            path (str, optional): path to script in `/scrapper` directory. Defaults to None.
+
+        Returns:
+            List[str]: job ids, oldest first
         """
-        if not self.is_script(path):
-            return
+        return self.store.get_jobs(path)
 
-        self.logger.debug('Deleting script: %s', path)
+    def delete_script(self, job: str) -> Future:
+        """
+        Deletes a job added with `add_script()`. Returns without waiting for the
+        script to stop; the webdriver session is released once it does. Jobs running
+        on other workers stop at their next heartbeat.
 
-        # send stopsignal to script
-        if isinstance(self.scripts[path]['generator'], Generator):
-            self.scripts[path]['generator'].close()
+        Args:
+            job (str): job id returned by `scrape()`
 
-        # stop webdriver session
-        try:
-            if isinstance(self.scripts[path]['driver'], WebDriver):
-                if self.scripts[path]['driver'].session_id:
-                    self.scripts[path]['driver'].quit()
+        Returns:
+            Future: resolves once the script has stopped. `None` if job does not run locally
+        """
+        if not isinstance(job, str):
+            return None
 
-                    # prevent race conditions
-                    time.sleep(2)
+        self.logger.debug('Deleting job: %s', job)
 
-        except WebDriverException:
-            pass
+        self.store.delete_job(job)
+
+        if not self.is_local_script(job):
+            self.remove_spill(job)
+            return None
+
+        info = self.scripts[job]
+
+        # send stopsignal to running script
+        info['stopped'].set()
+        self.remove_spill(job)
+
+        # clean up scripts that never started
+        self.cancel_script(job)
+        self.scripts.pop(job, None)
+
+        return info['future']
+
+    def prune_scripts(self, max_age: int = JOB_TTL):
+        """
+        Deletes finished jobs older than `max_age` seconds.
 
-        # cancel future
-        if isinstance(self.scripts[path]['future'], Future):
-            self.scripts[path]['future'].cancel()
+        Args:
+            max_age (int, optional): age in seconds. Defaults to `JOB_TTL`.
+        """
+        for job in self.store.prune_jobs(max_age):
+            self.remove_spill(job)
+
+        if self.persist_dedup:
+            self.store.prune_urls(DEDUP_TTL)
 
-        # delete script
-        self.scripts[path] = {}
+        # forget local jobs deleted by any worker
+        for job in list(self.scripts):
+            if self.scripts[job]['future'].done() and not self.is_script(job):
+                self.scripts.pop(job, None)
 
-    def scrape (self, path: str, **kwargs) -> str:
+    def scrape (self, path: str, client: str = None, **kwargs) -> str:
         """
-        Executes a script in the `/scrapper` directory.
+        Executes a script in the `/scrapper` directory. Several jobs can run the same script.
+        Jobs are scheduled using `Script.PRIORITY`, `Script.DOMAIN` and `Script.MAX_JOBS`.
+        Results with a url found before are skipped. See `Script.DEDUP_KEY`.
 
         Args:
             path (str): path to script in `/scrapper` directory
+            client (str, optional): API client submitting the job. Used to share slots
+                                    fairly. Defaults to None.
             **kwargs (any): arguments forwarded to `Script.execute()`
 
+        Raises:
+            KeyError: if `path` does not point to a valid script module
+
         Returns:
-            str: See `get_status()`
+            str: job id used by `get_status()`, `get_results()` and `delete_script()`
         """
-        # delete previous script
-        if self.is_script(path):
-            self.delete_script(path)
+        # delete old jobs
+        self.prune_scripts()
+
+        # validate script before queueing it
+        script_class = load_script_class(path)
 
-        # create new script
         self.logger.debug('Adding script: %s', path)
 
-        driver = create_driver(**self.options)
+        job = uuid.uuid4().hex
+        dedup = self.create_dedup_index(path, script_class)
+        generator = self.execute_script(job, path, dedup, **kwargs)
+
+        return self.add_script(
+            path,
+            None,
+            None,
+            generator,
+            job,
+            priority=script_class.PRIORITY,
+            client=client,
+            domain=script_class.DOMAIN,
+            max_jobs=script_class.MAX_JOBS,
+            dedup=dedup,
+        )
+
+    def scrape_batch(
+        self,
+        path: str,
+        queries: List[str],
+        client: str = None,
+        workers: int = None,
+        **kwargs,
+    ) -> str:
+        """
+        Executes a script in the `/scrapper` directory once per query as a single job.
+        Queries are shared between several webdriver sessions and the job takes one slot
+        of `max_jobs` per session. See `execute_batch()`.
 
-        try:
-            script = create_script(path, driver, **self.options)
-            generator = script.execute(**kwargs)
+        Args:
+            path (str): path to script in `/scrapper` directory
+            queries (List[str]): values passed as `query` to `Script.execute()`
+            client (str, optional): API client submitting the job. Used to share slots
+                                    fairly. Defaults to None.
+            workers (int, optional): number of webdriver sessions. Defaults to `BATCH_WORKERS`.
+            **kwargs (any): arguments forwarded to `Script.execute()`
 
-            self.add_script(path, driver, script, generator)
+        Raises:
+            KeyError: if `path` does not point to a valid script module
+            TypeError: if `queries` is not a list of strings
 
-        except ImportError as err:
-            driver.quit()
-            raise err
+        Returns:
+            str: job id used by `get_status()`, `get_progress()` and `get_results()`
+        """
+        if \
+            not isinstance(queries, list) \
+            or not queries \
+            or not all(isinstance(query, str) for query in queries) \
+        :
+            raise TypeError('`queries` must be a list of strings')
+
+        # delete old jobs
+        self.prune_scripts()
+
+        # validate script before queueing it
+        script_class = load_script_class(path)
+
+        self.logger.debug('Adding batch: %s (%d queries)', path, len(queries))
+
+        # sessions are limited by the pool (ie one saved session) and by slots
+        workers = min(
+            workers or BATCH_WORKERS,
+            self.pool.limit(**self.get_driver_options(script_class)),
+            self.max_jobs,
+        )
+        progress = create_progress(queries, workers)
+        job = uuid.uuid4().hex
+        dedup = self.create_dedup_index(path, script_class)
+        generator = self.execute_batch(job, path, queries, progress['workers'], dedup, **kwargs)
+
+        return self.add_script(
+            path,
+            None,
+            None,
+            generator,
+            job,
+            priority=script_class.PRIORITY,
+            client=client,
+            domain=script_class.DOMAIN,
+            max_jobs=script_class.MAX_JOBS,
+            slots=progress['workers'],
+            info=progress,
+            dedup=dedup,
+        )
+
+    def create_dedup_index(self, path: str, script_class: type) -> DedupIndex:
+        """
+        Creates the index used by a new job to skip duplicate results. Urls of the same
+        profile are duplicates. See `UrlClassifier.canonical()`. Urls are shared with
+        earlier jobs of the same script if `persist_dedup` is set.
+
+        Args:
+            path (str): path to script in `/scrapper` directory
+            script_class (type): `Script` class of the script
+
+        Returns:
+            DedupIndex: index or `None` if the script keeps every result
+        """
+        if not script_class.DEDUP_KEY:
+            return None
 
-        return self.get_status(path)
+        return create_dedup_index(
+            self.store if self.persist_dedup else None,
+            path,
+            classifier.canonical,
+        )
 
-    def get_status(self, path: str) -> str:
+    def get_driver_options(self, script_class: type) -> dict:
         """
-        Returns the current status of script.
+        Returns the options of webdriver sessions used by a script. Sessions are pooled by
+        options, so scripts only share sessions created with the same options.
 
         Args:
-            path (str): path to script in `/scrapper` directory
+            script_class (type): `Script` class of the script
+
+        Returns:
+            dict: options forwarded to `create_driver()`. `Script.DRIVER_OPTIONS` replace
+                  options of scraper
+        """
+        return {**self.options, **script_class.DRIVER_OPTIONS}
+
+    def get_progress(self, job: str) -> dict:
+        """
+        Returns the progress of a job.
+
+        Args:
+            job (str): job id returned by `scrape()` or `scrape_batch()`
+
+        Raises:
+            KeyError: if job does not exist
+
+        Returns:
+            dict: status and number of results of each query of a batch, and totals.
+                  `hits` (duplicates) and `misses` (new urls) are counted in `dedup`
+        """
+        info = self.store.get_info(job) if isinstance(job, str) else None
+
+        if info is None:
+            raise KeyError(f'Invalid job `{job}`')
+
+        return info
+
+    def get_status(self, job: str) -> str:
+        """
+        Returns the current status of job.
+
+        Args:
+            job (str): job id returned by `scrape()`
 
         Returns:
             str: `done` script has completed.
-                 `invalid` invalid script.
+                 `error` script raised an error.
+                 `queued` script is waiting for a free slot.
                  `runnning` script is running.
-                 `stopped` script hasn't started
+                 `stopped` script was stopped or does not exist
+        """
+        status = self.store.get_status(job) if isinstance(job, str) else None
+
+        return status or 'stopped'
+
+    def wait(self, job: str, timeout: float = None) -> str:
         """
-        if not self.is_script(path):
-            return 'stopped'
+        Waits for a job running on this worker to complete.
 
-        if not isinstance(self.scripts[path]['future'], Future):
-            return 'invalid'
+        Args:
+            job (str): job id returned by `scrape()`
+            timeout (float, optional): maximum seconds to wait. Defaults to None.
 
-        if self.scripts[path]['future'].done():
-            return 'done'
+        Returns:
+            str: See `get_status()`
+        """
+        if self.is_local_script(job):
+            wait_futures([self.scripts[job]['future']], timeout)
 
-        return 'running'
+        return self.get_status(job)
 
-    def get_results(self, path: str) -> list:
+    def get_queue(self) -> dict:
         """
-        Return the collected results of a script.
+        Returns the number of queued and running jobs on all workers.
+
+        Returns:
+            dict: see `Scheduler.depth()`
+        """
+        return self.scheduler.depth()
+
+    def get_rows(self, job: str, since: int = 0, limit: int = RESULTS_LIMIT) -> List[Tuple[int, dict]]:
+        """
+        Returns a page of results of a job with the cursor of each result. Results of
+        local jobs are read from memory when still buffered. Records read progress
+        used by `wait_for_readers()`.
+
+        Args:
+            job (str): job id returned by `scrape()`
+            since (int, optional): cursor returned by a previous call. Defaults to 0.
+            limit (int, optional): maximum number of results. Defaults to `RESULTS_LIMIT`.
+
+        Returns:
+            List[Tuple[int, dict]]: `(cursor, result)` pairs in the order they were collected
+        """
+        info = self.scripts.get(job)
+        spill = self.get_spill(job)
+        since = max(0, since)
+        rows = None
+
+        if info is not None and info['buffer'].covers(since):
+            try:
+                rows = info['buffer'].read(since, limit)
+
+            except KeyError:
+                pass
+
+        if rows is None and spill is None:
+            # database records read progress itself
+            rows = self.store.get_rows(job, since, limit)
+
+        else:
+            rows = spill.read(since, limit) if rows is None else rows
+
+            if rows:
+                self.store.mark_read(job, rows[-1][0])
+
+        # wake up producer waiting for readers
+        if rows and info is not None and self.max_unread:
+            info['read_cursor'] = max(info['read_cursor'], rows[-1][0])
+            self.notify_script(job)
+
+        return rows
+
+    def get_results(self, job: str, since: int = 0, limit: int = RESULTS_LIMIT) -> Tuple[list, int]:
+        """
+        Return a page of the results of a job collected by any worker.
 
         Args:
-            path (str): script to get results of
+            job (str): job id returned by `scrape()`
+            since (int, optional): cursor returned by a previous call. Defaults to 0.
+            limit (int, optional): maximum number of results. Defaults to `RESULTS_LIMIT`.
 
         Raises:
-            KeyError: if script is not created first with `add_script()`
+            KeyError: if job is not created first with `add_script()`
 
         Returns:
-            list[dict]: results or an empty `[]` if no results have been collected
+            Tuple[list[dict], int]: results or an empty `[]` if no results have been collected
+                                    and the cursor to pass as `since` for the next page
         """
-        if not self.is_script(path):
-            raise KeyError(f'Invalid script `{path}`')
+        if not self.is_script(job):
+            raise KeyError(f'Invalid job `{job}`')
+
+        rows = self.get_rows(job, since, limit)
 
-        results = []
+        self.logger.debug('Fetched results: %d', len(rows))
 
-        # loop through results
-        if isinstance(self.scripts[path]['results'], list):
-            while len(self.scripts[path]['results']) > 0:
-                # transfer to results
-                result = self.scripts[path]['results'].pop()
+        return [result for _, result in rows], rows[-1][0] if rows else since
 
-                results.append(result)
+    def stream_results(
+        self,
+        job: str,
+        since: int = 0,
+        timeout: float = STREAM_TIMEOUT,
+    ) -> Generator[Tuple[int, dict], None, None]:
+        """
+        Generator that yields results of a job as they are stored, until the job
+        completes or `timeout` seconds have passed.
+
+        Args:
+            job (str): job id returned by `scrape()`
+            since (int, optional): cursor to resume from. Defaults to 0.
+            timeout (float, optional): maximum seconds to stream. Defaults to `STREAM_TIMEOUT`.
+
+        Yields:
+            Generator[Tuple[int, dict], None, None]: `(cursor, result)` pairs
+        """
+        deadline = time.monotonic() + timeout
 
-        self.logger.debug('Fetched results: %d', len(results))
+        while time.monotonic() < deadline:
+            # check status first so no results are missed after the job finishes
+            status = self.get_status(job)
+            rows = self.get_rows(job, since)
 
-        return results
+            for cursor, result in rows:
+                since = cursor
+                yield cursor, result
+
+            if rows:
+                continue
+
+            if status not in ('queued', 'running'):
+                return
+
+            info = self.scripts.get(job)
+
+            # local jobs notify readers, other workers are polled
+            if info is not None:
+                with info['updated']:
+                    info['updated'].wait(STREAM_INTERVAL)
+            else:
+                time.sleep(STREAM_INTERVAL)
 
     def __init__(self, **kwargs) -> None:
-        self.options = {**self.DEFAULT_OPTIONS, **kwargs}
+        options = {**self.DEFAULT_OPTIONS, **kwargs}
+        pool_size = options.pop('pool_size', MAX_SESSIONS)
+        max_uses = options.pop('max_uses', MAX_USES)
+        warm = options.pop('warm', WARM_SESSIONS)
+
+        database_uri = options.pop('database_uri', DATABASE_URI)
+        domain_limits = options.pop('domain_limits', DOMAIN_LIMITS)
+
+        self.max_jobs = options.pop('max_jobs', MAX_SESSIONS)
+        self.batch_size = options.pop('batch_size', BATCH_SIZE)
+        self.buffer_size = max(options.pop('buffer_size', BUFFER_SIZE), self.batch_size)
+        self.max_unread = options.pop('max_unread', MAX_UNREAD)
+        self.spill_dir = options.pop('spill_dir', SPILL_DIR)
+        self.persist_dedup = options.pop('persist_dedup', PERSIST_DEDUP)
+        self.spills = {}
+        self.options = options
         self.scripts = {}
-        self.executor = ThreadPoolExecutor(16)
+        # one thread per running job and one to warm up sessions
+        self.executor = ThreadPoolExecutor(self.max_jobs + 1)
+        self.pool = create_pool(create_driver, max_size=pool_size, max_uses=max_uses)
+        self.store = create_job_store(database_uri)
+        self.scheduler = create_scheduler(
+            self.store,
+            self.start_script,
+            self.cancel_script,
+            max_jobs=self.max_jobs,
+            domain_limits=domain_limits,
+        )
         self.logger = logging.Logger(__file__)
 
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+
+        # start browser sessions before first job
+        if warm > 0:
+            self.executor.submit(self.pool.warm, warm, **{**self.options, **self.WARM_OPTIONS})
+
     def __del__(self):
+        # stop local jobs
+        for info in self.scripts.values():
+            info['stopped'].set()
+
+        # stop starting queued jobs
+        self.scheduler.close()
+
         # free up thread executor
         self.executor.shutdown()
 
-        # clean up scripts
-        for script in self.scripts:
-            self.delete_script(script)
+        # stop idle browser sessions
+        self.pool.close()
 
 
 def create_scraper(**kwargs) -> Scraper:
@@ -314,6 +1178,23 @@ def create_scraper(**kwargs) -> Scraper:
         **user_agent (str): user Agent header. Default to `CHROME_USER_AGENT`
         **save_session (bool): if `True` then current session will be stored and loaded.
                                Default to `False`
+        **pool_size (int): maximum number of browser sessions. Defaults to `MAX_SESSIONS`
+        **max_uses (int): number of jobs before a browser session is recycled.
+                          Defaults to `MAX_USES`
+        **warm (int): number of browser sessions to start up front. Defaults to `WARM_SESSIONS`
+        **max_jobs (int): maximum number of jobs running on all workers.
+                          Defaults to `MAX_SESSIONS`
+        **database_uri (str): database shared by all workers. Defaults to `DATABASE_URI`
+        **domain_limits (Dict[str, int]): maximum number of running jobs per website.
+                                          Defaults to `DOMAIN_LIMITS`
+        **batch_size (int): number of results written per insert. Defaults to `BATCH_SIZE`
+        **buffer_size (int): number of results of a job kept in memory. Defaults to `BUFFER_SIZE`
+        **max_unread (int): number of unread results after which a job pauses until clients
+                            catch up. Defaults to `MAX_UNREAD` (never pause)
+        **spill_dir (str): directory shared by all workers to store results in instead of
+                           the database. Defaults to `SPILL_DIR`
+        **persist_dedup (bool): if `True` then results with a url returned by an earlier job
+                                of the same script are skipped. Defaults to `PERSIST_DEDUP`
         **kwargs (any): all extra arguments are forwarded to seleniums `Webdriver()`
                         constructor
 
@@ -6,11 +6,12 @@ import importlib
 import os
 import random
 import re
+import shutil
+import tempfile
 import time
 
 from abc import ABC, abstractmethod
-from typing import Generator
-from urllib.parse import urlparse
+from typing import BinaryIO, Dict, Generator, List, Union
 import requests
 from selenium.common.exceptions import (
     MoveTargetOutOfBoundsException,
@@ -24,6 +25,8 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import wait, expected_conditions as EC
 
+from .download import downloader
+
 SCRIPT_DIR = os.path.abspath(os.path.join(
     os.path.dirname(__file__),
     'scripts',
@@ -31,6 +34,95 @@ SCRIPT_DIR = os.path.abspath(os.path.join(
 
 SCRIPTS = []
 
+# evaluates `arguments[0]` and returns attributes of every matching link
+EXTRACT_LINKS_SCRIPT = '''
+    const nodes = document.evaluate(
+        arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null,
+    );
+    const links = [];
+
+    for (let index = 0; index < nodes.snapshotLength; index++) {
+        const node = nodes.snapshotItem(index);
+
+        links.push({
+            href: node.href || node.getAttribute('href') || '',
+            text: (node.innerText || '').trim(),
+        });
+    }
+
+    return {url: window.location.href, links: links};
+'''
+
+# returns whether each XPath in `arguments[0]` matches an element
+PROBE_SCRIPT = '''
+    return arguments[0].map((xpath) => {
+        try {
+            return document.evaluate(
+                xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null,
+            ).singleNodeValue !== null;
+        } catch (error) {
+            return false;
+        }
+    });
+'''
+PROBE_INTERVAL = 0.25
+
+# scrolls to the bottom until no content is added for `arguments[1]` milliseconds
+# or `arguments[0]` milliseconds have passed
+SCROLL_SCRIPT = '''
+    const [maxDuration, settle, done] = arguments;
+    const start = Date.now();
+    let height = -1;
+    let timer = null;
+    let finished = false;
+
+    const observer = new MutationObserver(() => wait());
+    const budget = setTimeout(() => finish(false), maxDuration);
+
+    function finish(stable) {
+        if (finished) {
+            return;
+        }
+
+        finished = true;
+        observer.disconnect();
+        clearTimeout(timer);
+        clearTimeout(budget);
+        done({stable: stable, height: document.body.scrollHeight, elapsed: Date.now() - start});
+    }
+
+    function wait() {
+        clearTimeout(timer);
+        timer = setTimeout(scroll, settle);
+    }
+
+    function scroll() {
+        // page is stable once scrolling adds no content
+        if (document.body.scrollHeight <= height) {
+            return finish(true);
+        }
+
+        height = document.body.scrollHeight;
+        window.scrollTo(0, height);
+        wait();
+    }
+
+    observer.observe(document.body, {childList: true, subtree: true});
+    scroll();
+'''
+SCROLL_DURATION = 10
+SCROLL_SETTLE = 500
+
+# milliseconds between keystrokes. `None` sends all keys at once
+TYPING_PROFILES = {
+    'fast': None,
+    'quick': (20, 80),
+    'human': (100, 400),
+}
+
+# seconds to wait for pages fetched without the browser
+FETCH_TIMEOUT = 30
+
 for directory in os.listdir(SCRIPT_DIR):
     abs_directory = os.path.join(SCRIPT_DIR, directory)
 
@@ -109,6 +201,19 @@ class Script (ABC):
         TypeError: if driver is not an instance of Webdriver
     """
     DEFAULT_OPTIONS = {}
+    # scheduling class of jobs. See `scheduler.PRIORITIES`
+    PRIORITY = 'bulk'
+    # website scraped by script. Used for per domain limits
+    DOMAIN = None
+    # maximum number of running jobs of script on all workers
+    MAX_JOBS = None
+    # default `send_keys()` profile. See `TYPING_PROFILES`
+    TYPING = 'human'
+    # result field holding a url. Results with a url found before are skipped.
+    # `None` keeps every result. See `dedup.DedupIndex`
+    DEDUP_KEY = None
+    # options of webdriver sessions used by script. See `scraper.create_driver()`
+    DRIVER_OPTIONS = {}
 
     @staticmethod
     def sleep(multiplier = 1):
@@ -132,27 +237,61 @@ class Script (ABC):
     @property
     def user_agent(self) -> str:
         """
-        Returns the current 'User-Agent' header of script.
+        Returns the current 'User-Agent' header of script. Cached for the whole session.
 
         Returns:
             str: `navigator.userAgent`
         """
-        return self.driver.execute_script('return navigator.userAgent;')
+        if 'user_agent' not in self.cache:
+            self.cache['user_agent'] = self.driver.execute_script('return navigator.userAgent;')
+
+        return self.cache['user_agent']
 
     @property
     def cookies(self) -> dict:
         """
-        Returns all set cookies as a dict.
+        Returns all set cookies as a dict. Cached until `invalidate_cache()` is called.
+        ie by `get()`, `refresh()`, `click()` and `send_keys()`.
 
         Returns:
             dict: set cookies
         """
-        cookies = {}
+        if 'cookies' not in self.cache:
+            self.cache['cookies'] = {
+                cookie['name']: cookie['value'] for cookie in self.driver.get_cookies()
+            }
+
+        return {**self.cache['cookies']}
+
+    def invalidate_cache(self, user_agent = False):
+        """
+        Forgets cached cookies. Call after cookies change outside of `Script` methods.
 
-        for cookie in self.driver.get_cookies():
-            cookies[cookie['name']] = cookie['value']
+        Args:
+            user_agent (bool, optional): If `True` will also forget the user agent.
+                                         Defaults to False.
+        """
+        self.cache.pop('cookies', None)
 
-        return cookies
+        if user_agent:
+            self.cache.pop('user_agent', None)
+
+    def get(self, url: str):
+        """
+        Navigates to `url`.
+
+        Args:
+            url (str): url to load
+        """
+        self.driver.get(url)
+        self.invalidate_cache()
+
+    def refresh(self):
+        """
+        Reloads the current page.
+        """
+        self.driver.refresh()
+        self.invalidate_cache()
 
     @property
     def page(self) -> int:
@@ -190,23 +329,62 @@ class Script (ABC):
 
         return wait.WebDriverWait(self.driver, 30).until(element_exists)
 
-    def exists(self, xpath: str) -> bool:
+    def probe(self, *xpaths: str, timeout: float = 0) -> Dict[str, bool]:
+        """
+        Determines which of several elements exist on a page using a single webdriver
+        request. Unlike `find_element()` it does not wait for `driver.implicitly_wait`.
+
+        Args:
+            *xpaths (str): XPaths of elements to find
+            timeout (float, optional): seconds to wait for any element to exist.
+                                       Defaults to 0.
+
+        Returns:
+            Dict[str, bool]: `True` for every XPath that was found and `False` otherwise
+        """
+        deadline = time.monotonic() + timeout
+
+        while True:
+            found = self.driver.execute_script(PROBE_SCRIPT, list(xpaths)) or []
+            result = {xpath: bool(value) for xpath, value in zip(xpaths, found)}
+
+            if any(result.values()) or time.monotonic() >= deadline:
+                return {xpath: result.get(xpath, False) for xpath in xpaths}
+
+            time.sleep(PROBE_INTERVAL)
+
+    def exists(self, xpath: str, timeout: float = 0) -> bool:
         """
-        Determines whether an element exists on a page.
+        Determines whether an element exists on a page. See `probe()`.
 
         Args:
             xpath (str): XPath of element to find
+            timeout (float, optional): seconds to wait for element to exist. Defaults to 0.
 
         Returns:
             bool: `True` if found and `False` otherwise
         """
-        try:
-            element_exists = EC.presence_of_element_located((By.XPATH, xpath))
+        return self.probe(xpath, timeout=timeout)[xpath]
 
-            wait.WebDriverWait(self.driver, 0).until(element_exists)
-            return True
-        except (NoSuchElementException, TimeoutException):
-            return False
+    def extract_links(self, xpath: str) -> dict:
+        """
+        Returns the `href` and visible text of every link found at XPath using a single
+        webdriver request.
+
+        Args:
+            xpath (str): XPath of links to extract
+
+        Returns:
+            dict: `url` of current page and `links`, a list of `{'href', 'text'}` dicts
+                  in document order
+        """
+        result = self.driver.execute_script(EXTRACT_LINKS_SCRIPT, xpath) or {}
+        links: List[dict] = result.get('links') or []
+
+        return {
+            'url': result.get('url', ''),
+            'links': links,
+        }
 
     def click(self, xpath: str) -> None:
         """
@@ -222,44 +400,124 @@ class Script (ABC):
         wait.WebDriverWait(self.driver, 30).until(element_clickable)
 
         ActionChains(self.driver).click().perform()
+        self.invalidate_cache()
 
         self.sleep(2)
 
-    def send_keys(self, xpath: str, keys: str, click = False) -> WebElement:
+    def send_keys(self, xpath: str, keys: str, click = False, typing: str = None) -> WebElement:
         """
         Sends keystrokes to an element
 
         Args:
             xpath (str): XPath of element to click
+            keys (str): keys to send
             click (bool, optional): If `True` will click on element before sending keys.
                                     Defaults to False.
+            typing (str, optional): key of `TYPING_PROFILES`. Defaults to `options['typing']`
+                                    or `TYPING`.
+
+        Raises:
+            TypeError: if `typing` is not a key of `TYPING_PROFILES`
+
+        Returns:
+            WebElement: element keys were sent to
         """
+        typing = typing or self.options.get('typing', self.TYPING)
+
+        if typing not in TYPING_PROFILES:
+            raise TypeError(f'typing should be one of {list(TYPING_PROFILES)}')
+
         # focus element
         if click:
             self.click(xpath)
         else:
             self.move_to(xpath)
 
-        # enter characters with delay between keystrokes
         element_exists = EC.presence_of_element_located((By.XPATH, xpath))
-        driver_wait = wait.WebDriverWait(self.driver, 10)
+        element = wait.WebDriverWait(self.driver, 10).until(element_exists)
+        delay = TYPING_PROFILES[typing]
+
+        element.clear()
+
+        if delay is None:
+            element.send_keys(keys)
+
+            # keys may submit a form
+            self.invalidate_cache()
 
-        driver_wait.until(element_exists).clear()
+            return element
+
+        # enter characters with delay between keystrokes in a single request
+        self.driver.execute_script('arguments[0].focus()', element)
+
+        actions = ActionChains(self.driver)
 
         for char in keys:
-            driver_wait.until(element_exists).send_keys(char)
-            time.sleep(random.randint(100,400) / 1000)
+            actions.send_keys(char).pause(random.randint(*delay) / 1000)
+
+        actions.perform()
+        self.invalidate_cache()
+
+        return element
+
+    def scroll_to_bottom(self, max_duration: float = SCROLL_DURATION, stealth: bool = None) -> bool:
+        """
+        Scrolls to the bottom of the current page until no more content is loaded.
+
+        Args:
+            max_duration (float, optional): maximum seconds to scroll.
+                                            Defaults to `SCROLL_DURATION`.
+            stealth (bool, optional): If `True` will scroll with key presses and mouse
+                                      movements like a user. Defaults to `options['stealth']`
+                                      or False.
+
+        Returns:
+            bool: `True` if page stopped growing within `max_duration` and `False` otherwise
+        """
+        if stealth is None:
+            stealth = self.options.get('stealth', False)
+
+        if stealth:
+            return self.scroll_like_user(max_duration)
+
+        # pooled sessions keep their timeout for later jobs
+        timeout = self.driver.timeouts.script
+
+        # scroll in page with a single request
+        self.driver.set_script_timeout(max_duration + 5)
+
+        try:
+            result = self.driver.execute_async_script(
+                SCROLL_SCRIPT,
+                int(max_duration * 1000),
+                SCROLL_SETTLE,
+            ) or {}
+
+        finally:
+            self.driver.set_script_timeout(timeout)
+
+        return bool(result.get('stable'))
 
-    def scroll_to_bottom(self):
+    def scroll_like_user(self, max_duration: float = SCROLL_DURATION) -> bool:
         """
-        Scrolls to the bottom of the current page.
+        Scrolls to the bottom of the current page with key presses and mouse movements.
+
+        Args:
+            max_duration (float, optional): maximum seconds to scroll.
+                                            Defaults to `SCROLL_DURATION`.
+
+        Returns:
+            bool: `True` if bottom was reached within `max_duration` and `False` otherwise
         """
+        deadline = time.monotonic() + max_duration
+
         # scroll down
         curr_x = 0
         count = 0
 
         while(
             count < 10
+            and time.monotonic() < deadline
             and self.driver.execute_script(
                 'return document.body.scrollHeight - window.scrollY;',
             ) > 1100
@@ -291,36 +549,90 @@ class Script (ABC):
 
         self.sleep(2)
 
-    def download(self, url: str) -> str:
+        return time.monotonic() < deadline
+
+    def fetch(self, url: str, **kwargs) -> requests.Response:
         """
-        Downloads a file from the internet.
+        Requests a page without the browser, with the cookies and user agent of `driver`.
+        Connections are pooled per webdriver session. See `Downloader.session()`.
 
         Args:
-            url (str): url of file to download
+            url (str): url of page
+            **params (dict): query string parameters
+            **timeout (float): seconds to wait for the server. Defaults to `FETCH_TIMEOUT`
+
+        Raises:
+            requests.RequestException: if server could not be reached
 
         Returns:
-            str: returns the path to the downloaded file
+            requests.Response: response of server
         """
-        # fetch url into file
-        response = requests.get(
+        return downloader.session(self.driver.session_id).get(
             url,
-            headers = {
+            params=kwargs.get('params'),
+            headers={
                 'User-Agent': self.user_agent,
                 'Referer': self.driver.current_url,
             },
             cookies=self.cookies,
-            stream = True,
+            timeout=kwargs.get('timeout', FETCH_TIMEOUT),
         )
 
-        filename = os.path.abspath(os.path.basename(
-            urlparse(url).path,
-        ))
+    @property
+    def download_dir(self) -> str:
+        """
+        Returns a temp directory for files downloaded by this script.
+        It is deleted by `cleanup()`.
+
+        Returns:
+            str: path of directory
+        """
+        if self.temp_dir is None:
+            self.temp_dir = tempfile.mkdtemp(prefix='scraper-')
+
+        return self.temp_dir
 
-        with open(filename, "wb") as handle:
-            for data in response.iter_content():
-                handle.write(data)
+    def download(
+        self,
+        url: str,
+        target: Union[str, BinaryIO] = None,
+        dedup = False,
+    ) -> Union[str, BinaryIO]:
+        """
+        Downloads a file from the internet with the cookies of `driver`.
 
-        return filename
+        Args:
+            url (str): url of file to download
+            target (Union[str, BinaryIO], optional): path or file object to write to.
+                                                     ie `io.BytesIO()` for small files.
+                                                     Defaults to a file in `download_dir`.
+            dedup (bool, optional): If `True` will not download the same url or store the
+                                    same content twice. Defaults to False.
+
+        Returns:
+            Union[str, BinaryIO]: returns the path to the downloaded file or `target`
+        """
+        return downloader.download(
+            url,
+            target,
+            directory=self.download_dir,
+            key=self.driver.session_id,
+            headers={
+                'User-Agent': self.user_agent,
+                'Referer': self.driver.current_url,
+            },
+            cookies=self.cookies,
+            dedup=dedup,
+        )
+
+    def cleanup(self):
+        """
+        Deletes files downloaded by this script.
+        """
+        if self.temp_dir is not None:
+            downloader.forget(self.temp_dir)
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
 
     def is_recaptcha(self):
         """
@@ -374,6 +686,7 @@ class Script (ABC):
         # close window
         self.driver.close()
         self.driver.switch_to.window(self.driver.window_handles[-1])
+        self.invalidate_cache()
 
         return text
 
@@ -432,6 +745,7 @@ class Script (ABC):
 
             # check results
             time.sleep(5)
+            self.invalidate_cache()
 
             error = self.driver.find_element(By.CLASS_NAME, 'rc-audiochallenge-error-message')
 
@@ -473,24 +787,41 @@ class Script (ABC):
         self.driver = driver
         self.current_page = 0
         self.max_page = 99
+        self.temp_dir = None
+        self.cache = {}
 
-def create_script(path: str, driver: WebDriver, **kwargs) -> Script:
+def load_script_class(path: str) -> type:
     """
-    Creates a `Script` from scraper directory from module in path.
+    Returns the `Script` class of module in path.
 
     Args:
         path (str): Relative position of script in scrapper directory
-        driver (WebDriver): Selenium `Webdriver` instance
 
     Raises:
         KeyError: if `path` does not point to a valid script module
 
     Returns:
-        Script: instance of `Script`
+        type: subclass of `Script`
     """
     mod = load_script(path)
 
     if not hasattr(mod, 'Script') or not isinstance(mod.Script, type):
         raise KeyError(f'invalid module ({path})')
 
-    return mod.Script(driver, **kwargs)
+    return mod.Script
+
+def create_script(path: str, driver: WebDriver, **kwargs) -> Script:
+    """
+    Creates a `Script` from scraper directory from module in path.
+
+    Args:
+        path (str): Relative position of script in scrapper directory
+        driver (WebDriver): Selenium `Webdriver` instance
+
+    Raises:
+        KeyError: if `path` does not point to a valid script module
+
+    Returns:
+        Script: instance of `Script`
+    """
+    return load_script_class(path)(driver, **kwargs)
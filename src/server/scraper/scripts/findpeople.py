@@ -3,30 +3,100 @@
 Script that finds people on `google.com`
 
 Searches for linkedin accounts, twitter accounts, facebook accounts.
+Result pages are fetched without the browser until google returns a challenge page.
 """
 
 from logging import debug
 from time import sleep
-from typing import Generator
+from typing import Generator, List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from selenium.webdriver.remote.webdriver import WebDriver
+import requests
 from selenium.common.exceptions import (
+    JavascriptException,
     NoSuchElementException,
     StaleElementReferenceException,
     TimeoutException
 )
-from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 
+from ..classifier import create_classifier
+from ..links import parse_links
 from ..script import Script as BaseClass
 
 URL = 'https://www.google.com'
 SOCIAL_QUERY = ' (inurl:linkedin|inurl:twitter|inurl:facebook)'
-SOCIAL_SITES = ['twitter.com/', 'facebook.com/', 'linkedin.com/in/']
+SOCIAL_PLATFORMS = frozenset(['linkedin', 'twitter', 'facebook'])
+RESULTS_PER_PAGE = 10
+# ids of elements holding search results
+RESULT_IDS = ('search', 'rso', 'main')
+# text of captcha pages
+CHALLENGE_MARKERS = ('id="captcha-form"', 'g-recaptcha', 'unusual traffic')
+
+# compiled once and shared by all jobs
+classifier = create_classifier()
+
+def search_url(query: str, page: int = 1) -> str:
+    """
+    Returns the url of a page of google search results for people matching `query`.
+
+    Args:
+        query (str): search string to find people
+        page (int, optional): page of results. Defaults to 1.
+
+    Returns:
+        str: url of result page
+    """
+    params = {'q': query + SOCIAL_QUERY}
+
+    if page > 1:
+        params['start'] = (page - 1) * RESULTS_PER_PAGE
+
+    return f'{URL}/search?{urlencode(params)}'
+
+def is_challenge(response: requests.Response) -> bool:
+    """
+    Validates if google returned a captcha or consent page instead of search results.
+
+    Args:
+        response (requests.Response): response of `Script.fetch()`
+
+    Returns:
+        bool: `True` if the page can only be solved in the browser
+    """
+    host = urlsplit(response.url).hostname or ''
+
+    return \
+        response.status_code != 200 \
+        or '/sorry/' in response.url \
+        or host.startswith('consent.') \
+        or any(marker in response.text for marker in CHALLENGE_MARKERS)
+
+def is_profile(result: dict) -> bool:
+    """
+    Validates if a search result links to a profile on `SOCIAL_PLATFORMS`.
+
+    Args:
+        result (dict): result of `Script.scrape_results()`
+
+    Returns:
+        bool: `True` if result is a profile
+    """
+    return result['platform'] in SOCIAL_PLATFORMS and bool(result['handle'])
 
 class Script (BaseClass):
     """
     Script that is imported by `Scraper` object.
     See `Scraper.scrape()` function.
     """
+    PRIORITY = 'bulk'
+    TYPING = 'quick'
+    DOMAIN = 'google.com'
+    # the same profile is often found by several queries
+    DEDUP_KEY = 'href'
+    # no login is needed, so batches are not limited to the one saved session.
+    # network events are never read
+    DRIVER_OPTIONS = {'save_session': False, 'performance_log': False}
 
     def click_next_page_link(self):
         """
@@ -80,9 +150,31 @@ class Script (BaseClass):
 
         return False
 
+    def page_url(self, page: int) -> str:
+        """
+        Returns the url of a page of the current search results. Other parameters of
+        the current search are kept. ie `filter=0`
+
+        Args:
+            page (int): page of results
+
+        Returns:
+            str: url of result page
+        """
+        if 'google.com/search' not in self.driver.current_url:
+            return search_url(self.query, page)
+
+        parts = urlsplit(self.driver.current_url)
+        params = [(name, value) for name, value in parse_qsl(parts.query) if name != 'start']
+
+        if page > 1:
+            params.append(('start', (page - 1) * RESULTS_PER_PAGE))
+
+        return urlunsplit(parts._replace(query=urlencode(params)))
+
     def go_to_page(self, page: int) -> bool:
         """
-        Navigates to a specific page.
+        Navigates directly to a specific page.
 
         Args:
             page (int): page to navigate to
@@ -92,11 +184,25 @@ class Script (BaseClass):
         """
         debug('Going to page: ' + str(page))
 
-        while self.current_page < page:
-            if not self.go_to_next_page():
-                return False
+        if page == self.current_page:
+            return True
+
+        if page < 1 or page > self.max_page:
+            return False
 
-        return True
+        try:
+            self.get(self.page_url(page))
+            self.current_page = page
+
+            if self.is_recaptcha():
+                return self.solve_recaptcha()
+
+            return True
+
+        except (TimeoutException, NoSuchElementException):
+            pass
+
+        return False
 
     def scrape_results(self) -> Generator[dict, None, None]:
         """
@@ -108,46 +214,120 @@ class Script (BaseClass):
         try:
             debug('Scraping results on page: ' + str(self.current_page))
 
-            user_agent = self.user_agent
-
-            for link in self.driver.find_elements(
-                By.XPATH,
-                '//*[@id="search" or @id="rso" or @id="main"]//a[@href]',
-            ):
-                href: str = link.get_attribute('href')
-
-                if \
-                    len(link.text) < 4 \
-                    or 'google.com' in href and not 'google.com/url?' in href \
-                    or 'googleusercontent.com' in href \
-                :
-                    continue
-
-                yield {
-                    'href': href,
-                    'text': link.text,
-                    'page': self.current_page,
-                    'userAgent': user_agent,
-                    'referer': self.driver.current_url,
-                }
+            xpath = ' or '.join(f'@id="{name}"' for name in RESULT_IDS)
 
-        except (TimeoutException, NoSuchElementException):
+            yield from self.parse_results(self.extract_links(f'//*[{xpath}]//a[@href]'))
+
+        except (TimeoutException, NoSuchElementException, JavascriptException):
             pass
 
+    def parse_results(self, page: dict) -> Generator[dict, None, None]:
+        """
+        Generator function that turns the links of a result page into search results.
+        Results get the `platform` and `handle` found by `classifier`.
+
+        Args:
+            page (dict): `url` and `links` of page. See `Script.extract_links()`
+
+        Yields:
+            Generator[dict, None, None]: search result
+        """
+        user_agent = self.user_agent
+
+        for link in page['links']:
+            href: str = link['href']
+
+            if len(link['text']) < 4:
+                continue
+
+            # google redirects are resolved by `classify()`
+            platform, handle = classifier.classify(href)
+
+            if platform == 'google':
+                continue
+
+            yield {
+                'href': href,
+                'platform': platform,
+                'handle': handle,
+                'text': link['text'],
+                'page': self.current_page,
+                'userAgent': user_agent,
+                'referer': page['url'],
+            }
+
+    def fetch_results(self, query: str, page: int) -> List[dict]:
+        """
+        Fetches a page of search results without the browser.
+
+        Args:
+            query (str): search string to find people
+            page (int): page of results
+
+        Returns:
+            List[dict]: search results or `None` if the page has to be loaded in the browser
+        """
+        try:
+            response = self.fetch(search_url(query, page))
+
+        except requests.RequestException:
+            return None
+
+        if is_challenge(response):
+            return None
+
+        links = parse_links(response.text, response.url, RESULT_IDS)
+
+        # unexpected page
+        if links is None:
+            return None
+
+        self.current_page = page
+
+        return list(self.parse_results({'url': response.url, 'links': links}))
+
+    def scrape_http(self, query: str, page: int) -> Generator[dict, None, int]:
+        """
+        Generator function that scrapes profiles on result pages fetched without the browser.
+
+        Args:
+            query (str): search string to find people
+            page (int): page to start on
+
+        Yields:
+            Generator[dict, None, int]: search result. Returns the page to continue on
+                                        in the browser, or 0 once all pages are scraped
+        """
+        while page <= self.max_page:
+            debug('Fetching page: ' + str(page))
+
+            results = self.fetch_results(query, page)
+
+            if results is None:
+                return page
+
+            # past the last page
+            if not results:
+                return 0
+
+            yield from filter(is_profile, results)
+
+            page += 1
+            self.sleep()
+
+        return 0
+
     def scrape(self) -> Generator[dict, None, None]:
         """
-        Generator function that scrapes search results on current all pages.
+        Generator function that scrapes profiles on `SOCIAL_PLATFORMS` in search results
+        on current all pages.
 
         Yields:
             Generator[dict, None, None]: search result
         """
         while True:
             # get results for current page
-            for result in self.scrape_results():
-                for test_string in SOCIAL_SITES:
-                    if test_string in result['href']:
-                        yield result
-                        break
+            yield from filter(is_profile, self.scrape_results())
 
             # go to next page
             if not self.go_to_next_page():
@@ -162,6 +342,8 @@ class Script (BaseClass):
             **page (int): Starting page to start execution. Default to 1
             **retries (int): number of times to retry execution. Default to 2
             **query (str): search string to find people. Default to ''
+            **http (bool): fetch result pages without the browser until google returns a
+                           challenge page. Default to True
             **kwargs (dict[str, any]): Used to pass arguments to script
 
 
@@ -169,10 +351,11 @@ class Script (BaseClass):
             Generator[dict, None, None]: Returns a list of `dict` values
         """
         options = {**self.options, **kwargs}
-        self.max_page = options.pop('max_page', 99)
-        page = options.pop('page', 1)
-        retries = options.pop('retries', 2)
+        self.max_page = int(options.pop('max_page', 99))
+        page = int(options.pop('page', 1))
+        retries = int(options.pop('retries', 2))
         query = options.pop('query', '')
+        http = options.pop('http', True) not in (False, 0, '0', 'false')
 
         # exit early if no query
         if len(query) < 2:
@@ -181,18 +364,32 @@ class Script (BaseClass):
         try:
             # go to google.com website
             if 'google.com/search' not in self.driver.current_url:
-                self.driver.get(URL)
+                self.get(URL)
 
-            debug('Entering query: ' + query)
+            # browser is only used for session cookies while pages can be fetched
+            if http:
+                page = yield from self.scrape_http(query, page)
 
-            query = query + SOCIAL_QUERY + Keys.ENTER
+                if not page:
+                    return
 
-            self.send_keys('//*[@name="q"]', query, True)
+                debug('Continuing in browser on page: ' + str(page))
 
-            self.current_page = 1
+            self.query = query
+
+            # resume on start page with a single navigation
+            if page > 1:
+                if not self.go_to_page(page):
+                    return
 
-            # navigate to start page
-            self.go_to_page(page)
+            else:
+                debug('Entering query: ' + query)
+
+                query = query + SOCIAL_QUERY + Keys.ENTER
+
+                self.send_keys('//*[@name="q"]', query, True)
+
+                self.current_page = 1
 
             # parse results
             yield from self.scrape()
@@ -205,6 +402,15 @@ class Script (BaseClass):
             if retries < 1:
                 raise err
 
-            # Try again
-            self.driver.refresh()
-            self.execute(**kwargs, retries=retries - 1)
+            # Try again from the page that failed
+            self.refresh()
+            yield from self.execute(**{
+                **kwargs,
+                'page': max(self.current_page, page),
+                'retries': retries - 1,
+            })
+
+    def __init__(self, driver: WebDriver, **kwargs) -> None:
+        super().__init__(driver, **kwargs)
+
+        self.query = ''
@@ -19,6 +19,12 @@ class Script (BaseClass):
     Script that is imported by `Scraper` object.
     See `Scraper.scrape()` function.
     """
+    PRIORITY = 'interactive'
+    TYPING = 'human'
+    DOMAIN = 'google.com'
+    MAX_JOBS = 1
+    # logged in session is kept for other scripts
+    DRIVER_OPTIONS = {'save_session': True}
 
     def goto_login_page(self):
         """
@@ -72,7 +78,7 @@ class Script (BaseClass):
             return
 
         try:
-            self.driver.get(URL)
+            self.get(URL)
 
             if self.goto_login_page():
                 debug('Entering email address')
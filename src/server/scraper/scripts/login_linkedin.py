@@ -7,6 +7,7 @@ from typing import Generator
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.common.keys import Keys
 
+from ..linkedinapi import ACCOUNT, LinkedInAPI, save_auth
 from ..script import Script as BaseClass
 
 URL = 'https://www.linkedin.com/home'
@@ -19,12 +20,25 @@ class Script (BaseClass):
     Script that is imported by `Scraper` object.
     See `Scraper.scrape()` function.
     """
+    PRIORITY = 'interactive'
+    TYPING = 'human'
+    DOMAIN = 'linkedin.com'
+    MAX_JOBS = 1
+    # logged in session is kept for other scripts
+    DRIVER_OPTIONS = {'save_session': True}
 
     def goto_login_page(self):
         """
         Navigates to login page.
         """
-        if self.exists('//ul[contains(@class, "nav")]'):
+        # wait for either navigation bar or login button
+        page = self.probe(
+            '//ul[contains(@class, "nav")]',
+            '//a[contains(@href, "linkedin.com/login")]',
+            timeout=10,
+        )
+
+        if page['//ul[contains(@class, "nav")]']:
             debug('User already logged in')
             return False
 
@@ -33,8 +47,8 @@ class Script (BaseClass):
         # click login button
         self.click('//a[contains(@href, "linkedin.com/login")]')
 
-        # check for input field
-        if not self.exists('//input[@id="username"]'):
+        # check for input field once login page has loaded
+        if not self.exists('//input[@id="username"]', 5):
             # click on use another account button
             self.click('(//*[@tabindex="0"])[last()-1]')
 
@@ -50,6 +64,8 @@ class Script (BaseClass):
             **retries (int): number of times to retry execution. Default to 2
             **user_name (str, optional): email address of google user. Defaults to SERVER_EMAIL.
             **user_pass (str, optional): password of google user. Defaults to SERVER_SECRET.
+            **account (str, optional): name of stored auth used by `LinkedInAPI`.
+                                       Defaults to `ACCOUNT`.
             **kwargs (dict[str, any]): Used to pass arguments to script
 
         Raises:
@@ -64,6 +80,7 @@ class Script (BaseClass):
         retries = options.pop('retries', 2)
         user_name = options.pop('user_name', '')
         user_pass = options.pop('user_pass', '')
+        account = options.pop('account', ACCOUNT)
         retries = options.pop('retries', 2)
 
         # exit early if no user name / pass
@@ -72,7 +89,7 @@ class Script (BaseClass):
             return
 
         try:
-            self.driver.get(URL)
+            self.get(URL)
 
             if self.goto_login_page():
                 debug('Entering email address')
@@ -83,6 +100,10 @@ class Script (BaseClass):
                 self.send_keys('//input[@id="password"]', user_pass + Keys.ENTER, True)
                 self.sleep(10)
 
+            # share cookies and headers with API clients
+            if LinkedInAPI.is_logged_in(self.driver):
+                save_auth(self.driver, account)
+
             yield SUCCESS
 
         except NoSuchElementException:
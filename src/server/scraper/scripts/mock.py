@@ -12,5 +12,13 @@ MOCK_RESULT = {
 
 class Script (BaseScript):
     def execute(self, **kwargs) -> Generator[dict, None, None]:
-        yield MOCK_RESULT
+        # number of times result is yielded. `0` never stops
+        repeat = int(kwargs.pop('repeat', 1))
+        count = 0
+
+        while not repeat or count < repeat:
+            count += 1
+
+            # arguments are echoed so batches can be tested
+            yield {**MOCK_RESULT, **kwargs}
 
@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""
+Mock script for testing duplicate results.
+"""
+from .mock import Script as MockScript
+
+class Script (MockScript):
+    # results with the same `href` argument are skipped
+    DEDUP_KEY = 'href'
@@ -9,15 +9,44 @@ Tests for `findpeople` script.
 
 from functools import reduce
 import pytest
+import requests
 from selenium.webdriver.common.keys import Keys
 
-from .findpeople import Script
+from .findpeople import SOCIAL_PLATFORMS, Script, is_challenge, search_url
 from ..scraper import create_script
 
 @pytest.fixture
 def script(driver):
     return create_script('findpeople', driver)
 
+def test_search_url():
+    assert search_url('foo bar') \
+        == 'https://www.google.com/search?q=foo+bar+%28inurl%3Alinkedin%7Cinurl%3Atwitter%7Cinurl%3Afacebook%29' \
+        , 'Should search for social profiles'
+
+    assert search_url('foo', 3).endswith('&start=20') \
+        , 'Should set offset of page'
+
+def test_is_challenge():
+    response = requests.Response()
+    response.status_code = 200
+    response.url = 'https://www.google.com/search?q=foo'
+    response._content = b'<div id="search"></div>' # pylint: disable=protected-access
+
+    assert not is_challenge(response) \
+        , 'Should return `False` for result pages'
+
+    response.url = 'https://www.google.com/sorry/index?continue=foo'
+
+    assert is_challenge(response) \
+        , 'Should return `True` for captcha pages'
+
+    response.url = 'https://www.google.com/search?q=foo'
+    response.status_code = 429
+
+    assert is_challenge(response) \
+        , 'Should return `True` for errors'
+
 class TestScript:
     def click_next_page_link(self, script: Script):
         pass
@@ -65,6 +94,19 @@ class TestScript:
         assert script.current_page == 3 \
             , 'Should update page pointer'
 
+    def test_page_url(self, script: Script):
+        script.driver.get('http://example.com/')
+        script.query = 'foo'
+
+        assert script.page_url(2) == search_url('foo', 2) \
+            , 'Should build url from query'
+
+        script.driver.get('https://www.google.com/search?q=bar&filter=0&start=10')
+        url = script.page_url(3)
+
+        assert 'q=bar' in url and 'filter=0' in url and url.endswith('start=20') \
+            , 'Should keep parameters of current search'
+
     def test_go_to_page(self, script: Script):
         # go to google.com website
         if 'google.com/search' not in script.driver.current_url:
@@ -85,6 +127,9 @@ class TestScript:
         assert script.current_page == 4 \
             , 'Should update page pointer'
 
+        assert script.go_to_page(2) is True and script.current_page == 2 \
+            , 'Should navigate to earlier pages'
+
     def test_scrape_results(self, script):
         """
         Test if `scrape_results()` returns search results
@@ -112,6 +157,18 @@ class TestScript:
         assert len(results) > 5 \
             , 'Should return more than 5 results'
 
+    def test_scrape_http(self, script: Script):
+        script.driver.get('https://google.com')
+        script.max_page = 2
+
+        results = list(script.scrape_http('software engineer', 1))
+
+        assert all(result['platform'] in SOCIAL_PLATFORMS for result in results) \
+            , 'Should return profiles on social platforms'
+
+        assert len(results) > 5 or script.current_page < 2 \
+            , 'Should fetch pages until a challenge page is returned'
+
     def test_scrape(self, script):
         """
         Test if `scrape()` returns search results
@@ -131,6 +188,9 @@ class TestScript:
         results = []
 
         for result in script.scrape():
+            assert result['platform'] in SOCIAL_PLATFORMS and result['handle'] \
+                , 'Should return profiles on social platforms'
+
             results.append(result)
 
             # quit after 20 results
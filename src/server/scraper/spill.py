@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Defines functions and classes for spilling results of a `Scraper` job to disk.
+"""
+import json
+import os
+import threading
+from typing import List, Tuple
+
+SPILL_DIR = os.environ.get('SCRAPER_SPILL_DIR')
+INDEX_STEP = 256
+
+class SpillFile:
+    """
+    Append-only file holding the results of a job, one compact JSON document per line.
+
+    The sequence number of a result is its line number. Only the offset of every
+    `step`th line is kept in memory so that reads can seek close to a cursor.
+
+    Args:
+        path (str): path of spill file
+        step (int, optional): number of lines between indexed offsets. Defaults to `INDEX_STEP`
+    """
+
+    def append(self, rows: List[Tuple[int, dict]]):
+        """
+        Writes results to the end of the file.
+
+        Args:
+            rows (List[Tuple[int, dict]]): `(seq, result)` pairs. See `ResultBuffer.pending()`
+
+        Raises:
+            KeyError: if `rows` do not continue the sequence numbers already written
+        """
+        if not rows:
+            return
+
+        with self.lock:
+            self._index()
+
+            if rows[0][0] != self.count + 1:
+                raise KeyError(f'expected result {self.count + 1} but got {rows[0][0]}')
+
+            lines = [
+                json.dumps(result, separators=(',', ':')).encode() + b'\n'
+                for _, result in rows
+            ]
+
+            with open(self.path, 'ab') as file:
+                file.writelines(lines)
+
+            for line in lines:
+                self._add_line(len(line))
+
+    def read(self, since: int = 0, limit: int = None) -> List[Tuple[int, dict]]:
+        """
+        Returns results after `since`.
+
+        Args:
+            since (int, optional): cursor returned by a previous read. Defaults to 0.
+            limit (int, optional): maximum number of results. Defaults to None.
+
+        Returns:
+            List[Tuple[int, dict]]: `(seq, result)` pairs, oldest first
+        """
+        with self.lock:
+            self._index()
+
+            last_seq = self.count
+
+            if limit is not None:
+                last_seq = min(last_seq, since + limit)
+
+            if since >= last_seq:
+                return []
+
+            seq = since // self.step * self.step
+            rows = []
+
+            with open(self.path, 'rb') as file:
+                file.seek(self.offsets[seq // self.step])
+
+                for line in file:
+                    seq += 1
+
+                    if seq > last_seq:
+                        break
+
+                    if seq > since:
+                        rows.append((seq, json.loads(line)))
+
+            return rows
+
+    def remove(self):
+        """
+        Deletes the file.
+        """
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+            self.count = self.size = 0
+            self.offsets = [0]
+
+    def _index(self):
+        # pick up lines written by other workers
+        if not os.path.exists(self.path) or os.path.getsize(self.path) <= self.size:
+            return
+
+        with open(self.path, 'rb') as file:
+            file.seek(self.size)
+
+            for line in file:
+                # skip a line that is still being written
+                if not line.endswith(b'\n'):
+                    break
+
+                self._add_line(len(line))
+
+    def _add_line(self, length: int):
+        self.count += 1
+        self.size += length
+
+        if self.count % self.step == 0:
+            self.offsets.append(self.size)
+
+    def __len__(self) -> int:
+        with self.lock:
+            self._index()
+
+            return self.count
+
+    def __init__(self, path: str, step: int = INDEX_STEP) -> None:
+        if step < 1:
+            raise TypeError('step should be an number larger than 0')
+
+        self.path = path
+        self.step = step
+        self.count = 0
+        self.size = 0
+        self.offsets = [0]
+        self.lock = threading.Lock()
+
+
+def create_spill(path: str, step: int = INDEX_STEP) -> SpillFile:
+    """
+    Factory function for `SpillFile`.
+
+    Args:
+        path (str): path of spill file
+        step (int, optional): number of lines between indexed offsets. Defaults to `INDEX_STEP`
+
+    Returns:
+        SpillFile: an instance of `SpillFile`
+    """
+    return SpillFile(path, step)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for `auth` module.
+"""
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+import os
+import stat
+import pytest
+
+from .auth import AuthCache, create_auth_cache
+
+COOKIES = [
+    {'name': 'li_at', 'value': 'foo', 'domain': '.linkedin.com', 'path': '/', 'secure': True},
+]
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'auth.json')
+
+class TestAuthCache:
+    def test_get(self, path):
+        cache = AuthCache(path)
+
+        assert cache.get('foo') is None \
+            , 'Should return `None` if auth is missing'
+
+        cache.set('foo', COOKIES, {'csrf-token': 'bar'})
+
+        assert cache.get('foo')['cookies'] == COOKIES \
+            , 'Should return stored cookies'
+
+        assert AuthCache(path).get('foo')['headers'] == {'csrf-token': 'bar'} \
+            , 'Should share auth through file'
+
+    def test_set(self, path):
+        cache = AuthCache(path)
+        other = AuthCache(path)
+
+        other.get('foo')
+        cache.set('foo', COOKIES, {})
+
+        assert other.get('foo')['stored'] == cache.get('foo')['stored'] \
+            , 'Should read auth stored by other workers'
+
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600 \
+            , 'Should only be readable by owner'
+
+        assert AuthCache().set('foo', COOKIES, {})['cookies'] == COOKIES \
+            , 'Should keep auth in memory without a file'
+
+    def test_remove(self, path):
+        cache = AuthCache(path)
+        cache.set('foo', COOKIES, {})
+        cache.remove('foo')
+
+        assert AuthCache(path).get('foo') is None \
+            , 'Should remove auth'
+
+def test_create_auth_cache(path):
+    assert isinstance(create_auth_cache(path), AuthCache) \
+        , 'Should create an `AuthCache` object'
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for `buffer` module.
+"""
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+import pytest
+
+from .buffer import ResultBuffer, create_buffer
+
+class TestResultBuffer:
+    @pytest.fixture
+    def buffer(self) -> ResultBuffer:
+        return ResultBuffer(3)
+
+    def test_append(self, buffer: ResultBuffer):
+        assert buffer.append({'foo': 1}) == 1 \
+            , 'Should return sequence number'
+
+        assert buffer.append({'foo': 2}) == 2 \
+            , 'Should increase sequence number'
+
+        buffer.append({'foo': 3})
+
+        # Should refuse results once every slot needs flushing
+        with pytest.raises(OverflowError):
+            buffer.append({'foo': 4})
+
+        buffer.mark_flushed(1)
+
+        assert buffer.append({'foo': 4}) == 4 \
+            , 'Should reuse flushed slots'
+
+    def test_full(self, buffer: ResultBuffer):
+        for number in range(3):
+            assert not buffer.full() \
+                , 'Should not be full'
+
+            buffer.append({'foo': number})
+
+        assert buffer.full() \
+            , 'Should be full'
+
+    def test_pending(self, buffer: ResultBuffer):
+        buffer.append({'foo': 1})
+        buffer.append({'foo': 2})
+        buffer.mark_flushed(1)
+
+        assert buffer.pending() == [(2, {'foo': 2})] \
+            , 'Should return results that are not flushed'
+
+    def test_read(self, buffer: ResultBuffer):
+        for number in range(1, 6):
+            buffer.append({'foo': number})
+            buffer.mark_flushed(number)
+
+        assert buffer.read(2) == [(3, {'foo': 3}), (4, {'foo': 4}), (5, {'foo': 5})] \
+            , 'Should return results in order'
+
+        assert buffer.read(2, 1) == [(3, {'foo': 3})] \
+            , 'Should return `limit` results'
+
+        assert buffer.read(5) == [] \
+            , 'Should return nothing after the last result'
+
+        assert not buffer.covers(1) \
+            , 'Should not cover overwritten results'
+
+        # Should raise an error for overwritten results
+        with pytest.raises(KeyError):
+            buffer.read(1)
+
+    def test__len__(self, buffer: ResultBuffer):
+        assert len(buffer) == 0 \
+            , 'Should be empty'
+
+        for number in range(5):
+            buffer.append({'foo': number})
+            buffer.mark_flushed(number + 1)
+
+        assert len(buffer) == 3 \
+            , 'Should not grow over capacity'
+
+def test_create_buffer():
+    assert isinstance(create_buffer(), ResultBuffer) \
+        , 'Should create a `ResultBuffer` object'
+
+    # Should raise an error for invalid capacity
+    with pytest.raises(TypeError):
+        create_buffer(0)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for `cache` module.
+"""
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+import os
+
+import pytest
+
+from .cache import ResponseCache, create_cache
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(2, 60, str(tmp_path))
+
+class TestResponseCache:
+    def test_get(self, cache: ResponseCache):
+        assert cache.get('foo') is None \
+            , 'Should return `None` if entry is missing'
+
+        cache.set('foo', {'a': 1})
+
+        assert cache.get('foo') == {'a': 1} \
+            , 'Should return cached value'
+
+        cache.ttl = -1
+
+        assert cache.get('foo') is None \
+            , 'Should return `None` if entry is expired'
+
+    def test_get_entry(self, cache: ResponseCache):
+        cache.set('foo', 1, etag='"bar"', modified='Wed, 21 Oct 2015 07:28:00 GMT')
+        cache.ttl = -1
+
+        assert cache.get_entry('foo')['etag'] == '"bar"' \
+            , 'Should return expired entries with validators'
+
+        assert cache.get_entry('bar') is None \
+            , 'Should return `None` if entry is missing'
+
+    def test_set(self, cache: ResponseCache, tmp_path):
+        cache.set('foo', 1)
+        cache.set('bar', 2)
+        cache.get('foo')
+        cache.set('baz', 3)
+
+        assert len(cache) == 2 and 'bar' not in cache.entries \
+            , 'Should evict least recently used entry'
+
+        assert ResponseCache(2, 60, str(tmp_path)).get('foo') == 1 \
+            , 'Should read entries of other workers from disk'
+
+        assert ResponseCache(2, 60, str(tmp_path)).get('bar') is None \
+            and len(os.listdir(tmp_path)) == 2 \
+            , 'Should remove evicted entries from disk'
+
+        assert ResponseCache(2, 60).get('foo') is None \
+            , 'Should only keep entries in memory without a directory'
+
+    def test_touch(self, cache: ResponseCache):
+        cache.set('foo', 1)
+        cache.entries['foo']['stored'] -= 120
+
+        assert cache.touch('foo') == 1 and cache.get('foo') == 1 \
+            , 'Should make entry fresh again'
+
+        assert cache.touch('bar') is None \
+            , 'Should return `None` if entry is missing'
+
+    def test_stats(self, cache: ResponseCache):
+        cache.set('foo', 1)
+        cache.get('foo')
+        cache.get('foo')
+        cache.get('bar')
+        cache.touch('foo')
+        stats = cache.stats()
+
+        assert stats['hits'] == 2 and stats['misses'] == 1 \
+            , 'Should count hits and misses'
+
+        assert stats['ratio'] == 2 / 3 \
+            , 'Should return hit ratio'
+
+        assert stats['revalidated'] == 1 and stats['size'] == 1 \
+            , 'Should count revalidated entries'
+
+def test_create_cache(tmp_path):
+    assert isinstance(create_cache(directory=str(tmp_path)), ResponseCache) \
+        , 'Should create a `ResponseCache` object'
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for `classifier` module.
+"""
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+import pytest
+
+from .classifier import UrlClassifier, create_classifier
+
+class TestUrlClassifier:
+    @pytest.fixture
+    def classifier(self) -> UrlClassifier:
+        return UrlClassifier()
+
+    def test_classify(self, classifier: UrlClassifier):
+        assert classifier.classify('https://uk.linkedin.com/in/foo-bar-123/?trk=baz') \
+            == ('linkedin', 'foo-bar-123') \
+            , 'Should return platform and handle of profile urls'
+
+        assert classifier.classify(
+            'https://www.google.com/url?q=https://twitter.com/foo/status/1&sa=U'
+        ) == ('twitter', 'foo') \
+            , 'Should resolve google redirects'
+
+        assert classifier.classify('https://m.facebook.com/profile.php?id=123') \
+            == ('facebook', '123') \
+            , 'Should return profile ids'
+
+        assert classifier.classify('https://github.com/foo-bar') == ('github', 'foo-bar') \
+            , 'Should find handles on other platforms'
+
+        assert classifier.classify('https://twitter.com/search?q=foo') == ('twitter', None) \
+            , 'Should not return a handle for other pages of a platform'
+
+        assert classifier.classify('https://www.google.com/search?q=foo') == ('google', None) \
+            , 'Should recognise search engine links'
+
+        assert classifier.classify('https://example.com/in/foo') == (None, None) \
+            , 'Should return `None` for other websites'
+
+    def test_canonical(self, classifier: UrlClassifier):
+        assert classifier.canonical('https://uk.linkedin.com/in/foo/?trk=bar') \
+            == classifier.canonical('https://www.linkedin.com/in/foo') == 'linkedin:foo' \
+            , 'Should return the same key for urls of the same profile'
+
+        assert classifier.canonical('https://www.example.com/foo/') == 'https://example.com/foo' \
+            , 'Should normalise other urls'
+
+    def test_platform(self, classifier: UrlClassifier):
+        assert classifier.platform('uk.linkedin.com') == 'linkedin' \
+            , 'Should match subdomains'
+
+        assert classifier.platform('notlinkedin.com') is None \
+            , 'Should only match whole domain names'
+
+def test_create_classifier():
+    classifier = create_classifier({'example': (('example.com',), r'/u/(\w+)')})
+
+    assert classifier.classify('https://example.com/u/foo') == ('example', 'foo') \
+        , 'Should create a `UrlClassifier` object with custom platforms'
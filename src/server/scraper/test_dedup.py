@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for `dedup` module.
+"""
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+from .classifier import create_classifier
+from .dedup import DedupIndex, create_dedup_index, normalize_url
+from .jobstore import JobStore
+
+def test_normalize_url():
+    assert normalize_url('https://www.linkedin.com/in/foo/') == 'https://linkedin.com/in/foo' \
+        , 'Should remove `www.` and trailing slashes'
+
+    assert normalize_url('http://M.LinkedIn.com:443/in/foo?trk=bar&utm_source=baz#top') \
+        == 'https://linkedin.com/in/foo' \
+        , 'Should canonicalise scheme and host and remove tracking parameters'
+
+    assert normalize_url(
+        'https://www.google.com/url?q=https://twitter.com/foo/&sa=U&ved=bar'
+    ) == 'https://twitter.com/foo' \
+        , 'Should resolve google redirects'
+
+    assert normalize_url('https://facebook.com/profile.php?id=1&a=2') \
+        == normalize_url('https://facebook.com/profile.php?a=2&id=1') \
+        , 'Should keep other parameters in a fixed order'
+
+    assert normalize_url('https://linkedin.com/in/f%C3%B6o') == normalize_url('https://linkedin.com/in/föo') \
+        , 'Should encode paths the same way'
+
+class TestDedupIndex:
+    def test_add(self):
+        index = DedupIndex()
+
+        assert index.add('https://linkedin.com/in/foo') \
+            , 'Should return `True` for new urls'
+
+        assert not index.add('https://www.linkedin.com/in/foo/') \
+            , 'Should return `False` for duplicate urls'
+
+        assert index.stats() == {'hits': 1, 'misses': 1} \
+            , 'Should count duplicate and new urls'
+
+        index = DedupIndex(canonical=create_classifier().canonical)
+        index.add('https://linkedin.com/in/foo')
+
+        assert not index.add('https://uk.linkedin.com/in/foo') \
+            , 'Should compare urls with `canonical`'
+
+    def test_add_store(self):
+        store = JobStore('sqlite://')
+
+        assert DedupIndex(store, 'mock').add('https://linkedin.com/in/foo') \
+            , 'Should return `True` for new urls'
+
+        index = DedupIndex(store, 'mock')
+
+        assert not index.add('https://linkedin.com/in/foo') \
+            , 'Should skip urls found by earlier jobs'
+
+        assert DedupIndex(store, 'other').add('https://linkedin.com/in/foo') \
+            , 'Should keep urls of each scope apart'
+
+        assert index.stats() == {'hits': 1, 'misses': 0} \
+            , 'Should count urls found by earlier jobs as duplicates'
+
+def test_create_dedup_index():
+    assert isinstance(create_dedup_index(), DedupIndex) \
+        , 'Should create a `DedupIndex` object'
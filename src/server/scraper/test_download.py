@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for `download` module.
+"""
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import os
+import threading
+
+import pytest
+import requests
+
+from .download import Downloader, create_downloader
+
+class Handler(BaseHTTPRequestHandler):
+    requests = 0
+
+    def do_GET(self):
+        # pylint: disable=invalid-name
+        Handler.requests += 1
+
+        if self.path == '/missing':
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = b'foo' * 100000
+
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope='module')
+def server():
+    instance = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=instance.serve_forever, daemon=True).start()
+
+    yield f'http://127.0.0.1:{instance.server_port}'
+
+    instance.shutdown()
+
+class TestDownloader:
+    @pytest.fixture
+    def downloader(self) -> Downloader:
+        return Downloader(max_sessions=1)
+
+    def test_session(self, downloader: Downloader):
+        session = downloader.session('foo')
+
+        assert downloader.session('foo') is session \
+            , 'Should reuse sessions'
+
+        downloader.session('bar')
+
+        assert list(downloader.sessions) == ['bar'] \
+            , 'Should close least recently used sessions'
+
+    def test_download(self, downloader: Downloader, server: str, tmp_path):
+        path = downloader.download(f'{server}/foo.mp3', directory=str(tmp_path))
+
+        assert path == str(tmp_path / 'foo.mp3') \
+            , 'Should name file after url'
+
+        with open(path, 'rb') as file:
+            assert file.read() == b'foo' * 100000 \
+                , 'Should write whole file'
+
+        assert downloader.download(f'{server}/foo.mp3', directory=str(tmp_path)) \
+            == str(tmp_path / 'foo-1.mp3') \
+            , 'Should not overwrite files'
+
+        assert downloader.download(f'{server}/foo.mp3', io.BytesIO()).getvalue() \
+            == b'foo' * 100000 \
+            , 'Should write into file objects'
+
+        # Should raise an error for missing files
+        with pytest.raises(requests.HTTPError):
+            downloader.download(f'{server}/missing', directory=str(tmp_path))
+
+    def test_download_dedup(self, downloader: Downloader, server: str, tmp_path):
+        path = downloader.download(f'{server}/foo.mp3', directory=str(tmp_path), dedup=True)
+        count = Handler.requests
+
+        assert downloader.download(f'{server}/foo.mp3', directory=str(tmp_path), dedup=True) \
+            == path and Handler.requests == count \
+            , 'Should not download the same url twice'
+
+        assert downloader.download(f'{server}/bar.mp3', directory=str(tmp_path), dedup=True) \
+            == path \
+            , 'Should not store the same content twice'
+
+        assert os.listdir(tmp_path) == ['foo.mp3'] \
+            , 'Should remove duplicate files'
+
+        downloader.forget(str(tmp_path))
+
+        assert downloader.urls == {} and downloader.hashes == {} \
+            , 'Should forget downloads'
+
+    def test_download_dedup_threads(self, downloader: Downloader, server: str, tmp_path):
+        count = Handler.requests
+        paths = []
+
+        def download():
+            paths.append(
+                downloader.download(f'{server}/foo.mp3', directory=str(tmp_path), dedup=True)
+            )
+
+        threads = [threading.Thread(target=download) for _ in range(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        assert Handler.requests == count + 1 and len(set(paths)) == 1 \
+            , 'Should download the same url once across threads'
+
+        assert os.listdir(tmp_path) == ['foo.mp3'] \
+            , 'Should store a single file across threads'
+
+def test_create_downloader():
+    assert isinstance(create_downloader(), Downloader) \
+        , 'Should create a `Downloader` object'
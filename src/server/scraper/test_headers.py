@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for `headers` module.
+"""
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+import gc
+import json
+
+from .headers import REQUEST_EVENT, HeaderCapture, captures, clear_captures, create_header_capture
+
+class Driver:
+    def get_log(self, _):
+        events, self.events = self.events, []
+        return events
+
+    def __init__(self, *urls):
+        self.events = [
+            {'message': json.dumps({'message': {
+                'method': REQUEST_EVENT,
+                'params': {'request': {'url': url, 'headers': {'foo': url}}},
+            }})}
+            for url in urls
+        ]
+
+class TestHeaderCapture:
+    def test_update(self, driver):
+        capture = HeaderCapture(driver, 'google.com')
+
+        driver.get('https://www.google.com')
+
+        headers = capture.update()
+
+        assert 'User-Agent' in headers \
+            , 'Should return headers of matching requests'
+
+        assert capture.update() == headers \
+            , 'Should keep headers after log is read'
+
+        assert capture.parsed > 0 \
+            , 'Should parse matching events'
+
+    def test_matches(self):
+        capture = HeaderCapture(Driver(), '/voyager/api', ['x-li-prefetch'])
+        url = 'https://www.linkedin.com/voyager/api/me'
+
+        assert capture.matches({'url': url, 'headers': {}}) \
+            , 'Should match requests to `url_filter`'
+
+        assert not capture.matches({'url': url, 'headers': {'x-li-prefetch': '1'}}) \
+            , 'Should not match requests with excluded headers'
+
+        assert not capture.matches({'url': 'https://www.google.com', 'headers': {}}) \
+            , 'Should not match other requests'
+
+def test_create_header_capture(driver):
+    capture = create_header_capture(driver, 'google.com')
+
+    assert isinstance(capture, HeaderCapture) \
+        , 'Should create a `HeaderCapture` object'
+
+    assert create_header_capture(driver, 'google.com') is capture \
+        , 'Should reuse capture of driver'
+
+def test_captures():
+    count = len(captures)
+    driver = Driver()
+    capture = create_header_capture(driver, 'google.com')
+
+    assert driver in captures \
+        , 'Should keep capture of driver'
+
+    del driver
+    gc.collect()
+
+    assert len(captures) == count \
+        , 'Should drop capture once driver is collected'
+
+    assert capture.update() == {} \
+        , 'Should return headers after driver is collected'
+
+def test_create_header_capture_filters():
+    driver = Driver('https://google.com', 'https://linkedin.com/voyager/api')
+    google = create_header_capture(driver, 'google.com')
+    linkedin = create_header_capture(driver, '/voyager/api')
+
+    assert google.update() == {'foo': 'https://google.com'} \
+        , 'Should capture requests matching filter'
+
+    assert linkedin.update() == {'foo': 'https://linkedin.com/voyager/api'} \
+        , 'Should share events with other filters of the driver'
+
+def test_clear_captures():
+    driver = Driver('https://google.com')
+    capture = create_header_capture(driver, 'google.com')
+    capture.update()
+    driver.events = Driver('https://google.com/bar').events
+    clear_captures(driver)
+
+    assert create_header_capture(driver, 'google.com') is not capture \
+        , 'Should drop captures of driver'
+
+    assert create_header_capture(driver, 'google.com').update() == {} \
+        , 'Should drop headers and unread events of previous jobs'
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Tests for `jobstore` module.
+"""
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from ..models import Job
+from .jobstore import STALE_AFTER, JobStore, create_job_store
+
+class TestJobStore:
+    @pytest.fixture
+    def store(self) -> JobStore:
+        store = JobStore('sqlite://')
+
+        store.create_job('foo', 'mock')
+
+        return store
+
+    def test_create_job(self, store: JobStore):
+        assert store.get_status('foo') == 'queued' \
+            , 'Should create a queued job'
+
+        assert store.get_path('foo') == 'mock' \
+            , 'Should store script path'
+
+    def test_start_job(self, store: JobStore):
+        store.create_job('bar', 'mock')
+
+        assert store.start_job('foo', 1) \
+            , 'Should start job when a slot is free'
+
+        assert not store.start_job('bar', 1) \
+            , 'Should not start more than `limit` jobs'
+
+        store.finish_job('foo')
+
+        assert store.start_job('bar', 1) \
+            , 'Should start job when a slot is freed'
+
+    def test_start_job_limits(self, store: JobStore):
+        store.create_job('bar', 'mock', domain='google.com')
+        store.create_job('baz', 'mock', domain='google.com')
+        store.create_job('qux', 'other', domain='google.com')
+
+        assert store.start_job('bar', 4, script_limit=1) \
+            , 'Should start job below script limit'
+
+        assert not store.start_job('baz', 4, script_limit=1) \
+            , 'Should not start more than `script_limit` jobs of a script'
+
+        assert not store.start_job('qux', 4, domain_limit=1) \
+            , 'Should not start more than `domain_limit` jobs of a website'
+
+    def test_start_job_slots(self, store: JobStore):
+        store.create_job('bar', 'mock', slots=3)
+        store.create_job('baz', 'mock')
+        store.start_job('foo', 3)
+
+        assert not store.start_job('bar', 3) \
+            , 'Should not start jobs needing more slots than are free'
+
+        assert store.start_job('baz', 3) \
+            , 'Should start jobs needing the free slots'
+
+        store.finish_job('foo')
+        store.finish_job('baz')
+
+        assert store.start_job('bar', 3) \
+            , 'Should start jobs once their slots are freed'
+
+        assert store.count_jobs('running') == {None: 3} \
+            , 'Should count slots of running jobs'
+
+    def test_start_job_priority(self, store: JobStore):
+        store.create_job('bar', 'mock', 0)
+
+        assert not store.start_job('foo', 1) \
+            , 'Should keep slots free for jobs with lower priority values'
+
+        assert store.start_job('bar', 1) \
+            , 'Should start jobs with lower priority values first'
+
+    def test_finish_job(self, store: JobStore):
+        store.finish_job('foo', 'error')
+
+        assert store.get_status('foo') == 'error' \
+            , 'Should update status'
+
+    def test_heartbeat(self, store: JobStore):
+        assert store.heartbeat('foo') \
+            , 'Should return `True` for existing jobs'
+
+        assert not store.heartbeat('bar') \
+            , 'Should return `False` for deleted jobs'
+
+    def test_heartbeat_jobs(self, store: JobStore):
+        assert store.heartbeat_jobs(['foo', 'bar']) == ['foo'] \
+            , 'Should return jobs that have not been deleted'
+
+    def test_count_jobs(self, store: JobStore):
+        store.create_job('bar', 'mock', client='a')
+        store.start_job('bar', 1)
+
+        assert store.count_jobs('queued') == {None: 1} \
+            , 'Should count jobs with status'
+
+        assert store.count_jobs('running', 'client') == {'a': 1} \
+            , 'Should count jobs by column'
+
+    def test_delete_job(self, store: JobStore):
+        store.add_results('foo', [(1, {'foo': 1})])
+        store.delete_job('foo')
+
+        assert store.get_status('foo') is None \
+            , 'Should delete job'
+
+        assert store.get_results('foo') == ([], 0) \
+            , 'Should delete results'
+
+    def test_prune_jobs(self, store: JobStore):
+        store.finish_job('foo')
+
+        assert store.prune_jobs(60) == [] \
+            , 'Should keep recent jobs'
+
+        assert store.prune_jobs(-1) == ['foo'] \
+            , 'Should delete old jobs'
+
+    def test_prune_jobs_stale(self, store: JobStore):
+        store.start_job('foo', 1)
+
+        with store.transaction() as session:
+            session.execute(
+                update(Job).values(updated=datetime.utcnow() - timedelta(seconds=STALE_AFTER + 1))
+            )
+
+        assert store.prune_jobs(60) == [] and store.get_status('foo') == 'error' \
+            , 'Should mark jobs of stopped workers as failed'
+
+        assert store.prune_jobs(-1) == ['foo'] \
+            , 'Should delete jobs of stopped workers'
+
+    def test_set_info(self, store: JobStore):
+        assert store.get_info('foo') == {} \
+            , 'Should return empty info by default'
+
+        store.set_info('foo', {'done': 1})
+        store.set_info('foo', {'dedup': {}})
+
+        assert store.get_info('foo') == {'done': 1, 'dedup': {}} \
+            , 'Should merge info'
+
+        assert store.get_info('bar') is None \
+            , 'Should return `None` for deleted jobs'
+
+        store.create_job('bar', 'mock', info={'done': 0})
+
+        assert store.get_info('bar') == {'done': 0} \
+            , 'Should store initial info'
+
+    def test_add_urls(self, store: JobStore):
+        assert store.add_urls('mock', ['foo', 'bar', 'foo']) == ['foo', 'bar'] \
+            , 'Should return new urls once'
+
+        assert store.add_urls('mock', ['foo', 'baz']) == ['baz'] \
+            , 'Should skip urls recorded before'
+
+        assert store.add_urls('other', ['foo']) == ['foo'] \
+            , 'Should keep urls of each scope apart'
+
+    def test_prune_urls(self, store: JobStore):
+        store.add_urls('mock', ['foo'])
+        store.prune_urls(60)
+
+        assert store.add_urls('mock', ['foo']) == [] \
+            , 'Should keep recent urls'
+
+        store.prune_urls(-1)
+
+        assert store.add_urls('mock', ['foo']) == ['foo'] \
+            , 'Should forget old urls'
+
+    def test_get_jobs(self, store: JobStore):
+        store.create_job('bar', 'other')
+
+        assert store.get_jobs() == ['foo', 'bar'] \
+            , 'Should return all jobs'
+
+        assert store.get_jobs('other') == ['bar'] \
+            , 'Should filter jobs by script'
+
+    def test_add_results(self, store: JobStore):
+        assert store.add_results('foo', []) \
+            , 'Should accept empty batches'
+
+        assert store.add_results('foo', [(1, {'foo': 1}), (2, {'foo': 2})]) \
+            , 'Should insert a batch of results'
+
+        assert store.get_results('foo')[0] == [{'foo': 1}, {'foo': 2}] \
+            , 'Should store every result'
+
+        assert not store.add_results('foo', [(2, {'foo': 2})]) \
+            , 'Should reject duplicate sequence numbers'
+
+    def test_get_rows(self, store: JobStore):
+        store.add_results('foo', [(1, {'foo': 1}), (2, {'foo': 2})])
+
+        assert store.get_rows('foo', 1) == [(2, {'foo': 2})] \
+            , 'Should return sequence number of each result'
+
+        assert store.get_read_cursor('foo') == 2 \
+            , 'Should record read progress'
+
+    def test_mark_read(self, store: JobStore):
+        store.mark_read('foo', 5)
+        store.mark_read('foo', 3)
+
+        assert store.get_read_cursor('foo') == 5 \
+            , 'Should keep furthest cursor'
+
+        assert store.get_read_cursor('bar') is None \
+            , 'Should return `None` for deleted jobs'
+
+    def test_get_results(self, store: JobStore):
+        store.add_results('foo', [(1, {'foo': 1}), (2, {'foo': 2})])
+
+        results, cursor = store.get_results('foo', limit=1)
+
+        assert results == [{'foo': 1}] \
+            , 'Should return `limit` results'
+
+        store.add_results('foo', [(3, {'foo': 3})])
+
+        assert store.get_results('foo', cursor)[0] == [{'foo': 2}, {'foo': 3}] \
+            , 'Should return results after cursor in order'
+
+        assert store.get_results('foo')[0] == [{'foo': 1}, {'foo': 2}, {'foo': 3}] \
+            , 'Should keep results after they are read'
+
+        assert store.get_results('foo', 1000) == ([], 1000) \
+            , 'Should return same cursor when there are no new results'
+
+def test_create_job_store(tmp_path):
+    assert isinstance(create_job_store('sqlite://'), JobStore) \
+        , 'Should create a `JobStore` object'
+
+    database_uri = f'sqlite:///{tmp_path}/instance/scraper.db'
+    create_job_store(database_uri).create_job('foo', 'mock')
+
+    assert create_job_store(database_uri).get_status('foo') == 'queued' \
+        , 'Should share jobs through database files'
@@ -7,13 +7,24 @@ Tests for `script` module.
 # pylint: disable=missing-function-docstring
 # pylint: disable=redefined-outer-name
 
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
 import time
 import pytest
+import requests
 
+from . import linkedinapi as linkedinapi_module
+from .auth import create_auth_cache
 from .linkedinapi import (
     LinkedInAPI,
     create_linkedinapi,
+    get_account,
+    get_limiter,
+    get_limiter_stats,
+    save_auth,
 )
+from .ratelimit import AdaptiveLimiter
 
 class TestLinkedInAPI:
     @pytest.fixture
@@ -45,6 +56,15 @@ class TestLinkedInAPI:
         assert 'JSESSIONID' in cookies \
             , 'Should return `JSESSIONID` cookie'
 
+    def test_get_auth(self, session_driver):
+        auth = LinkedInAPI.get_auth(session_driver)
+
+        assert any(cookie['name'] == 'JSESSIONID' for cookie in auth['cookies']) \
+            , 'Should return cookies'
+
+        assert 'csrf-token' in auth['headers'] \
+            , 'Should return headers'
+
     def test_sanitize_path(self):
 
         assert LinkedInAPI.sanitize_path('/foo') == 'foo' \
@@ -65,18 +85,133 @@ class TestLinkedInAPI:
         assert isinstance(result, dict) \
             , 'Should return a JSON response'
 
+        hits = linkedinapi.stats()['cache']['hits']
+
+        assert linkedinapi.get_profile('jcrossman') == result \
+            and linkedinapi.stats()['cache']['hits'] == hits + 1 \
+            , 'Should return cached profile'
+
+    def test_refresh_auth(self, linkedinapi: LinkedInAPI):
+        auth = linkedinapi.auth
+
+        assert linkedinapi.refresh_auth(auth) and linkedinapi.auth is not auth \
+            , 'Should replace rejected auth'
+
+        assert linkedinapi.refresh_auth(auth) \
+            , 'Should not refresh auth replaced by another thread'
+
+    def test_stats(self, linkedinapi: LinkedInAPI):
+        linkedinapi.call('/identity/profiles/williamhgates/profileView')
+
+        assert linkedinapi.stats()['failures'] == 0 \
+            , 'Should return state of rate limit'
+
+    def test_get_profiles(self, linkedinapi: LinkedInAPI):
+        profile_ids = ['jcrossman', 'williamhgates']
+        result = dict(linkedinapi.get_profiles(profile_ids, workers=2))
+
+        assert sorted(result) == sorted(profile_ids) \
+            , 'Should return each profile id'
+
+        assert all(isinstance(profile, dict) for profile in result.values()) \
+            , 'Should return JSON responses'
+
     def test__init__(self, driver, session_driver):
         # Should throw an error if driver is not an instance of `WebDriver`
         with pytest.raises(TypeError):
-            LinkedInAPI(None)
+            LinkedInAPI('foo')
+
+        # Should throw an error if no driver is given and auth is not stored
+        with pytest.raises(TypeError):
+            LinkedInAPI(None, auth_cache=create_auth_cache(None))
 
-        # Should throw an error if session is not logged in
+        # Should throw an error if session is not logged in and auth is not stored
         with pytest.raises(TypeError):
-            LinkedInAPI(driver)
+            LinkedInAPI(driver, auth_cache=create_auth_cache(None))
 
         assert LinkedInAPI(session_driver) \
             , 'Should not throw an error'
 
+        assert LinkedInAPI().call('/identity/profiles/williamhgates/profileView').ok \
+            , 'Should use auth stored by earlier instances'
+
+        url = driver.current_url
+
+        assert LinkedInAPI(driver) and driver.current_url == url \
+            , 'Should not use driver while auth is stored'
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        # pylint: disable=invalid-name
+        body = json.dumps({
+            'cookie': self.headers.get('Cookie'),
+            'csrf-token': self.headers.get('csrf-token'),
+        }).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_set_auth(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(linkedinapi_module, 'API_BASE', f'http://127.0.0.1:{server.server_port}/')
+
+    def set_auth(value: str) -> dict:
+        cookie = {'name': 'li_at', 'value': value, 'domain': '127.0.0.1', 'path': '/'}
+
+        return auth_cache.set('foo', [{**cookie, 'secure': False}], {'csrf-token': value})
+
+    auth_cache = create_auth_cache(None)
+    set_auth('bar')
+    instance = LinkedInAPI(account='foo', auth_cache=auth_cache, limiter=AdaptiveLimiter(100))
+    credentials = instance.credentials
+    instance.set_auth(set_auth('baz'))
+
+    assert credentials[1] == {'csrf-token': 'bar'} and credentials[2].get('li_at') == 'bar' \
+        , 'Should not change auth of calls already sent'
+
+    assert instance.call('/foo').json() == {'cookie': 'li_at=baz', 'csrf-token': 'baz'} \
+        , 'Should send the current auth'
+
+    assert not instance.session.cookies and 'csrf-token' not in instance.session.headers \
+        , 'Should not share auth between threads through the session'
+
+    server.shutdown()
+
+def test_save_auth(session_driver):
+    auth_cache = create_auth_cache(None)
+    auth = save_auth(session_driver, 'foo', auth_cache)
+
+    assert auth_cache.get('foo') == auth \
+        , 'Should store auth of driver'
+
+def test_get_account():
+    cookies = requests.cookies.RequestsCookieJar()
+    cookies.set('li_at', 'foo')
+
+    assert len(get_account(cookies)) == 16 and 'foo' not in get_account(cookies) \
+        , 'Should return a hash of session cookie'
+
+def test_get_limiter():
+    limiter = get_limiter('foo')
+
+    assert isinstance(limiter, AdaptiveLimiter) \
+        , 'Should return an `AdaptiveLimiter` object'
+
+    assert get_limiter('foo') is limiter \
+        , 'Should share limiter between calls of an account'
+
+    assert get_limiter('bar') is not limiter \
+        , 'Should not share limiter between accounts'
+
+    assert get_limiter_stats()['foo']['rate'] == limiter.rate \
+        , 'Should return state of each account'
 
 def test_create_linkedinapi(session_driver):
     assert isinstance(create_linkedinapi(session_driver), LinkedInAPI) \
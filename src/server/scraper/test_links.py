@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Tests for `links` module.
+"""
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+from .links import parse_links
+
+PAGE = '''
+<html><body>
+    <a href="/about">About</a>
+    <div id="search">
+        <div class="g"><a href="https://linkedin.com/in/foo"><h3>Foo &amp; Bar</h3><br>
+            <cite>linkedin.com</cite></a></div>
+        <p>No link
+        <a href="/url?q=https://twitter.com/foo">Foo</a>
+        <a name="top">Anchor</a>
+    </div>
+    <a href="https://example.com">Footer</a>
+'''
+
+def test_parse_links():
+    assert parse_links(PAGE, 'https://www.google.com/search')[0] == {
+        'href': 'https://www.google.com/about',
+        'text': 'About',
+    }, 'Should resolve relative links'
+
+    assert parse_links(PAGE, 'https://www.google.com/search', ['search']) == [
+        {'href': 'https://linkedin.com/in/foo', 'text': 'Foo & Bar linkedin.com'},
+        {'href': 'https://www.google.com/url?q=https://twitter.com/foo', 'text': 'Foo'},
+    ], 'Should only return links inside elements with `ids`'
+
+    assert parse_links(PAGE, 'https://www.google.com/search', ['rso']) is None \
+        , 'Should return `None` if no element has one of `ids`'
+
+    assert parse_links('<div id="rso"></div>', 'https://www.google.com', ['rso']) == [] \
+        , 'Should return no links for empty elements'
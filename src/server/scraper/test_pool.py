@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for `pool` module.
+"""
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+import pytest
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from .download import downloader
+from .pool import ACQUIRE_TIMEOUT, DriverPool, create_pool, pool_key
+from .scraper import Scraper, create_driver
+
+def test_pool_key():
+    assert pool_key(foo=1, bar='foo') == pool_key(bar='foo', foo=1) \
+        , 'Should not depend on argument order'
+
+    assert pool_key(foo=1) != pool_key(foo=2) \
+        , 'Should differ for different options'
+
+class TestDriverPool:
+    @pytest.fixture
+    def pool(self):
+        instance = DriverPool(create_driver, max_size=2, max_uses=2, timeout=5)
+
+        yield instance
+
+        instance.close()
+
+    def test_limit(self, pool: DriverPool):
+        assert pool.limit(save_session=True) == 1 \
+            , 'Should only allow one saved session'
+
+        assert pool.limit() == 2 \
+            , 'Should allow `max_size` sessions'
+
+    def test_acquire(self, pool: DriverPool):
+        driver = pool.acquire(**Scraper.DEFAULT_OPTIONS)
+
+        assert isinstance(driver, WebDriver) \
+            , 'Should return an instance of `Webdriver`'
+
+        pool.acquire(**Scraper.DEFAULT_OPTIONS)
+
+        # Should raise an error when pool is exhausted
+        with pytest.raises(TimeoutError):
+            pool.acquire(**Scraper.DEFAULT_OPTIONS)
+
+    def test_release(self, pool: DriverPool):
+        driver = pool.acquire(**Scraper.DEFAULT_OPTIONS)
+        driver.get('https://httpbin.org/cookies/set?foo=1')
+        downloader.session(driver.session_id).cookies.set('foo', '1')
+        pool.release(driver)
+
+        assert pool.acquire(**Scraper.DEFAULT_OPTIONS) is driver \
+            , 'Should reuse released sessions'
+
+        assert driver.get_cookies() == [] \
+            , 'Should reset released sessions'
+
+        assert not downloader.session(driver.session_id).cookies \
+            , 'Should reset cookies of download session'
+
+        pool.release(driver)
+
+        assert pool.size == 0 \
+            , 'Should recycle sessions after `max_uses` jobs'
+
+    def test_discard(self, pool: DriverPool):
+        driver = pool.acquire(**Scraper.DEFAULT_OPTIONS)
+        session_id = driver.session_id
+        downloader.session(session_id)
+        pool.discard(driver)
+
+        assert pool.size == 0 \
+            , 'Should free slot'
+
+        assert not DriverPool.is_healthy(driver) \
+            , 'Should stop session'
+
+        assert session_id not in downloader.sessions \
+            , 'Should close download session'
+
+    def test_warm(self, pool: DriverPool):
+        assert pool.warm(1, **Scraper.DEFAULT_OPTIONS) == 1 \
+            , 'Should start sessions'
+
+        assert pool.size == 1 \
+            , 'Should keep sessions idle'
+
+    def test_warm_saved(self, pool: DriverPool):
+        assert pool.warm(1, save_session=True) == 0 and pool.size == 0 \
+            , 'Should not keep saved sessions idle'
+
+    def test_release_saved(self, pool: DriverPool):
+        driver = pool.acquire(**Scraper.DEFAULT_OPTIONS, save_session=True)
+        pool.release(driver)
+
+        assert pool.size == 0 \
+            , 'Should stop saved sessions once released'
+
+def test_create_pool():
+    assert isinstance(create_pool(create_driver), DriverPool) \
+        , 'Should create a `DriverPool` object'
+
+    assert create_pool(create_driver).timeout == ACQUIRE_TIMEOUT \
+        , 'Should not wait forever for a session'
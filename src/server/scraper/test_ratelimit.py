@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Tests for `ratelimit` module.
+"""
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+import threading
+import time
+
+import pytest
+
+from .ratelimit import (
+    AdaptiveLimiter,
+    TokenBucket,
+    create_adaptive_limiter,
+    create_token_bucket,
+    parse_retry_after,
+)
+
+class TestTokenBucket:
+    def test_acquire(self):
+        bucket = TokenBucket(20, 2)
+        prev_time = time.monotonic()
+
+        bucket.acquire()
+        bucket.acquire()
+
+        assert time.monotonic() - prev_time < 0.05 \
+            , 'Should allow bursts without waiting'
+
+        bucket.acquire()
+        bucket.acquire()
+
+        assert time.monotonic() - prev_time >= 0.1 \
+            , 'Should wait for tokens once bucket is empty'
+
+        assert not bucket.acquire(5, timeout=0) \
+            , 'Should return `False` if tokens are not available within timeout'
+
+    def test_acquire_threads(self):
+        bucket = TokenBucket(50)
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(6)]
+        prev_time = time.monotonic()
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        assert time.monotonic() - prev_time >= 0.1 \
+            , 'Should share rate between threads'
+
+    def test_rate(self):
+        bucket = TokenBucket(1)
+        bucket.rate = 100
+        bucket.acquire()
+        prev_time = time.monotonic()
+        bucket.acquire()
+
+        assert time.monotonic() - prev_time < 0.1 \
+            , 'Should use new rate'
+
+        # Should raise an error if rate is not positive
+        with pytest.raises(TypeError):
+            bucket.rate = 0
+
+    def test_available(self):
+        bucket = TokenBucket(1, 3)
+        bucket.acquire()
+
+        assert 1.9 < bucket.available() <= 3 \
+            , 'Should return number of tokens left'
+
+    def test_pause(self):
+        bucket = TokenBucket(100, 5)
+        bucket.pause(0.1)
+        prev_time = time.monotonic()
+        bucket.acquire()
+
+        assert time.monotonic() - prev_time >= 0.1 \
+            , 'Should wait until pause is over'
+
+        assert bucket.available() < 1 \
+            , 'Should drop stored tokens'
+
+class TestAdaptiveLimiter:
+    def test_throttle(self):
+        limiter = AdaptiveLimiter(8, backoff=0.05)
+
+        assert limiter.throttle() <= 0.075 \
+            , 'Should return backoff with jitter'
+
+        assert limiter.rate == 4 \
+            , 'Should halve rate'
+
+        assert not limiter.acquire(timeout=0) \
+            , 'Should pause callers'
+
+        time.sleep(0.08)
+
+        assert 0.05 <= limiter.throttle() <= 0.15 \
+            , 'Should double backoff for each failure in a row'
+
+        time.sleep(0.16)
+
+        assert limiter.throttle(0.5) == 0.5 \
+            , 'Should use delay requested by server'
+
+        time.sleep(0.5)
+        limiter.throttle(0)
+        limiter.throttle(0)
+
+        assert limiter.rate == 0.5 \
+            , 'Should not go below `min_rate`'
+
+    def test_throttle_max_backoff(self):
+        limiter = AdaptiveLimiter(1, max_backoff=1)
+
+        assert limiter.throttle(3600) == 1 \
+            , 'Should limit delay requested by server to `max_backoff`'
+
+        assert limiter.stats()['backoff'] <= 1 \
+            , 'Should only pause callers for `max_backoff`'
+
+    def test_throttle_threads(self):
+        limiter = AdaptiveLimiter(16, backoff=10)
+        threads = [threading.Thread(target=limiter.throttle) for _ in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        assert limiter.rate == 8 \
+            , 'Should halve rate once for failures during a pause'
+
+        assert limiter.stats()['failures'] == 1 and limiter.stats()['throttled'] == 8 \
+            , 'Should count failures during a pause as one'
+
+    def test_recover(self):
+        limiter = AdaptiveLimiter(10, backoff=0)
+        limiter.throttle()
+        limiter.recover()
+
+        assert limiter.rate == 6 \
+            , 'Should raise rate by a tenth of `max_rate`'
+
+        for _ in range(10):
+            limiter.recover()
+
+        assert limiter.rate == 10 \
+            , 'Should not go above `max_rate`'
+
+    def test_stats(self):
+        limiter = AdaptiveLimiter(1)
+        limiter.throttle(10)
+        stats = limiter.stats()
+
+        assert stats['rate'] == 0.5 and stats['max_rate'] == 1 \
+            , 'Should return current and maximum rate'
+
+        assert 9 < stats['backoff'] <= 10 \
+            , 'Should return seconds until requests are allowed'
+
+        assert stats['failures'] == 1 and stats['throttled'] == 1 \
+            , 'Should count failures'
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120 \
+        , 'Should parse seconds'
+
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0 \
+        , 'Should parse HTTP dates'
+
+    assert parse_retry_after(None) is None \
+        , 'Should return `None` if header is missing'
+
+    assert parse_retry_after('soon') is None \
+        , 'Should return `None` if header is invalid'
+
+def test_create_token_bucket():
+    assert isinstance(create_token_bucket(1), TokenBucket) \
+        , 'Should create a `TokenBucket` object'
+
+    # Should raise an error if rate is not positive
+    with pytest.raises(TypeError):
+        create_token_bucket(0)
+
+def test_create_adaptive_limiter():
+    assert isinstance(create_adaptive_limiter(1, min_rate=0.1), AdaptiveLimiter) \
+        , 'Should create an `AdaptiveLimiter` object'
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for `scheduler` module.
+"""
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+import pytest
+
+from .jobstore import JobStore
+from .scheduler import PRIORITIES, Scheduler, create_scheduler, parse_limits
+
+def test_parse_limits():
+    assert parse_limits('google.com=4, linkedin.com=1') == {'google.com': 4, 'linkedin.com': 1} \
+        , 'Should return limit per domain'
+
+    assert parse_limits(None) == {} \
+        , 'Should allow no limits'
+
+    # Should raise an error for invalid limits
+    with pytest.raises(TypeError):
+        parse_limits('google.com=foo')
+
+class TestScheduler:
+    @pytest.fixture
+    def started(self) -> list:
+        return []
+
+    @pytest.fixture
+    def scheduler(self, started: list) -> Scheduler:
+        instance = Scheduler(JobStore('sqlite://'), started.append, max_jobs=2)
+
+        yield instance
+
+        instance.close()
+
+    def queue(self, scheduler: Scheduler, job: str, priority: str = 'bulk', **kwargs):
+        scheduler.store.create_job(
+            job,
+            kwargs.get('path', 'mock'),
+            PRIORITIES[priority],
+            client=kwargs.get('client'),
+            domain=kwargs.get('domain'),
+        )
+
+        # queue without starting the dispatcher
+        with scheduler.condition:
+            scheduler.thread = True
+            scheduler.add(job, priority, **kwargs)
+            scheduler.thread = None
+
+    def test_add(self, scheduler: Scheduler):
+        self.queue(scheduler, 'foo')
+
+        assert scheduler.queued() == ['foo'] \
+            , 'Should queue job'
+
+        # Should raise an error for unknown priority classes
+        with pytest.raises(TypeError):
+            scheduler.add('bar', 'foo')
+
+    def test_remove(self, scheduler: Scheduler):
+        self.queue(scheduler, 'foo')
+
+        assert scheduler.remove('foo') \
+            , 'Should remove queued job'
+
+        assert not scheduler.remove('foo') \
+            , 'Should return `False` for jobs that are not queued'
+
+    def test_queued(self, scheduler: Scheduler):
+        self.queue(scheduler, 'foo', client='a')
+        self.queue(scheduler, 'bar', client='a')
+        self.queue(scheduler, 'baz', client='b')
+        self.queue(scheduler, 'qux', 'interactive', client='a')
+
+        assert scheduler.queued() == ['qux', 'baz', 'foo', 'bar'] \
+            , 'Should order jobs by priority and share slots between clients'
+
+    def test_dispatch(self, scheduler: Scheduler, started: list):
+        self.queue(scheduler, 'foo', path='bar', max_jobs=1)
+        self.queue(scheduler, 'bar', path='bar', max_jobs=1)
+        self.queue(scheduler, 'baz')
+        self.queue(scheduler, 'qux')
+
+        assert scheduler.dispatch() == ['foo', 'baz'] \
+            , 'Should start jobs up to caps and `max_jobs`'
+
+        assert started == ['foo', 'baz'] \
+            , 'Should call `start` for started jobs'
+
+        scheduler.store.finish_job('foo')
+
+        assert scheduler.dispatch() == ['bar'] \
+            , 'Should start jobs when slots are freed'
+
+    def test_dispatch_domain(self, scheduler: Scheduler):
+        scheduler.domain_limits = {'google.com': 1}
+        self.queue(scheduler, 'foo', domain='google.com')
+        self.queue(scheduler, 'bar', domain='google.com')
+
+        assert scheduler.dispatch() == ['foo'] \
+            , 'Should limit running jobs per domain'
+
+    def test_dispatch_priority(self, scheduler: Scheduler):
+        scheduler.store.create_job('foo', 'mock', PRIORITIES['interactive'])
+        self.queue(scheduler, 'bar')
+        self.queue(scheduler, 'baz')
+
+        assert scheduler.dispatch() == ['bar'] \
+            , 'Should keep slots free for interactive jobs queued on other workers'
+
+    def test_heartbeat(self, scheduler: Scheduler):
+        cancelled = []
+        scheduler.cancel = cancelled.append
+        self.queue(scheduler, 'foo')
+        self.queue(scheduler, 'bar')
+        scheduler.store.delete_job('foo')
+        scheduler.heartbeat()
+
+        assert scheduler.queued() == ['bar'] \
+            , 'Should drop jobs deleted by other workers'
+
+        assert cancelled == ['foo'] \
+            , 'Should call `cancel` for deleted jobs'
+
+    def test_depth(self, scheduler: Scheduler):
+        self.queue(scheduler, 'foo')
+        self.queue(scheduler, 'bar', 'interactive')
+        scheduler.dispatch()
+
+        assert scheduler.depth() == {
+            'queued': {'interactive': 0, 'bulk': 0},
+            'running': 2,
+            'local': 0,
+            'max_jobs': 2,
+        }, 'Should count queued and running jobs'
+
+def test_create_scheduler():
+    assert isinstance(create_scheduler(JobStore('sqlite://'), print), Scheduler) \
+        , 'Should create a `Scheduler` object'
@@ -6,11 +6,15 @@ Tests for `scraper` module.
 # pylint: disable=missing-class-docstring
 # pylint: disable=missing-function-docstring
 
+from concurrent.futures import wait as wait_futures
+
 import pytest
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.remote.webdriver import WebDriver
 
+from .pool import pool_key
 from .scraper import Scraper, create_driver, create_scraper
-from .script import create_script
+from .script import create_script, load_script_class
 
 from .scripts.mock import MOCK_RESULT, Script as MockScript
 
@@ -23,6 +27,13 @@ def test_create_driver():
     driver.close()
     driver.quit()
 
+    driver = create_driver(**Scraper.DEFAULT_OPTIONS, performance_log=False)
+
+    with pytest.raises(WebDriverException):
+        driver.get_log('performance')
+
+    driver.quit()
+
 class TestScraper:
 
     @pytest.fixture
@@ -37,42 +48,238 @@ class TestScraper:
         pass
 
     def test_add_script(self, scraper: Scraper):
-        scraper.add_script('mock', None, None, [])
+        job = scraper.add_script('mock', None, None, [])
 
-        assert scraper.is_script('mock') \
-            , 'Should add a new script'
+        assert scraper.is_script(job) \
+            , 'Should add a new job'
 
     def test_get_script(self, scraper: Scraper):
         assert scraper.get_script('mock') is None \
-            , 'Should return None for non existant scripts'
+            , 'Should return None for non existant jobs'
 
-        scraper.scrape('mock')
+        job = scraper.scrape('mock')
+        scraper.wait(job)
 
-        assert isinstance(scraper.get_script('mock'), MockScript) \
+        assert isinstance(scraper.get_script(job), MockScript) \
             , 'Should return an instance of `Script`'
 
+    def test_get_jobs(self, scraper: Scraper):
+        jobs = [scraper.scrape('mock'), scraper.scrape('mock')]
+
+        assert scraper.get_jobs('mock') == jobs \
+            , 'Should return jobs of script'
+
+        assert scraper.get_jobs('foo') == [] \
+            , 'Should filter jobs by script'
+
     def test_delete_script(self, scraper: Scraper, driver: WebDriver):
         script = create_script('mock', driver)
         generator = script.execute()
 
-        scraper.add_script('mock', driver, script, generator)
-        scraper.delete_script('mock')
+        job = scraper.add_script('mock', driver, script, generator)
+        future = scraper.delete_script(job)
 
-        assert not scraper.is_script('mock') \
-            , 'Should delete a script'
+        assert not scraper.is_script(job) \
+            , 'Should delete a job'
+
+        future.result(timeout=10)
+
+        assert future.done() \
+            , 'Should resolve once script stops'
 
     def test_scrape(self, scraper: Scraper):
-        assert scraper.scrape('mock') == 'done' \
-            , 'Should return a string'
+        job = scraper.scrape('mock')
+
+        assert isinstance(job, str) \
+            , 'Should return a job id'
+
+        assert scraper.wait(job) == 'done' \
+            , 'Should run job'
+
+        assert scraper.is_script(scraper.scrape('mock')) and scraper.is_script(job) \
+            , 'Should not replace previous jobs of the same script'
+
+    def test_scrape_dedup(self):
+        scraper = Scraper(persist_dedup=True)
+        job = scraper.scrape('mockdedup', href='https://linkedin.com/in/foo')
+        scraper.wait(job)
+
+        assert len(scraper.get_results(job)[0]) == 1 \
+            , 'Should return new urls'
+
+        job = scraper.scrape('mockdedup', href='https://uk.linkedin.com/in/foo/')
+        scraper.wait(job)
+
+        assert scraper.get_results(job)[0] == [] \
+            , 'Should skip urls returned by earlier jobs'
+
+        assert scraper.get_progress(job)['dedup'] == {'hits': 1, 'misses': 0} \
+            , 'Should count duplicate urls'
+
+        job = scraper.scrape('mock', href='https://linkedin.com/in/foo')
+        scraper.wait(job)
+
+        assert len(scraper.get_results(job)[0]) == 1 \
+            , 'Should keep urls of scripts without `DEDUP_KEY`'
+
+    def test_delete_script_duplicates(self, scraper: Scraper):
+        for job in [
+            scraper.scrape('mockdedup', href='https://example.com', repeat=0),
+            scraper.scrape_batch('mockdedup', ['foo'], href='https://example.com', repeat=0),
+        ]:
+            scraper.wait(job, 2)
+
+            assert len(scraper.get_results(job)[0]) == 1 \
+                , 'Should skip duplicate urls'
+
+            future = scraper.delete_script(job)
+            wait_futures([future], 10)
+
+            assert future.done() and not scraper.is_script(job) \
+                , 'Should stop job that only finds duplicate urls'
+
+    def test_scrape_batch_sessions(self):
+        scraper = Scraper(save_session=True)
+        options = scraper.get_driver_options(load_script_class('findpeople'))
+        job = scraper.scrape_batch('findpeople', ['foo bar', 'bar baz'], workers=2, max_page=1)
+
+        assert scraper.get_progress(job)['workers'] == 2 \
+            , 'Should not limit batch to the saved session'
+
+        scraper.wait(job)
+
+        assert scraper.pool.count(pool_key(**options)) > 1 \
+            , 'Should run queries of a batch on several sessions'
+
+    def test_scrape_batch_slots(self):
+        scraper = Scraper(max_jobs=2)
+        job = scraper.scrape_batch('mock', ['foo', 'bar', 'baz'], workers=4)
+
+        assert scraper.get_progress(job)['workers'] == 2 \
+            , 'Should not open more sessions than `max_jobs`'
+
+        assert scraper.wait(job) == 'done' \
+            , 'Should start batches holding a slot per session'
+
+    def test_get_driver_options(self, scraper: Scraper):
+        options = scraper.get_driver_options(load_script_class('findpeople'))
+
+        assert options['performance_log'] is False \
+            , 'Should use `Script.DRIVER_OPTIONS`'
 
-        assert scraper.is_script('mock') \
-            , 'Should add a new script'
+        assert not Scraper(save_session=True).get_driver_options(
+            load_script_class('findpeople'),
+        )['save_session'] \
+            , 'Should not use saved session for scripts without login'
+
+        assert options['command_executor'] == scraper.options['command_executor'] \
+            , 'Should keep options of scraper'
+
+    def test_scrape_batch(self, scraper: Scraper):
+        job = scraper.scrape_batch('mock', ['foo', 'bar', 'foo'], workers=2)
+
+        assert scraper.wait(job) == 'done' \
+            , 'Should run batch as one job'
+
+        results = sorted(scraper.get_results(job)[0], key=lambda result: result['query'])
+
+        assert results == [{**MOCK_RESULT, 'query': 'bar'}, {**MOCK_RESULT, 'query': 'foo'}] \
+            , 'Should merge results of every query once'
+
+        job = scraper.scrape_batch('mockdedup', ['foo', 'bar'], href='https://example.com')
+        scraper.wait(job)
+
+        assert len(scraper.get_results(job)[0]) == 1 \
+            , 'Should skip results with the same href'
+
+        # Should raise an error if queries are not a list
+        with pytest.raises(TypeError):
+            scraper.scrape_batch('mock', 'foo')
+
+    def test_get_progress(self, scraper: Scraper):
+        job = scraper.scrape_batch('mockdedup', ['foo', 'bar'], href='https://example.com')
+
+        assert scraper.get_progress(job)['queries']['foo']['status'] in ('queued', 'running', 'done') \
+            , 'Should report progress of queued jobs'
+
+        scraper.wait(job)
+        progress = scraper.get_progress(job)
+
+        assert progress['queries']['foo']['status'] == 'done' \
+            , 'Should report status of each query'
+
+        assert (progress['done'], progress['total']) == (2, 1) \
+            , 'Should report totals'
+
+        assert progress['dedup'] == {'hits': 1, 'misses': 1} \
+            , 'Should report duplicate counts'
+
+        # Should raise an error for non existant jobs
+        with pytest.raises(KeyError):
+            scraper.get_progress('foo')
+
+    def test_wait(self, scraper: Scraper):
+        job = scraper.scrape('mock')
+
+        assert scraper.wait(job, 10) == 'done' \
+            , 'Should wait for job to complete'
+
+        assert scraper.wait('foo') == 'stopped' \
+            , 'Should not wait for non existant jobs'
 
     def test_get_results(self, scraper: Scraper):
-        scraper.scrape('mock')
+        job = scraper.scrape('mock')
+        scraper.wait(job)
+
+        results, cursor = scraper.get_results(job)
+
+        assert results == [MOCK_RESULT] \
+            , 'Should return results from job'
+
+        assert scraper.get_results(job, cursor) == ([], cursor) \
+            , 'Should return results after cursor'
+
+        assert scraper.get_results(job)[0] == [MOCK_RESULT] \
+            , 'Should keep results after they are read'
+
+    def test_stream_results(self, scraper: Scraper):
+        job = scraper.scrape('mock')
+        rows = list(scraper.stream_results(job, timeout=30))
+
+        assert [result for _, result in rows] == [MOCK_RESULT] \
+            , 'Should stream results until job completes'
+
+        assert list(scraper.stream_results(job, rows[-1][0], timeout=30)) == [] \
+            , 'Should resume after cursor'
+
+    def test_wait_for_readers(self):
+        scraper = Scraper(batch_size=1, max_unread=2)
+        job = scraper.add_script('mock', None, None, [{'foo': number} for number in range(5)])
+
+        assert scraper.wait(job, 2) == 'running' \
+            , 'Should pause job until results are read'
+
+        assert len(list(scraper.stream_results(job, timeout=30))) == 5 \
+            , 'Should resume job as results are read'
+
+        assert scraper.get_status(job) == 'done' \
+            , 'Should complete job'
+
+    def test_get_spill(self, tmp_path):
+        scraper = Scraper(spill_dir=str(tmp_path))
+        job = scraper.add_script('mock', None, None, [MOCK_RESULT])
+        scraper.wait(job)
+
+        assert len(scraper.get_spill(job)) == 1 \
+            , 'Should store results in spill file'
+
+        assert scraper.get_results(job)[0] == [MOCK_RESULT] \
+            , 'Should read results from spill file'
+
+        scraper.delete_script(job)
 
-        assert scraper.get_results('mock') == [MOCK_RESULT] \
-            , 'Should return results from script'
+        assert list(tmp_path.iterdir()) == [] \
+            , 'Should delete spill file with job'
 
 def test_create_scraper():
     assert isinstance(create_scraper(), Scraper) \
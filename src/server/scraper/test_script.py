@@ -7,6 +7,7 @@ Tests for `script` module.
 # pylint: disable=missing-function-docstring
 # pylint: disable=redefined-outer-name
 
+import io
 import os
 import time
 
@@ -113,6 +114,32 @@ class TestScript:
         assert script.cookies == {'foo': '1', 'bar': '2'} \
             , 'Should return cookies'
 
+    def test_invalidate_cache(self, script: Script):
+        script.get('https://httpbin.org/cookies/set?foo=1')
+
+        assert script.cookies == {'foo': '1'} \
+            , 'Should return cookies after navigation'
+
+        script.driver.get('https://httpbin.org/cookies/set?foo=2')
+
+        assert script.cookies == {'foo': '1'} \
+            , 'Should cache cookies'
+
+        script.invalidate_cache()
+
+        assert script.cookies == {'foo': '2'} \
+            , 'Should fetch cookies again once invalidated'
+
+        script.cache['user_agent'] = 'foo'
+
+        assert script.user_agent == 'foo' \
+            , 'Should cache user agent'
+
+        script.invalidate_cache(user_agent=True)
+
+        assert script.user_agent != 'foo' \
+            , 'Should fetch user agent again once invalidated'
+
     def test_page(self, script: Script):
         assert isinstance(script.page, int) \
             , 'Should return a number'
@@ -121,13 +148,66 @@ class TestScript:
         pass
 
     def test_exists(self, script: Script):
-        pass
+        script.driver.get('https://example.com')
+
+        assert script.exists('//h1') \
+            , 'Should return `True` if element is found'
+
+        prev_time = time.time()
+
+        assert not script.exists('//foo') \
+            , 'Should return `False` if element is not found'
+
+        assert time.time() - prev_time < 2 \
+            , 'Should not wait for implicit timeout'
+
+    def test_probe(self, script: Script):
+        script.driver.get('https://example.com')
+
+        assert script.probe('//h1', '//foo', '[') == {'//h1': True, '//foo': False, '[': False} \
+            , 'Should check every XPath'
+
+        prev_time = time.time()
+        script.probe('//foo', timeout=1)
+
+        assert time.time() - prev_time >= 1 \
+            , 'Should wait `timeout` seconds for elements'
+
+    def test_extract_links(self, script: Script):
+        script.driver.get('https://example.com')
+
+        page = script.extract_links('//a[@href]')
+
+        assert page['url'] == script.driver.current_url \
+            , 'Should return url of current page'
+
+        assert page['links'] == [{
+            'href': 'https://www.iana.org/domains/example',
+            'text': 'More information...',
+        }], 'Should return href and text of links'
+
+        assert script.extract_links('//foo')['links'] == [] \
+            , 'Should return no links if none match'
 
     def test_click(self, script: Script):
         pass
 
     def test_send_keys(self, script: Script):
-        pass
+        script.driver.get('https://www.google.com')
+
+        element = script.send_keys('//*[@name="q"]', 'foo', typing='fast')
+
+        assert element.get_attribute('value') == 'foo' \
+            , 'Should send all keys at once'
+
+        element = script.send_keys('//*[@name="q"]', 'bar', typing='quick')
+
+        assert element.get_attribute('value') == 'bar' \
+            , 'Should replace value keystroke by keystroke'
+
+        # Should raise an error for unknown typing profiles
+        with pytest.raises(TypeError):
+            script.send_keys('//*[@name="q"]', 'bar', typing='foo')
 
     def test_move_to(self, script: Script):
         script.driver.get('https://schema.org/LocalBusiness')
@@ -148,20 +228,50 @@ class TestScript:
             , 'Should allow clicking of object using ActionChains'
 
     def test_scroll_to_bottom(self, script: Script):
+        timeout = script.driver.timeouts.script
         script.driver.get('https://worlds-highest-website.com')
-        script.scroll_to_bottom()
+        assert script.scroll_to_bottom() \
+            , 'Should wait for page to stop growing'
+
+        assert script.driver.timeouts.script == timeout \
+            , 'Should restore script timeout of session'
 
         assert script.driver.execute_script('return window.scrollY') > 1000 \
             , 'Should scroll to bottom of page'
 
+        script.driver.get('https://worlds-highest-website.com')
+        script.scroll_to_bottom(stealth=True)
+
+        assert script.driver.execute_script('return window.scrollY') > 1000 \
+            , 'Should scroll to bottom of page like a user'
+
+    def test_fetch(self, script: Script):
+        script.driver.get('https://httpbin.org/cookies/set?foo=1')
+        response = script.fetch('https://httpbin.org/anything', params={'bar': 2})
+
+        assert response.json()['headers']['User-Agent'] == script.user_agent \
+            , 'Should send user agent of browser'
+
+        assert 'foo=1' in response.json()['headers']['Cookie'] \
+            , 'Should send cookies of browser'
+
+        assert response.json()['args'] == {'bar': '2'} \
+            , 'Should send query string parameters'
+
     def test_download(self, script: Script):
         script.driver.get('https://example.com')
-        script.download('https://example.com/index.htm')
+        path = script.download('https://example.com/index.htm')
+
+        assert os.path.isfile(path) and path.startswith(script.download_dir) \
+            , 'Should download a file into `download_dir`'
+
+        assert script.download('https://example.com/index.htm', io.BytesIO()).getvalue() \
+            , 'Should download into file objects'
 
-        assert os.path.isfile('index.htm') \
-            , 'Should download a file'
+        script.cleanup()
 
-        os.remove('index.htm')
+        assert not os.path.exists(path) \
+            , 'Should delete downloaded files'
 
     def test_is_recaptcha(self, script: Script):
         script.driver.get('http://example.com')
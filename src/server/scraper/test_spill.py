@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for `spill` module.
+"""
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+import os
+
+import pytest
+
+from .spill import SpillFile, create_spill
+
+class TestSpillFile:
+    @pytest.fixture
+    def spill(self, tmp_path) -> SpillFile:
+        return SpillFile(str(tmp_path / 'foo.ndjson'), 2)
+
+    def test_append(self, spill: SpillFile):
+        spill.append([(1, {'foo': 1}), (2, {'foo': 2})])
+
+        with open(spill.path, 'rb') as file:
+            assert file.read() == b'{"foo":1}\n{"foo":2}\n' \
+                , 'Should write one compact line per result'
+
+        # Should raise an error for gaps in sequence numbers
+        with pytest.raises(KeyError):
+            spill.append([(4, {'foo': 4})])
+
+    def test_read(self, spill: SpillFile):
+        assert spill.read() == [] \
+            , 'Should return nothing before results are written'
+
+        spill.append([(number, {'foo': number}) for number in range(1, 6)])
+
+        assert spill.read(2) == [(3, {'foo': 3}), (4, {'foo': 4}), (5, {'foo': 5})] \
+            , 'Should return results in order'
+
+        assert spill.read(3, 1) == [(4, {'foo': 4})] \
+            , 'Should return `limit` results'
+
+        assert spill.read(5) == [] \
+            , 'Should return nothing after the last result'
+
+        assert SpillFile(spill.path, 2).read(4) == [(5, {'foo': 5})] \
+            , 'Should read results written by other instances'
+
+    def test_remove(self, spill: SpillFile):
+        spill.append([(1, {'foo': 1})])
+        spill.remove()
+
+        assert not os.path.exists(spill.path) \
+            , 'Should delete file'
+
+        assert len(spill) == 0 \
+            , 'Should be empty'
+
+def test_create_spill(tmp_path):
+    assert isinstance(create_spill(str(tmp_path / 'foo.ndjson')), SpillFile) \
+        , 'Should create a `SpillFile` object'
+
+    # Should raise an error for invalid step
+    with pytest.raises(TypeError):
+        create_spill(str(tmp_path / 'foo.ndjson'), 0)